@@ -1,32 +1,72 @@
 """
 Document handling routes
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from api.services.document_extractor import DocumentExtractor
+import json
+from typing import List
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from api.services.bulk_ingest import BulkIngestion
+from api.services.compact_result import cache_payload, compact_or_full, load_cached
+from api.services.document_extractor import EXTRACTOR_VERSION
+from api.services.extraction import document_extension, extract_spooled, extractor, pdf_extractor
+from api.services.extraction_pipeline import StreamingExtraction, result_events
+from api.services.response_cache import build_extraction_cache
+from api.services.uploads import spool_upload, remove_spooled
+from api.services.workers import extraction_pool
 
 router = APIRouter()
-extractor = DocumentExtractor()
+extraction_cache = build_extraction_cache()
+bulk_ingestion = BulkIngestion(extractor, extraction_pool)
+
+
+def _file_extension(file: UploadFile) -> str:
+    try:
+        return document_extension(file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _cache_key(file_extension: str, digest: str) -> str:
+    # Same bytes always extract to the same result
+    kind = f'pdf-{extractor.pdf_engine}-{pdf_extractor.max_pages}' if file_extension == 'pdf' else 'word'
+    return f"{EXTRACTOR_VERSION}:{kind}:{digest}"
+
+
+def _ndjson(event: dict) -> str:
+    return json.dumps(event) + "\n"
 
 
 @router.post("/extract")
-async def extract_document(file: UploadFile = File(...)):
-    """Extract text and structure from PDF or Word document"""
+async def extract_document(file: UploadFile = File(...), format: str = Query('full')):
+    """
+    Extract text and structure from PDF or Word document. format=compact
+    returns the text once, with lines, sections, blocks, jobs and bullets as
+    [start, end] offsets into it (see services/compact_result.py).
+    """
+
+    if format not in ('full', 'compact'):
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    compact = format == 'compact'
+    file_extension = _file_extension(file)
+    path, digest = await spool_upload(file, suffix='.' + file_extension)
+    cache_key = _cache_key(file_extension, digest)
+    started = False
 
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
+    def start():
+        # The shared job owns the spooled file from here on
+        nonlocal started
+        started = True
+        return extract_spooled(file_extension, path)
 
-    file_bytes = await file.read()
-    file_extension = file.filename.split('.')[-1].lower()
+    try:
+        cached = await extraction_cache.aget(cache_key)
+        if cached is not None:
+            return load_cached(cached, compact)
 
-    if file_extension == 'pdf':
-        result = extractor.extract_from_pdf(file_bytes)
-    elif file_extension in ['docx', 'doc']:
-        result = extractor.extract_from_word(file_bytes)
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type: {file_extension}"
-        )
+        result = await extraction_pool.flights.do(cache_key, start)
+    finally:
+        if not started:
+            remove_spooled(path)
 
     if not result['success']:
         raise HTTPException(status_code=500, detail=result.get('error', 'Extraction failed'))
@@ -35,4 +75,100 @@ async def extract_document(file: UploadFile = File(...)):
     contact = extractor.extract_contact_info(result['text'])
     result['contact'] = contact
 
-    return result
\ No newline at end of file
+    await extraction_cache.aset(cache_key, cache_payload(result))
+
+    return compact_or_full(result) if compact else result
+
+
+@router.post("/extract/stream")
+async def stream_extract_document(file: UploadFile = File(...)):
+    """
+    Extract a document as newline-delimited JSON events: 'start', then for
+    PDFs a 'page' event per page followed by any 'contact' and 'section'
+    events that page completed, then 'done' ('error' on failure). Each
+    'section' event is one run of lines under a header; a header that
+    appears twice gives two events for the same section.
+    """
+
+    file_extension = _file_extension(file)
+    path, digest = await spool_upload(file, suffix='.' + file_extension)
+    cache_key = _cache_key(file_extension, digest)
+
+    async def events():
+        try:
+            cached = await extraction_cache.aget(cache_key)
+            if cached is not None:
+                for event in result_events(load_cached(cached)):
+                    yield _ndjson(event)
+                return
+
+            if file_extension != 'pdf':
+                result = await extraction_pool.run(extractor.extract_from_word, path)
+                if not result['success']:
+                    yield _ndjson({'event': 'error', 'error': result.get('error', 'Extraction failed')})
+                    return
+                result['contact'] = extractor.extract_contact_info(result['text'])
+                await extraction_cache.aset(cache_key, cache_payload(result))
+                for event in result_events(result):
+                    yield _ndjson(event)
+                return
+
+            # PDFs are never held whole, so streamed results are not cached
+            page_count = await pdf_extractor.count_pages(path)
+            stream = StreamingExtraction(extractor, page_count, pdf_extractor.page_limit(page_count))
+            yield _ndjson(stream.start_event())
+
+            async for page in pdf_extractor.iter_pages(path, stream.pages):
+                for event in stream.feed_page(page.lines, page.engine):
+                    yield _ndjson(event)
+            for event in stream.finish():
+                yield _ndjson(event)
+
+        except Exception as e:
+            yield _ndjson({'event': 'error', 'error': f"Extraction failed: {str(e)}"})
+        finally:
+            remove_spooled(path)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/bulk")
+async def bulk_ingest(file: UploadFile = File(...), job_descriptions: List[str] = Form(...)):
+    """
+    Extract and score every resume in a ZIP archive as newline-delimited JSON
+    events: 'start', a 'file' event per resume as it finishes (with its best
+    score, or the error for that file alone), then one 'candidate' event per
+    resume in rank order by best score across the job descriptions, then
+    'done' with throughput. Send job_descriptions once per JD.
+    """
+
+    if not file.filename or not file.filename.lower().endswith('.zip'):
+        raise HTTPException(status_code=400, detail="Upload a .zip archive of resumes")
+    job_descriptions = [jd for jd in job_descriptions if jd.strip()]
+    if not job_descriptions:
+        raise HTTPException(status_code=400, detail="At least one job description is required")
+
+    path, _ = await spool_upload(file, suffix='.zip')
+    try:
+        members, skipped = bulk_ingestion.list_members(path)
+    except ValueError as e:
+        remove_spooled(path)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        try:
+            async for event in bulk_ingestion.events(path, members, skipped, job_descriptions):
+                yield _ndjson(event)
+        except Exception as e:
+            yield _ndjson({'event': 'error', 'error': f"Bulk ingestion failed: {str(e)}"})
+        finally:
+            remove_spooled(path)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Extraction cache hit/miss counters and per-tier size"""
+
+    return await extraction_cache.astats()
\ No newline at end of file
@@ -1,12 +1,28 @@
 """
 Resume enhancement routes
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional, Union
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from api.routes.scoring import scorer
+from api.services.bullet_variants import MAX_VARIANTS, BulletVariantGenerator
+from api.services.extraction import extractor
+from api.services.job_queue import FINISHED, IdempotencyKeyReused, JobQueue, build_job_store
 from api.services.llm_service import LLMService
+from api.services.section_enhancer import SectionEnhancer
+from api.services.workers import scoring_pool
 
 router = APIRouter()
 llm_service = LLMService()
+section_enhancer = SectionEnhancer(llm_service, extractor, scorer, scoring_pool)
+job_queue = JobQueue(llm_service, build_job_store(), section_enhancer=section_enhancer)
+variant_generator = BulletVariantGenerator(llm_service)
+
+# Idle SSE job streams send a comment this often so proxies keep them open
+KEEP_ALIVE_SECONDS = 15
 
 
 class EnhanceRequest(BaseModel):
@@ -15,21 +31,321 @@ class EnhanceRequest(BaseModel):
     provider: str  # 'openai', 'claude', 'openrouter'
     model: str
     api_key: str
+    bypass_cache: bool = False  # always call the provider, even for a cached request
+    mode: str = 'full'  # 'full' rewrites the whole resume, 'sections' only the parts that can gain score
+
+
+class EnhanceJobRequest(EnhanceRequest):
+    priority: int = 0  # higher runs first
+    webhook_url: Optional[str] = None  # POSTed the finished job
+
+
+class VariantBullet(BaseModel):
+    id: str
+    text: str
+
+
+class VariantJob(BaseModel):
+    title: str = ''
+    bullets: List[Union[str, VariantBullet]]  # plain strings get ids "job-<j>-bullet-<b>"
+
+
+class VariantExperience(BaseModel):
+    jobs: List[VariantJob]
+
+
+class VariantsRequest(BaseModel):
+    experience: VariantExperience  # the extracted sections.experience, as is
+    job_description: str = ''
+    variants: int = 3
+    provider: str
+    model: str
+    api_key: str
+    bypass_cache: bool = False
+
+
+def _variant_bullets(request: VariantsRequest) -> List[dict]:
+    """Validated bullets with ids and job titles, in resume order"""
+
+    if request.provider not in llm_service.clients:
+        raise HTTPException(status_code=400, detail=f'Unknown provider: {request.provider}')
+    if not 1 <= request.variants <= MAX_VARIANTS:
+        raise HTTPException(status_code=400, detail=f'variants must be between 1 and {MAX_VARIANTS}')
+
+    bullets = []
+    for job_index, job in enumerate(request.experience.jobs):
+        for bullet_index, bullet in enumerate(job.bullets):
+            if isinstance(bullet, str):
+                bullet = VariantBullet(id=f'job-{job_index}-bullet-{bullet_index}', text=bullet)
+            if bullet.text.strip():
+                bullets.append({'id': bullet.id, 'text': bullet.text, 'job': job.title})
+    if not bullets:
+        raise HTTPException(status_code=400, detail='No bullets to rewrite')
+    if len({bullet['id'] for bullet in bullets}) < len(bullets):
+        raise HTTPException(status_code=400, detail='Bullet ids must be unique')
+    return bullets
+
+
+ENHANCE_MODES = ('full', 'sections')
+
+
+def _enhancer(mode: str):
+    if mode not in ENHANCE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(ENHANCE_MODES)}")
+    return section_enhancer if mode == 'sections' else llm_service
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 @router.post("/")
 async def enhance_resume(request: EnhanceRequest):
     """Enhance resume using specified LLM provider"""
 
-    result = llm_service.enhance_resume(
+    result = await _enhancer(request.mode).enhance_resume(
         resume=request.resume,
         job_description=request.job_description,
         provider=request.provider,
         model=request.model,
-        api_key=request.api_key
+        api_key=request.api_key,
+        bypass_cache=request.bypass_cache
     )
 
     if not result['success']:
+        # Throttled, overloaded or circuit open: tell the client to come back later
+        if result.get('retryable'):
+            headers = {'Retry-After': str(max(1, round(result['retry_after'])))} if 'retry_after' in result else None
+            raise HTTPException(status_code=503, detail=result.get('error', 'Provider unavailable'), headers=headers)
         raise HTTPException(status_code=500, detail=result.get('error', 'Enhancement failed'))
 
-    return result
\ No newline at end of file
+    return result
+
+
+def _enhancement_tokens(request: EnhanceRequest) -> AsyncIterator[str]:
+    if request.mode == 'sections':
+        return _spliced_resume(request)
+    return llm_service.stream_enhance_resume(
+        resume=request.resume,
+        job_description=request.job_description,
+        provider=request.provider,
+        model=request.model,
+        api_key=request.api_key,
+        bypass_cache=request.bypass_cache
+    )
+
+
+async def _spliced_resume(request: EnhanceRequest) -> AsyncIterator[str]:
+    """Section mode as a single token: rewrites are spliced in once the whole reply is in"""
+    result = await section_enhancer.enhance_resume(
+        resume=request.resume,
+        job_description=request.job_description,
+        provider=request.provider,
+        model=request.model,
+        api_key=request.api_key,
+        bypass_cache=request.bypass_cache
+    )
+    if not result['success']:
+        raise RuntimeError(result.get('error', 'Enhancement failed'))
+    yield result['enhanced_resume']
+
+
+@router.post("/stream")
+async def stream_enhance_resume(request: EnhanceRequest):
+    """
+    Stream the enhanced resume as Server-Sent Events:
+    'token' events carry text as it arrives, then one 'done' event carries
+    the full resume, word count and a fresh ATS score ('error' on failure).
+    """
+
+    if request.provider not in llm_service.clients:
+        raise HTTPException(status_code=400, detail=f'Unknown provider: {request.provider}')
+    _enhancer(request.mode)
+
+    async def events():
+        parts = []
+        try:
+            async for text in _enhancement_tokens(request):
+                parts.append(text)
+                yield _sse('token', {'text': text})
+
+            enhanced = ''.join(parts).strip()
+            ats_score = await scoring_pool.run(scorer.calculate_score, enhanced, request.job_description)
+
+            yield _sse('done', {
+                'success': True,
+                'enhanced_resume': enhanced,
+                'word_count': len(enhanced.split()),
+                'ats_score': ats_score
+            })
+        except Exception as e:
+            yield _sse('error', {'success': False, 'error': str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/variants")
+async def bullet_variants(request: VariantsRequest):
+    """
+    Rewrite every experience bullet in a few concurrent multi-bullet prompts.
+    Returns variants keyed by bullet id, and the ids that got none with why.
+    """
+
+    bullets = _variant_bullets(request)
+    result = await variant_generator.generate(
+        bullets, request.job_description, request.variants,
+        request.provider, request.model, request.api_key, bypass_cache=request.bypass_cache
+    )
+
+    if not result.pop('success'):
+        detail = next(iter(result['failed'].values()))
+        raise HTTPException(status_code=503 if result['retryable'] else 500, detail=detail)
+    return result
+
+
+@router.post("/variants/stream")
+async def stream_bullet_variants(request: VariantsRequest):
+    """
+    Same as /variants, as Server-Sent Events: a 'variants' event with the
+    bullets each prompt answered as it finishes, 'error' for a prompt that
+    failed, then 'done' with the ids that got no variants.
+    """
+
+    bullets = _variant_bullets(request)
+
+    async def events():
+        try:
+            async for event in variant_generator.events(
+                bullets, request.job_description, request.variants,
+                request.provider, request.model, request.api_key, bypass_cache=request.bypass_cache
+            ):
+                yield _sse(event.pop('event'), event)
+        except Exception as e:
+            yield _sse('error', {'success': False, 'error': str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/jobs", status_code=202)
+async def submit_enhance_job(request: EnhanceJobRequest, idempotency_key: Optional[str] = Header(None)):
+    """
+    Queue an enhancement and return its job id at once. Poll
+    GET /jobs/{job_id} or follow GET /jobs/{job_id}/events for the result.
+    Resending with the same Idempotency-Key header and API key returns the
+    first job; the same key with a different request is a 422.
+    """
+
+    if request.provider not in llm_service.clients:
+        raise HTTPException(status_code=400, detail=f'Unknown provider: {request.provider}')
+    _enhancer(request.mode)
+    if request.webhook_url:
+        try:
+            await job_queue.check_webhook(request.webhook_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        job = await job_queue.submit(
+            provider=request.provider,
+            request={
+                'resume': request.resume,
+                'job_description': request.job_description,
+                'model': request.model,
+                'bypass_cache': request.bypass_cache,
+                'mode': request.mode
+            },
+            api_key=request.api_key,
+            priority=request.priority,
+            webhook_url=request.webhook_url,
+            idempotency_key=idempotency_key
+        )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return job.to_dict()
+
+
+@router.get("/jobs/stats")
+async def job_stats():
+    """Queued and running jobs per provider"""
+
+    return job_queue.stats()
+
+
+async def _get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_enhance_job(job_id: str):
+    """Job status, with the result once it has succeeded"""
+
+    return (await _get_job(job_id)).to_dict()
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_enhance_job(job_id: str):
+    """Cancel a queued job; running and finished jobs are left as they are"""
+
+    await _get_job(job_id)
+    return (await job_queue.cancel(job_id)).to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def enhance_job_events(job_id: str):
+    """
+    Server-Sent Events for one job: a 'status' event now and on every
+    change, then 'done' with the finished job.
+    """
+
+    await _get_job(job_id)
+    updates = job_queue.subscribe(job_id)
+
+    async def events():
+        try:
+            job = (await job_queue.get(job_id)).to_dict()
+            while job['status'] not in FINISHED:
+                yield _sse('status', job)
+                job = None
+                while job is None:
+                    try:
+                        job = await asyncio.wait_for(updates.get(), KEEP_ALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+            yield _sse('done', job)
+        finally:
+            job_queue.unsubscribe(job_id, updates)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/providers/stats")
+async def provider_stats():
+    """Circuit breaker state, limits and retry counters per provider"""
+
+    return llm_service.provider_stats()
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Enhancement cache hit/miss counters and size"""
+
+    return await llm_service.cache.astats()
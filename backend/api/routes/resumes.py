@@ -0,0 +1,90 @@
+"""
+Resume index routes
+"""
+import uuid
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from pydantic import BaseModel
+from api.services.extraction import document_extension, extract_spooled, extractor
+from api.services.resume_index import build_resume_index
+from api.services.uploads import spool_upload
+from api.services.workers import scoring_pool
+
+router = APIRouter()
+resume_index = build_resume_index()
+
+
+class ResumeText(BaseModel):
+    text: str
+    metadata: Optional[dict] = None
+
+
+class SearchRequest(BaseModel):
+    job_description: str
+    k: int = 10
+    sections: Optional[List[str]] = None
+
+
+@router.post("")
+async def index_resume(file: UploadFile = File(...), resume_id: Optional[str] = Form(None)):
+    """Extract a PDF or Word resume and add it to the index (replacing any with the same id)"""
+
+    try:
+        file_extension = document_extension(file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    path, _ = await spool_upload(file, suffix='.' + file_extension)
+    result = await extract_spooled(file_extension, path)
+    if not result['success']:
+        raise HTTPException(status_code=500, detail=result.get('error', 'Extraction failed'))
+
+    metadata = {
+        'filename': file.filename,
+        'contact': extractor.extract_contact_info(result['text']),
+        'word_count': result['word_count']
+    }
+    return await scoring_pool.run(resume_index.add, resume_id or uuid.uuid4().hex, result['sections'], metadata)
+
+
+@router.put("/{resume_id}")
+async def put_resume(resume_id: str, request: ResumeText):
+    """Index resume text under resume_id, replacing any earlier version"""
+
+    def add():
+        sections = extractor.parse_sections(request.text.split('\n'))
+        return resume_index.add(resume_id, sections, request.metadata)
+
+    return await scoring_pool.run(add)
+
+
+@router.delete("/{resume_id}")
+async def delete_resume(resume_id: str):
+    """Remove a resume from the index"""
+
+    if not await scoring_pool.run(resume_index.delete, resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return {'deleted': resume_id}
+
+
+@router.post("/search")
+async def search_resumes(request: SearchRequest):
+    """
+    Top k indexed resumes for a job description, with the keywords each
+    matched. Takes tens of milliseconds per 10k resumes indexed (about
+    240 ms at 100k); see the resume_index module docstring.
+    """
+
+    if request.k < 1:
+        raise HTTPException(status_code=400, detail="k must be at least 1")
+    try:
+        return await scoring_pool.run(
+            resume_index.search, request.job_description, request.k, request.sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/stats")
+async def index_stats():
+    """Indexed resumes, terms and postings, and postings size on disk"""
+
+    return await scoring_pool.run(resume_index.stats)
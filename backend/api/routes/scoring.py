@@ -1,9 +1,12 @@
 """
 ATS scoring routes
 """
-from fastapi import APIRouter
+from typing import List
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from api.services.ats_scorer import ATSScorer
+from api.services.single_flight import content_key
+from api.services.workers import scoring_pool
 
 router = APIRouter()
 scorer = ATSScorer()
@@ -14,9 +17,90 @@ class ScoreRequest(BaseModel):
     job_description: str
 
 
+class BatchScoreRequest(BaseModel):
+    resumes: List[str]
+    job_descriptions: List[str]
+    include_breakdown: bool = False
+
+
+class ScoreBlock(BaseModel):
+    id: str
+    text: str
+
+
+class SessionRequest(BaseModel):
+    job_description: str
+    blocks: List[ScoreBlock]
+
+
+class BlockUpdateRequest(BaseModel):
+    text: str
+
+
 @router.post("/calculate")
 async def calculate_score(request: ScoreRequest):
     """Calculate ATS score for resume against job description"""
 
-    result = scorer.calculate_score(request.resume, request.job_description)
-    return result
\ No newline at end of file
+    # Double-clicks and the score-on-change effect send bursts of identical requests
+    result = await scoring_pool.run_shared(
+        ('calculate', content_key(request.resume, request.job_description)),
+        scorer.calculate_score,
+        request.resume,
+        request.job_description
+    )
+    return result
+
+
+@router.post("/batch")
+async def batch_score(request: BatchScoreRequest):
+    """Score many resumes against many job descriptions in one call"""
+
+    result = await scoring_pool.run(
+        scorer.score_matrix,
+        request.resumes,
+        request.job_descriptions,
+        include_breakdown=request.include_breakdown
+    )
+    return result
+
+
+@router.post("/sessions")
+async def create_session(request: SessionRequest):
+    """Open an incremental scoring session over resume blocks"""
+
+    session = await scoring_pool.run(
+        scorer.create_session,
+        request.job_description,
+        [(block.id, block.text) for block in request.blocks]
+    )
+    return {'session_id': session.session_id, **session.score()}
+
+
+def _get_session(session_id: str):
+    session = scorer.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Scoring session not found")
+    return session
+
+
+@router.put("/sessions/{session_id}/blocks/{block_id}")
+async def update_session_block(session_id: str, block_id: str, request: BlockUpdateRequest):
+    """Replace one block's text and rescore only that block"""
+
+    return _get_session(session_id).update_block(block_id, request.text)
+
+
+@router.delete("/sessions/{session_id}/blocks/{block_id}")
+async def remove_session_block(session_id: str, block_id: str):
+    """Remove one block and rescore"""
+
+    return _get_session(session_id).remove_block(block_id)
+
+
+@router.delete("/sessions/{session_id}")
+async def close_session(session_id: str):
+    """Close a scoring session"""
+
+    if not scorer.close_session(session_id):
+        raise HTTPException(status_code=404, detail="Scoring session not found")
+    return {'success': True}
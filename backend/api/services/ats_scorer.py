@@ -1,46 +1,343 @@
 """
 ATS Scoring Service - Honest and realistic scoring
 """
+import hashlib
 import re
-from collections import Counter
-from typing import Dict
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from api.services.metrics import timed
+
+
+COMMON_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'be', 'been',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those',
+    'work', 'using', 'make', 'use', 'need', 'help', 'such'
+})
+
+TOP_KEYWORD_COUNT = 40
+
+SECTION_TERMS = {
+    'experience': ('experience', 'work history', 'employment'),
+    'education': ('education', 'degree', 'university', 'college'),
+    'skills': ('skills', 'technical skills', 'competencies'),
+    'contact': ('email', 'phone', 'linkedin', 'contact')
+}
+
+ACTION_VERBS = (
+    'achieved', 'improved', 'developed', 'managed', 'led', 'created',
+    'implemented', 'designed', 'built', 'increased', 'decreased', 'launched',
+    'delivered', 'optimized', 'streamlined', 'coordinated', 'executed',
+    'spearheaded', 'established', 'drove', 'generated', 'architected', 'engineered'
+)
+
+# Every metric starts with a run of digits, and the character after the run
+# decides which kind it is, so one scan replaces the six separate patterns
+# (\d+%, \$\d+[kKmMbB]?, \d+\+, \d+ years, \d+ months, \d+x).
+METRIC_KINDS = ('percent', 'money', 'plus', 'years', 'months', 'multiplier')
+METRIC_SUFFIX_KINDS = {'%': 'percent', '+': 'plus', ' years': 'years', ' months': 'months', 'x': 'multiplier'}
+METRIC_PATTERN = re.compile(r'(\$?)(\d+)(%|\+| years| months|x|[kKmMbB])?')
+
+
+def keyword_words(text: str, stop_words=COMMON_WORDS) -> List[str]:
+    """Candidate keywords in text: lowercased words, punctuation trimmed, short and stop words dropped"""
+    words = [word.strip('.,!?;:()[]{}') for word in text.lower().split()]
+    return [word for word in words if len(word) > 3 and word not in stop_words]
+
+
+class KeywordMatcher:
+    """Finds which of a fixed set of keywords occur as whole words, in one scan"""
+
+    def __init__(self, keywords: List[str]):
+        """
+        Longest keywords go first so the lookahead reports the longest hit at
+        each position; a keyword that is a prefix of another one can be hidden
+        behind it, so those keep their own pattern and are only checked if the
+        scan did not see them.
+        """
+        self.keywords = list(keywords)
+        self.pattern = None
+        self.fallback_patterns = {}
+
+        if not self.keywords:
+            return
+
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        alternation = '|'.join(re.escape(kw) for kw in ordered)
+        self.pattern = re.compile(r'\b(?=(' + alternation + r')\b)')
+
+        self.fallback_patterns = {
+            kw: re.compile(r'\b' + re.escape(kw) + r'\b')
+            for kw in self.keywords
+            if any(other != kw and other.startswith(kw) for other in self.keywords)
+        }
+
+    def find(self, text_lower: str) -> set:
+        """Return the set of keywords present in already-lowercased text"""
+        if self.pattern is None:
+            return set()
+
+        hits = {m.group(1) for m in self.pattern.finditer(text_lower)}
+        for kw, pattern in self.fallback_patterns.items():
+            if kw not in hits and pattern.search(text_lower):
+                hits.add(kw)
+        return hits
+
+
+class JobDescriptionProfile:
+    """Keyword data for one job description, built once and reused"""
+
+    def __init__(self, job_description: str, stop_words=COMMON_WORDS):
+        self.stop_words = stop_words
+
+        jd_word_freq = Counter(keyword_words(job_description, stop_words))
+
+        self.top_keywords: List[str] = [word for word, _ in jd_word_freq.most_common(TOP_KEYWORD_COUNT)]
+        self.matcher = KeywordMatcher(self.top_keywords)
+
+    def match(self, resume_lower: str) -> List[str]:
+        """Return matched keywords in ranking order"""
+        hits = self.matcher.find(resume_lower)
+        return [kw for kw in self.top_keywords if kw in hits]
+
+
+class ResumeScan:
+    """Raw facts about a resume that the five sub-scores are computed from"""
+
+    __slots__ = ('keywords', 'sections', 'verbs', 'metrics', 'word_count')
+
+    def __init__(self):
+        self.keywords = set()
+        self.sections = set()
+        self.verbs = set()
+        self.metrics = {kind: [] for kind in METRIC_KINDS}
+        self.word_count = 0
+
+    @classmethod
+    def from_text(cls, resume_text: str, keyword_matcher: Optional[KeywordMatcher] = None) -> 'ResumeScan':
+        """Scan the resume once, collecting keyword, section, verb, metric and length data"""
+        scan = cls()
+        resume_lower = resume_text.lower()
+
+        if keyword_matcher is not None:
+            scan.keywords = keyword_matcher.find(resume_lower)
+
+        for name, terms in SECTION_TERMS.items():
+            if any(term in resume_lower for term in terms):
+                scan.sections.add(name)
+
+        scan.verbs.update(verb for verb in ACTION_VERBS if verb in resume_lower)
+
+        metrics = scan.metrics
+        for dollar, digits, suffix in METRIC_PATTERN.findall(resume_text):
+            if dollar:
+                money_suffix = suffix if len(suffix) == 1 and suffix in 'kKmMbB' else ''
+                metrics['money'].append(dollar + digits + money_suffix)
+            kind = METRIC_SUFFIX_KINDS.get(suffix)
+            if kind:
+                metrics[kind].append(digits + suffix)
+
+        scan.word_count = len(resume_text.split())
+        return scan
+
+    def metric_matches(self) -> List[str]:
+        """Metric matches in the order the individual patterns used to report them"""
+        matches = []
+        for kind in METRIC_KINDS:
+            matches.extend(self.metrics[kind])
+        return matches
 
 
 class ATSScorer:
     """Calculate honest ATS scores for resumes"""
 
-    def calculate_score(self, resume_text: str, job_description: str) -> Dict:
+    def __init__(self, profile_cache_size: int = 128, max_sessions: int = 256):
+        self.profile_cache_size = profile_cache_size
+        self._profiles: "OrderedDict[str, JobDescriptionProfile]" = OrderedDict()
+        self._profiles_lock = threading.Lock()
+
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ScoringSession]" = OrderedDict()
+        self._sessions_lock = threading.Lock()
+
+    def get_jd_profile(self, job_description: str) -> JobDescriptionProfile:
+        """Return the cached profile for a job description, building it on first use"""
+        key = hashlib.sha256(job_description.encode('utf-8')).hexdigest()
+
+        with self._profiles_lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                return profile
+
+        profile = JobDescriptionProfile(job_description)
+
+        with self._profiles_lock:
+            self._profiles[key] = profile
+            self._profiles.move_to_end(key)
+            while len(self._profiles) > self.profile_cache_size:
+                self._profiles.popitem(last=False)
+
+        return profile
+
+    def create_session(self, job_description: str, blocks: List[Tuple[str, str]]) -> 'ScoringSession':
+        """Open an incremental scoring session; the oldest sessions are dropped past max_sessions"""
+        session = ScoringSession(self, job_description, blocks)
+
+        with self._sessions_lock:
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+        return session
+
+    def get_session(self, session_id: str) -> Optional['ScoringSession']:
+        """Look up an open scoring session"""
+        with self._sessions_lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def close_session(self, session_id: str) -> bool:
+        """Forget a scoring session, returning whether it existed"""
+        with self._sessions_lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    @timed('calculate_score')
+    def calculate_score(
+        self,
+        resume_text: str,
+        job_description: str,
+        jd_profile: Optional[JobDescriptionProfile] = None
+    ) -> Dict:
         """Calculate comprehensive ATS score"""
         if not resume_text or not job_description:
             return {'score': 0, 'breakdown': {}}
 
+        if jd_profile is None:
+            jd_profile = self.get_jd_profile(job_description)
+
+        scan = ResumeScan.from_text(resume_text, jd_profile.matcher)
+        return self.score_from_scan(scan, jd_profile)
+
+    @timed('score_matrix')
+    def score_matrix(
+        self,
+        resumes: List[str],
+        job_descriptions: List[str],
+        include_breakdown: bool = False
+    ) -> Dict:
+        """
+        Score every resume against every job description.
+        Each JD profile is built once and each resume is scanned once against
+        the union of all JD keywords, giving a resume x keyword presence
+        matrix (one bitmask per resume). Only the keyword sub-score depends on
+        the JD, so the other four are computed once per resume.
+        """
+        profiles = [self.get_jd_profile(jd) if jd else None for jd in job_descriptions]
+
+        vocabulary = []
+        for profile in profiles:
+            if profile is not None:
+                vocabulary.extend(profile.top_keywords)
+        vocabulary = list(dict.fromkeys(vocabulary))
+        keyword_bits = {kw: 1 << i for i, kw in enumerate(vocabulary)}
+        matcher = KeywordMatcher(vocabulary)
+
+        jd_masks = [
+            sum(keyword_bits[kw] for kw in profile.top_keywords) if profile is not None else 0
+            for profile in profiles
+        ]
+
+        scores = []
+        breakdowns = [] if include_breakdown else None
+
+        for resume in resumes:
+            if not resume:
+                scores.append([0] * len(profiles))
+                if include_breakdown:
+                    breakdowns.append([{} for _ in profiles])
+                continue
+
+            scan = ResumeScan.from_text(resume, matcher)
+            resume_mask = sum(keyword_bits[kw] for kw in scan.keywords)
+
+            sections_result = self._score_sections(scan)
+            verbs_result = self._score_action_verbs(scan)
+            metrics_result = self._score_metrics(scan)
+            length_result = self._score_length(scan)
+
+            row = []
+            breakdown_row = []
+            for profile, jd_mask in zip(profiles, jd_masks):
+                if profile is None:
+                    row.append(0)
+                    breakdown_row.append({})
+                    continue
+
+                total = len(profile.top_keywords)
+                matched = bin(resume_mask & jd_mask).count('1')
+                keyword_score = (matched / total) * 50 if total else 0
+
+                # Same summation order as score_from_scan so results are identical
+                score = 0
+                score += keyword_score
+                score += sections_result['score']
+                score += verbs_result['score']
+                score += metrics_result['score']
+                score += length_result['score']
+                row.append(round(max(0, min(score, 100)), 1))
+
+                if include_breakdown:
+                    breakdown_row.append({
+                        'keywords': self._score_keywords(scan, profile),
+                        'sections': sections_result,
+                        'action_verbs': verbs_result,
+                        'metrics': metrics_result,
+                        'length': length_result
+                    })
+
+            scores.append(row)
+            if include_breakdown:
+                breakdowns.append(breakdown_row)
+
+        result = {'scores': scores}
+        if include_breakdown:
+            result['breakdowns'] = breakdowns
+        return result
+
+    def score_from_scan(self, scan: ResumeScan, jd_profile: JobDescriptionProfile) -> Dict:
+        """Turn a resume scan into the score and breakdown"""
         score = 0
         breakdown = {}
-        resume_lower = resume_text.lower()
-        jd_lower = job_description.lower()
 
         # 1. Keyword Matching (50 points) - STRICT
-        keyword_result = self._score_keywords(resume_lower, jd_lower)
+        keyword_result = self._score_keywords(scan, jd_profile)
         score += keyword_result['score']
         breakdown['keywords'] = keyword_result
 
         # 2. Essential Sections (20 points)
-        sections_result = self._score_sections(resume_lower)
+        sections_result = self._score_sections(scan)
         score += sections_result['score']
         breakdown['sections'] = sections_result
 
         # 3. Action Verbs (15 points)
-        verbs_result = self._score_action_verbs(resume_lower)
+        verbs_result = self._score_action_verbs(scan)
         score += verbs_result['score']
         breakdown['action_verbs'] = verbs_result
 
         # 4. Quantifiable Achievements (10 points)
-        metrics_result = self._score_metrics(resume_text)
+        metrics_result = self._score_metrics(scan)
         score += metrics_result['score']
         breakdown['metrics'] = metrics_result
 
         # 5. Resume Length (5 points)
-        length_result = self._score_length(resume_text)
+        length_result = self._score_length(scan)
         score += length_result['score']
         breakdown['length'] = length_result
 
@@ -49,26 +346,10 @@ class ATSScorer:
             'breakdown': breakdown
         }
 
-    def _score_keywords(self, resume: str, jd: str) -> Dict:
+    def _score_keywords(self, scan: ResumeScan, profile: JobDescriptionProfile) -> Dict:
         """Score keyword matching"""
-        common_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'be', 'been',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-            'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those',
-            'work', 'using', 'make', 'use', 'need', 'help', 'such'
-        }
-
-        jd_words = [word.strip('.,!?;:()[]{}') for word in jd.split()]
-        jd_words = [word for word in jd_words if len(word) > 3 and word not in common_words]
-        jd_word_freq = Counter(jd_words)
-
-        top_keywords = [word for word, _ in jd_word_freq.most_common(40)]
-
-        matched = []
-        for kw in top_keywords:
-            if re.search(r'\b' + re.escape(kw) + r'\b', resume):
-                matched.append(kw)
+        top_keywords = profile.top_keywords
+        matched = [kw for kw in top_keywords if kw in scan.keywords]
 
         score = (len(matched) / len(top_keywords)) * 50 if top_keywords else 0
 
@@ -79,38 +360,21 @@ class ATSScorer:
             'keywords': matched[:10]  # Top 10 for display
         }
 
-    def _score_sections(self, resume: str) -> Dict:
+    def _score_sections(self, scan: ResumeScan) -> Dict:
         """Score essential sections presence"""
-        sections = {
-            'experience': r'(experience|work history|employment)',
-            'education': r'(education|degree|university|college)',
-            'skills': r'(skills|technical skills|competencies)',
-            'contact': r'(email|phone|linkedin|contact)'
-        }
-
-        found = []
-        for name, pattern in sections.items():
-            if re.search(pattern, resume):
-                found.append(name)
+        found = [name for name in SECTION_TERMS if name in scan.sections]
 
         score = len(found) * 5
 
         return {
             'score': score,
             'found': found,
-            'missing': [s for s in sections.keys() if s not in found]
+            'missing': [s for s in SECTION_TERMS if s not in found]
         }
 
-    def _score_action_verbs(self, resume: str) -> Dict:
+    def _score_action_verbs(self, scan: ResumeScan) -> Dict:
         """Score action verb usage"""
-        action_verbs = [
-            'achieved', 'improved', 'developed', 'managed', 'led', 'created',
-            'implemented', 'designed', 'built', 'increased', 'decreased', 'launched',
-            'delivered', 'optimized', 'streamlined', 'coordinated', 'executed',
-            'spearheaded', 'established', 'drove', 'generated', 'architected', 'engineered'
-        ]
-
-        found = [verb for verb in action_verbs if verb in resume]
+        found = [verb for verb in ACTION_VERBS if verb in scan.verbs]
         count = len(found)
 
         score = min(15, (count / 12) * 15)
@@ -121,20 +385,9 @@ class ATSScorer:
             'verbs': found[:8]
         }
 
-    def _score_metrics(self, resume: str) -> Dict:
+    def _score_metrics(self, scan: ResumeScan) -> Dict:
         """Score quantifiable achievements"""
-        patterns = [
-            r'\d+%',
-            r'\$\d+[kKmMbB]?',
-            r'\d+\+',
-            r'\d+ years',
-            r'\d+ months',
-            r'\d+x'
-        ]
-
-        metrics = []
-        for pattern in patterns:
-            metrics.extend(re.findall(pattern, resume))
+        metrics = scan.metric_matches()
 
         count = len(metrics)
         score = min(10, (count / 6) * 10)
@@ -145,9 +398,9 @@ class ATSScorer:
             'examples': metrics[:5]
         }
 
-    def _score_length(self, resume: str) -> Dict:
+    def _score_length(self, scan: ResumeScan) -> Dict:
         """Score resume length appropriateness"""
-        word_count = len(resume.split())
+        word_count = scan.word_count
 
         if 450 <= word_count <= 750:
             score = 5
@@ -163,4 +416,97 @@ class ATSScorer:
             'score': score,
             'word_count': word_count,
             'feedback': feedback
-        }
\ No newline at end of file
+        }
+
+
+class ScoringSession:
+    """
+    Incremental scoring for a resume made of editable blocks.
+    The resume is the blocks joined with newlines, exactly as the Interactive
+    Studio builds it. Each block keeps its own ResumeScan and the session keeps
+    running totals, so editing one block only rescans that block.
+    """
+
+    def __init__(self, scorer: ATSScorer, job_description: str, blocks: List[Tuple[str, str]]):
+        self.session_id = uuid.uuid4().hex
+        self.scorer = scorer
+        self.job_description = job_description
+        self.jd_profile = scorer.get_jd_profile(job_description) if job_description else None
+
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+        self._scans: Dict[str, ResumeScan] = {}
+        self._keyword_counts = Counter()
+        self._section_counts = Counter()
+        self._verb_counts = Counter()
+        self._word_count = 0
+        self._lock = threading.Lock()
+
+        for block_id, text in blocks:
+            self._set_block(block_id, text)
+
+    @property
+    def block_ids(self) -> List[str]:
+        return list(self._texts)
+
+    @timed('session_update')
+    def update_block(self, block_id: str, text: str) -> Dict:
+        """Replace (or append) one block and return the new score"""
+        with self._lock:
+            self._set_block(block_id, text)
+            return self._score()
+
+    @timed('session_update')
+    def remove_block(self, block_id: str) -> Dict:
+        """Drop one block and return the new score"""
+        with self._lock:
+            if block_id in self._texts:
+                self._apply(self._scans.pop(block_id), -1)
+                del self._texts[block_id]
+            return self._score()
+
+    def score(self) -> Dict:
+        """Current score, identical to calculate_score on the joined blocks"""
+        with self._lock:
+            return self._score()
+
+    def _set_block(self, block_id: str, text: str):
+        old_scan = self._scans.get(block_id)
+        if old_scan is not None:
+            if self._texts[block_id] == text:
+                return
+            self._apply(old_scan, -1)
+
+        matcher = self.jd_profile.matcher if self.jd_profile is not None else None
+        scan = ResumeScan.from_text(text, matcher)
+        self._texts[block_id] = text
+        self._scans[block_id] = scan
+        self._apply(scan, 1)
+
+    def _apply(self, scan: ResumeScan, sign: int):
+        for counts, terms in (
+            (self._keyword_counts, scan.keywords),
+            (self._section_counts, scan.sections),
+            (self._verb_counts, scan.verbs)
+        ):
+            for term in terms:
+                counts[term] += sign
+                if counts[term] <= 0:
+                    del counts[term]
+        self._word_count += sign * scan.word_count
+
+    def _score(self) -> Dict:
+        # Joining zero blocks, or a single empty one, gives an empty resume
+        texts = list(self._texts.values())
+        if self.jd_profile is None or not texts or (len(texts) == 1 and not texts[0]):
+            return {'score': 0, 'breakdown': {}}
+
+        combined = ResumeScan()
+        combined.keywords = set(self._keyword_counts)
+        combined.sections = set(self._section_counts)
+        combined.verbs = set(self._verb_counts)
+        combined.word_count = self._word_count
+        for block_id in self._texts:
+            for kind, matches in self._scans[block_id].metrics.items():
+                combined.metrics[kind].extend(matches)
+
+        return self.scorer.score_from_scan(combined, self.jd_profile)
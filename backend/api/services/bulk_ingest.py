@@ -0,0 +1,174 @@
+"""
+Bulk Ingestion - extract and score every resume in a ZIP archive
+- Each archive member is one extraction pool job: the worker reads the
+  member from the spooled archive itself, extracts it and scores it against
+  every job description, so only the scores and contact details come back
+- One bad file becomes an 'error' event for that file; the rest carry on
+- Results stream as NDJSON-ready events: 'start', a 'file' event per file
+  as it finishes (progress), then 'candidate' events in rank order, 'done'
+Limits come from BULK_* environment variables.
+"""
+import asyncio
+import os
+import time
+import zipfile
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from api.services.ats_scorer import ATSScorer
+from api.services.config import env_int
+from api.services.document_extractor import DocumentExtractor
+from api.services.metrics import span
+from api.services.workers import WorkerPool
+
+SUPPORTED_EXTENSIONS = ('pdf', 'docx', 'doc')
+
+# One per worker process, so each JD profile is built once per worker
+_scorer = ATSScorer()
+
+
+def ingest_member(
+    extractor: DocumentExtractor,
+    archive_path: str,
+    member: str,
+    job_descriptions: List[str],
+    max_pages: Optional[int] = None
+) -> Dict:
+    """Extract one archive member and score it against every JD; runs in a pool worker"""
+    with span('bulk_file'):
+        try:
+            with zipfile.ZipFile(archive_path) as archive:
+                data = archive.read(member)
+        except Exception as e:
+            return {'success': False, 'error': f"Could not read file from archive: {str(e)}"}
+
+        if member.rsplit('.', 1)[-1].lower() == 'pdf':
+            result = extractor.extract_from_pdf(data, max_pages=max_pages)
+        else:
+            result = extractor.extract_from_word(data)
+        if not result['success']:
+            return {'success': False, 'error': result.get('error', 'Extraction failed')}
+
+        text = result['text']
+        scores = _scorer.score_matrix([text], job_descriptions)['scores'][0]
+        return {
+            'success': True,
+            'scores': scores,
+            'contact': extractor.extract_contact_info(text),
+            'word_count': result['word_count'],
+            'truncated': result.get('truncated', False)
+        }
+
+
+class BulkIngestion:
+    """Fan an archive's resumes out across the extraction pool and rank them"""
+
+    def __init__(
+        self,
+        extractor: DocumentExtractor,
+        pool: WorkerPool,
+        max_files: Optional[int] = None,
+        max_file_bytes: Optional[int] = None,
+        max_pages: Optional[int] = None
+    ):
+        self.extractor = extractor
+        self.pool = pool
+        self.max_files = max_files if max_files is not None else env_int('BULK_MAX_FILES', 1000)
+        # Uncompressed size, so a small archive can't expand into gigabytes
+        self.max_file_bytes = max_file_bytes if max_file_bytes is not None else env_int(
+            'BULK_MAX_FILE_BYTES', 20 * 1024 * 1024)
+        self.max_pages = max_pages if max_pages is not None else env_int('PDF_MAX_PAGES', 50)
+
+    def list_members(self, archive_path: str) -> Tuple[List[str], List[Dict]]:
+        """
+        (members to ingest, skipped entries with the reason) in archive order.
+        Raises ValueError if the archive can't be read or holds too many files.
+        """
+        try:
+            with zipfile.ZipFile(archive_path) as archive:
+                infos = archive.infolist()
+        except (zipfile.BadZipFile, OSError) as e:
+            raise ValueError(f"Not a readable ZIP archive: {str(e)}")
+
+        members, skipped = [], []
+        for info in infos:
+            name = info.filename
+            # Folders and macOS resource forks are not resumes
+            if info.is_dir() or name.startswith('__MACOSX/') or os.path.basename(name).startswith('.'):
+                continue
+            extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+            if extension not in SUPPORTED_EXTENSIONS:
+                skipped.append({'file': name, 'error': f"Unsupported file type: {extension or 'none'}"})
+            elif info.file_size > self.max_file_bytes:
+                skipped.append({'file': name, 'error': f"File is larger than {self.max_file_bytes} bytes"})
+            else:
+                members.append(name)
+
+        if len(members) > self.max_files:
+            raise ValueError(f"Archive holds {len(members)} resumes; the limit is {self.max_files}")
+        return members, skipped
+
+    async def events(
+        self,
+        archive_path: str,
+        members: List[str],
+        skipped: List[Dict],
+        job_descriptions: List[str]
+    ) -> AsyncIterator[Dict]:
+        started = time.perf_counter()
+        total = len(members) + len(skipped)
+        yield {'event': 'start', 'files': total, 'job_descriptions': len(job_descriptions)}
+
+        completed = 0
+        for entry in skipped:
+            completed += 1
+            yield {'event': 'file', 'file': entry['file'], 'success': False, 'error': entry['error'],
+                   'completed': completed, 'total': total}
+
+        async def run(member: str) -> Tuple[str, Dict]:
+            try:
+                result = await self.pool.run(
+                    ingest_member, self.extractor, archive_path, member, job_descriptions, self.max_pages)
+            except Exception as e:
+                # A crashed worker fails this file only
+                result = {'success': False, 'error': f"Extraction failed: {str(e)}"}
+            return member, result
+
+        # The pool's semaphore bounds how many are queued in the executor
+        tasks = [asyncio.ensure_future(run(member)) for member in members]
+        candidates = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                member, result = await next_done
+                completed += 1
+                event = {'event': 'file', 'file': member, 'success': result['success'],
+                         'completed': completed, 'total': total}
+                if result['success']:
+                    best = max(range(len(result['scores'])), key=result['scores'].__getitem__)
+                    candidate = {'file': member, 'best_score': result['scores'][best], 'best_job': best,
+                                 **{key: value for key, value in result.items() if key != 'success'}}
+                    candidates.append(candidate)
+                    event['best_score'] = candidate['best_score']
+                else:
+                    event['error'] = result['error']
+                yield event
+        finally:
+            # Client went away: don't leave the pool busy with an abandoned archive
+            for task in tasks:
+                task.cancel()
+
+        candidates.sort(key=lambda candidate: (-candidate['best_score'], candidate['file']))
+        for rank, candidate in enumerate(candidates, 1):
+            yield {'event': 'candidate', 'rank': rank, **candidate}
+
+        elapsed = time.perf_counter() - started
+        per_second = len(members) / elapsed if elapsed else 0.0
+        cores = min(self.pool.max_workers, os.cpu_count() or 1)
+        yield {
+            'event': 'done',
+            'files': total,
+            'succeeded': len(candidates),
+            'failed': total - len(candidates),
+            'seconds': round(elapsed, 3),
+            'resumes_per_second': round(per_second, 2),
+            'resumes_per_second_per_core': round(per_second / max(1, cores), 2)
+        }
@@ -0,0 +1,207 @@
+"""
+Bullet Variants - rewrite many resume bullets in a few LLM round trips
+- Bullets from experience.jobs[].bullets are packed into prompts of up to
+  VARIANT_BULLETS_PER_PROMPT, grouped under their job title, so the job
+  description is sent once per prompt rather than once per bullet
+- Prompts run concurrently (VARIANT_CONCURRENCY at a time) through
+  LLMService.complete, so rate limits, retries, fallback and the response
+  cache all apply
+- Replies are JSON keyed by bullet id; bullets a reply leaves out are asked
+  for once more, in fresh prompts
+"""
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from api.services.config import env_int
+from api.services.document_extractor import BULLET_MARKERS, NUMBERED_BULLET
+from api.services.llm_service import LLMService
+
+MAX_VARIANTS = 5
+
+
+def bullet_text(text: str) -> str:
+    """A bullet without its marker or number"""
+    text = text.strip()
+    if text.startswith(BULLET_MARKERS):
+        return text[1:].strip()
+    match = NUMBERED_BULLET.match(text)
+    return text[match.end():].strip() if match else text
+
+
+def build_prompt(bullets: List[Dict], job_description: str, variants: int) -> str:
+    """One prompt asking for `variants` rewrites of each bullet, keyed by id"""
+    lines = []
+    job = None
+    for bullet in bullets:
+        if bullet['job'] != job:
+            job = bullet['job']
+            lines.append(f"\nJob: {job or 'untitled'}")
+        lines.append(f"[{bullet['id']}] {bullet_text(bullet['text'])}")
+
+    target = (
+        f"Work in keywords from this job description wherever they truthfully fit:\n{job_description.strip()}\n\n"
+        if job_description.strip() else ''
+    )
+    example = json.dumps({bullets[0]['id']: [f'variant {n}' for n in range(1, variants + 1)]})
+    return f"""Rewrite each resume bullet below in {variants} different ways for an ATS-optimized resume.
+
+{target}Every variant must:
+- keep the facts of the original: no invented employers, tools or numbers
+- open with a strong action verb (led, developed, implemented, optimized, delivered)
+- keep any metrics, and stay within about 10 words of the original length
+- be one line of plain text with no bullet marker
+
+Bullets, by job, each with its id in brackets:
+{chr(10).join(lines)}
+
+Return ONLY a JSON object with every id above as a key and a list of {variants} strings as its value, e.g.
+{example}"""
+
+
+def json_object(reply: str) -> Dict:
+    """The JSON object in a reply, code fences or chatter around it ignored; {} if there is none"""
+    start, end = reply.find('{'), reply.rfind('}')
+    if start < 0 or end < start:
+        return {}
+    try:
+        parsed = json.loads(reply[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def parse_variants(reply: str, ids: List[str], variants: int) -> Dict[str, List[str]]:
+    """Variants per bullet id from a JSON reply; ids that are missing or empty are left out"""
+    parsed = json_object(reply)
+    found = {}
+    for bullet_id in ids:
+        value = parsed.get(bullet_id)
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list):
+            continue
+        texts = [bullet_text(item) for item in value if isinstance(item, str) and item.strip()]
+        if texts:
+            found[bullet_id] = texts[:variants]
+    return found
+
+
+class BulletVariantGenerator:
+    """Variants for many bullets from a few concurrent multi-bullet prompts"""
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        bullets_per_prompt: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.llm_service = llm_service
+        self.bullets_per_prompt = max(1, bullets_per_prompt or env_int('VARIANT_BULLETS_PER_PROMPT', 10))
+        self.concurrency = max(1, concurrency or env_int('VARIANT_CONCURRENCY', 4))
+
+    def pack(self, bullets: List[Dict]) -> List[List[Dict]]:
+        """Bullets in order, split into the fewest prompts; evenly sized so they finish together"""
+        if not bullets:
+            return []
+        prompts = -(-len(bullets) // self.bullets_per_prompt)
+        size = -(-len(bullets) // prompts)
+        return [bullets[start:start + size] for start in range(0, len(bullets), size)]
+
+    @staticmethod
+    def _request(bullets: List[Dict], job_description: str, variants: int) -> Dict:
+        words = sum(len(bullet['text'].split()) for bullet in bullets)
+        return {
+            'prompt': build_prompt(bullets, job_description, variants),
+            # Varied wording is the point
+            'temperature': 0.8,
+            # About two tokens a word, plus JSON quoting and ids
+            'max_tokens': min(8000, 200 + variants * (2 * words + 20 * len(bullets)))
+        }
+
+    async def events(
+        self,
+        bullets: List[Dict],
+        job_description: str,
+        variants: int,
+        provider: str,
+        model: str,
+        api_key: str,
+        bypass_cache: bool = False
+    ) -> AsyncIterator[Dict]:
+        """
+        'variants' events as each prompt is answered, 'error' events for
+        prompts the provider failed, then 'done'. bullets are dicts with
+        'id', 'text' and 'job' (the job title).
+        """
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        completed, failed = set(), {}
+        prompts = 0
+
+        async def run(chunk: List[Dict], bypass: bool):
+            request = self._request(chunk, job_description, variants)
+            async with semaphore:
+                result = await self.llm_service.complete(
+                    lambda name: request, provider, model, api_key, bypass_cache=bypass)
+            return chunk, result
+
+        pending = self.pack(bullets)
+        for attempt in range(2):
+            # A retry must not be answered with the cached reply that left bullets out
+            tasks = [asyncio.ensure_future(run(chunk, bypass_cache or attempt > 0)) for chunk in pending]
+            prompts += len(tasks)
+            missing = []
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    chunk, result = await next_done
+                    ids = [bullet['id'] for bullet in chunk]
+                    if not result['success']:
+                        failed.update((bullet_id, result['error']) for bullet_id in ids)
+                        yield {'event': 'error', 'ids': ids, 'error': result['error'],
+                               'retryable': result.get('retryable', False)}
+                        continue
+                    found = parse_variants(result['text'], ids, variants)
+                    if found:
+                        completed.update(found)
+                        yield {'event': 'variants', 'variants': found, 'cached': result['cached']}
+                    missing.extend(bullet for bullet in chunk if bullet['id'] not in found)
+            finally:
+                # Client went away: stop waiting on the remaining prompts
+                for task in tasks:
+                    task.cancel()
+            if not missing:
+                break
+            pending = self.pack(missing)
+
+        for bullet in missing:
+            failed[bullet['id']] = 'No variants in the provider reply'
+        yield {
+            'event': 'done',
+            'bullets': len(bullets),
+            'completed': len(completed),
+            'failed': failed,
+            'prompts': prompts,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+
+    async def generate(self, *args, **kwargs) -> Dict:
+        """All variants at once: the events() arguments, collected into one response"""
+        variants: Dict[str, List[str]] = {}
+        retryable = False
+        async for event in self.events(*args, **kwargs):
+            if event['event'] == 'variants':
+                variants.update(event['variants'])
+            elif event['event'] == 'error':
+                retryable = retryable or event['retryable']
+            else:
+                done = event
+        return {
+            'success': bool(variants) or not done['failed'],
+            'variants': variants,
+            'failed': done['failed'],
+            'retryable': retryable,
+            'prompts': done['prompts'],
+            'seconds': done['seconds']
+        }
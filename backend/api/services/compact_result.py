@@ -0,0 +1,325 @@
+"""
+Compact Extraction Result - one text buffer, everything else as offsets
+- A full result holds the resume three or four times over: 'text', 'lines',
+  each section's 'content' and 'lines', then again in blocks, jobs and bullets
+- CompactResult keeps the text once. Lines, section runs, blocks, jobs,
+  titles and bullets are (start, end) offsets into it, held flat in
+  array('I') inside __slots__ objects
+- Offsets count Unicode code points, as Python indexes str. JavaScript
+  indexes UTF-16 code units, so text with characters outside the BMP
+  (emoji, mathematical letters) must be sliced by code point there; the
+  payload says so in 'offset_unit'
+- to_dict() is the ?format=compact payload; expand() rebuilds the full
+  result exactly, so one cached copy serves both formats
+- from_result() checks that round trip and raises ValueError if the result
+  can't be expressed as offsets, so callers can keep the full form instead
+"""
+import json
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from api.services.extraction_pipeline import SECTION_NAMES, empty_section
+
+FORMAT = 'compact'
+OFFSET_UNIT = 'codepoint'
+
+
+def _trimmed_lines(text: str) -> List[str]:
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+class Spans:
+    """(start, end) offset pairs into one text, stored flat in an array"""
+
+    __slots__ = ('offsets',)
+
+    def __init__(self, offsets: Iterable[int] = ()):
+        self.offsets = array('I', offsets)
+
+    def add(self, start: int, end: int):
+        self.offsets.append(start)
+        self.offsets.append(end)
+
+    def __len__(self) -> int:
+        return len(self.offsets) // 2
+
+    def pairs(self) -> Iterable[Tuple[int, int]]:
+        offsets = self.offsets
+        return zip(offsets[::2], offsets[1::2])
+
+    def texts(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.pairs()]
+
+    def to_list(self) -> List[int]:
+        return self.offsets.tolist()
+
+
+class CompactJob:
+    """A job: the span of all its lines, its title and its bullets"""
+
+    __slots__ = ('start', 'end', 'title_start', 'title_end', 'bullets')
+
+    def __init__(self, start: int, end: int, title_start: int, title_end: int, bullets: Spans):
+        self.start = start
+        self.end = end
+        self.title_start = title_start
+        self.title_end = title_end
+        self.bullets = bullets
+
+    def to_dict(self) -> Dict:
+        return {'span': [self.start, self.end], 'title': [self.title_start, self.title_end],
+                'bullets': self.bullets.to_list()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CompactJob':
+        return cls(data['span'][0], data['span'][1], data['title'][0], data['title'][1], Spans(data['bullets']))
+
+    def expand(self, text: str) -> Dict:
+        return {
+            'title': text[self.title_start:self.title_end],
+            'lines': [line for line in text[self.start:self.end].split('\n') if line.strip()],
+            'bullets': self.bullets.texts(text)
+        }
+
+
+class CompactSection:
+    """
+    A section as runs of consecutive lines (more than one when its header
+    appears twice), plus its blocks or jobs. A block spanning two lines (an
+    education entry and its university) reads back with each line trimmed.
+    """
+
+    __slots__ = ('runs', 'blocks', 'bullet_blocks', 'jobs')
+
+    def __init__(self, runs: Spans, blocks: Optional[Spans] = None,
+                 bullet_blocks: Iterable[int] = (), jobs: Optional[List[CompactJob]] = None):
+        self.runs = runs
+        self.blocks = blocks
+        # Indexes of the blocks that are bullets; the rest are plain text
+        self.bullet_blocks = array('I', bullet_blocks)
+        self.jobs = jobs
+
+    def to_dict(self) -> Dict:
+        data = {'runs': self.runs.to_list()}
+        if self.jobs is not None:
+            data['jobs'] = [job.to_dict() for job in self.jobs]
+        else:
+            data['blocks'] = self.blocks.to_list()
+            data['bullet_blocks'] = self.bullet_blocks.tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CompactSection':
+        if 'jobs' in data:
+            return cls(Spans(data['runs']), jobs=[CompactJob.from_dict(job) for job in data['jobs']])
+        return cls(Spans(data['runs']), Spans(data['blocks']), data['bullet_blocks'])
+
+    def expand(self, name: str, text: str) -> Dict:
+        section = empty_section(name)
+        lines = section['lines']
+        for run in self.runs.texts(text):
+            lines.extend(line for line in run.split('\n') if line.strip())
+        section['content'] = '\n'.join(lines)
+        if self.jobs is not None:
+            section['jobs'] = [job.expand(text) for job in self.jobs]
+        else:
+            bullets = set(self.bullet_blocks)
+            section['blocks'] = [
+                {'text': '\n'.join(_trimmed_lines(block)), 'type': 'bullet' if index in bullets else 'text'}
+                for index, block in enumerate(self.blocks.texts(text))
+            ]
+        return section
+
+
+class CompactResult:
+    """An extraction result with the resume text held once"""
+
+    __slots__ = ('text', 'lines', 'sections', 'fields')
+
+    def __init__(self, text: str, lines: Spans, sections: Dict[str, CompactSection], fields: Dict):
+        self.text = text
+        self.lines = lines
+        self.sections = sections
+        # Everything else: success, word_count, line_count, engine, contact, truncated, ...
+        self.fields = fields
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.fields,
+            'format': FORMAT,
+            'offset_unit': OFFSET_UNIT,
+            'text': self.text,
+            'lines': self.lines.to_list(),
+            'sections': {name: section.to_dict() for name, section in self.sections.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CompactResult':
+        fields = {
+            key: value for key, value in data.items()
+            if key not in ('format', 'offset_unit', 'text', 'lines', 'sections')
+        }
+        sections = {name: CompactSection.from_dict(section) for name, section in data['sections'].items()}
+        return cls(data['text'], Spans(data['lines']), sections, fields)
+
+    def expand(self) -> Dict:
+        """The full result, as the extractor returned it"""
+        text = self.text
+        result = {
+            'success': self.fields.get('success', True),
+            'text': text,
+            'sections': {
+                name: self.sections[name].expand(name, text) if name in self.sections else empty_section(name)
+                for name in SECTION_NAMES
+            },
+            'lines': self.lines.texts(text)
+        }
+        result.update((key, value) for key, value in self.fields.items() if key != 'success')
+        return result
+
+    @classmethod
+    def from_result(cls, result: Dict) -> 'CompactResult':
+        """Offsets for a full extraction result; ValueError unless expand() gives it back exactly"""
+        text, lines = result['text'], result['lines']
+        if text != '\n'.join(lines):
+            raise ValueError("Result text is not its lines joined")
+
+        starts = []
+        position = 0
+        for line in lines:
+            starts.append(position)
+            position += len(line) + 1
+        line_spans = Spans()
+        for start, line in zip(starts, lines):
+            line_spans.add(start, start + len(line))
+
+        owners = _section_lines(lines, result['sections'])
+        sections = {}
+        for name, indexes in owners.items():
+            section_data = result['sections'][name]
+            runs = Spans()
+            # Consecutive lines of the section, blank lines between them included
+            run_first = indexes[0]
+            for previous, index in zip(indexes, indexes[1:] + [None]):
+                if index is not None and all(not line.strip() for line in lines[previous + 1:index]):
+                    continue
+                runs.add(starts[run_first], starts[previous] + len(lines[previous]))
+                run_first = index
+
+            locator = _Locator(lines, starts, indexes)
+            if name == 'experience':
+                jobs = [locator.job(job) for job in section_data['jobs']]
+                sections[name] = CompactSection(runs, jobs=jobs)
+            else:
+                blocks, bullet_blocks = Spans(), []
+                for number, block in enumerate(section_data['blocks']):
+                    blocks.add(*locator.block(block['text']))
+                    if block['type'] == 'bullet':
+                        bullet_blocks.append(number)
+                sections[name] = CompactSection(runs, blocks, bullet_blocks)
+
+        fields = {key: value for key, value in result.items() if key not in ('text', 'lines', 'sections')}
+        compact = cls(text, line_spans, sections, fields)
+        if compact.expand() != result:
+            raise ValueError("Result can't be expressed as offsets into its text")
+        return compact
+
+
+def _section_lines(lines: List[str], sections: Dict) -> Dict[str, List[int]]:
+    """Line indexes of each non-empty section, matching section lines against the document in order"""
+    pending = {name: section['lines'] for name, section in sections.items() if section['lines']}
+    positions = {name: 0 for name in pending}
+    owners: Dict[str, List[int]] = {name: [] for name in pending}
+    current = None
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        candidates = [name for name in pending
+                      if positions[name] < len(pending[name]) and pending[name][positions[name]] == line]
+        if not candidates:
+            raise ValueError(f"Line {index} belongs to no section")
+        # The same line text in two sections: stay in the section we are in
+        current = current if current in candidates else candidates[0]
+        owners[current].append(index)
+        positions[current] += 1
+    if any(positions[name] != len(pending[name]) for name in pending):
+        raise ValueError("Section lines are missing from the document")
+    return owners
+
+
+class _Locator:
+    """Finds blocks, jobs and bullets among one section's lines, in order"""
+
+    def __init__(self, lines: List[str], starts: List[int], indexes: List[int]):
+        self.lines = lines
+        self.starts = starts
+        self.indexes = indexes
+        self.position = 0
+
+    def _stripped_span(self, index: int) -> Tuple[int, int]:
+        line = self.lines[index]
+        start = self.starts[index] + len(line) - len(line.lstrip())
+        return start, self.starts[index] + len(line.rstrip())
+
+    def _find(self, matches) -> int:
+        """Position (into indexes) of the next line that matches, moving past it"""
+        while self.position < len(self.indexes):
+            position = self.position
+            self.position += 1
+            if matches(self.lines[self.indexes[position]]):
+                return position
+        raise ValueError("Section item not found among its lines")
+
+    def block(self, block_text: str) -> Tuple[int, int]:
+        parts = block_text.split('\n')
+        first = self._find(lambda line: line.strip() == parts[0])
+        last = first + len(parts) - 1
+        if last >= len(self.indexes):
+            raise ValueError("Block runs past its section")
+        self.position = last + 1
+        return self._stripped_span(self.indexes[first])[0], self._stripped_span(self.indexes[last])[1]
+
+    def job(self, job: Dict) -> CompactJob:
+        first = self._find(lambda line: line == job['lines'][0])
+        last = first + len(job['lines']) - 1
+        if last >= len(self.indexes):
+            raise ValueError("Job runs past its section")
+        title_start, title_end = self._stripped_span(self.indexes[first])
+
+        bullets = Spans()
+        self.position = first + 1
+        for bullet in job['bullets']:
+            bullets.add(*self._stripped_span(self.indexes[self._find(lambda line: line.strip() == bullet)]))
+        self.position = last + 1
+
+        start = self.starts[self.indexes[first]]
+        end = self.starts[self.indexes[last]] + len(self.lines[self.indexes[last]])
+        return CompactJob(start, end, title_start, title_end, bullets)
+
+
+def cache_payload(result: Dict) -> str:
+    """JSON for the extraction cache: compact when it round-trips, the full result otherwise"""
+    try:
+        return json.dumps(CompactResult.from_result(result).to_dict())
+    except ValueError:
+        return json.dumps(result)
+
+
+def load_cached(payload: str, compact: bool = False) -> Dict:
+    """A cached result (either form) in the form asked for"""
+    data = json.loads(payload)
+    if data.get('format') == FORMAT:
+        if compact:
+            # Cached before the payload named its offset unit
+            data.setdefault('offset_unit', OFFSET_UNIT)
+            return data
+        return CompactResult.from_dict(data).expand()
+    return compact_or_full(data) if compact else data
+
+
+def compact_or_full(result: Dict) -> Dict:
+    """The compact form of a full result, or the result itself if it has none"""
+    try:
+        return CompactResult.from_result(result).to_dict()
+    except ValueError:
+        return result
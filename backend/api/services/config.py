@@ -0,0 +1,15 @@
+"""
+Config - environment variable helpers shared by the services
+An unset or empty variable gives the default.
+"""
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
@@ -1,47 +1,104 @@
 """
-V6.1 Extractor - Better education detection + improved Word
+V6.2 Extractor - Better education detection + improved Word
 - More education keywords
 - Even better Word handling
 - Better section detection
+- PyPDF2 text-layer fast path, pdfplumber for complex page layouts
+Parsers are imported on first use, so the API process only loads them if it
+extracts in-process; extraction workers preload them (see warmup).
 """
-import pdfplumber
-import PyPDF2
-from docx import Document as DocxDocument
+import os
 import re
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Optional, Union
 from io import BytesIO
+from api.services.extraction_pipeline import LineMerger, SectionParser, WordLineMerger, engine_used
+from api.services.metrics import span, timed
+from api.services.section_classifier import SectionClassifier
 
+# Extractors accept the document's bytes or a path to it on disk
+Source = Union[bytes, str]
 
-class DocumentExtractor:
-    """V6.1 with improved detection"""
+# Bump whenever extraction output changes so cached results are not reused
+EXTRACTOR_VERSION = '6.2.1'
 
-    def __init__(self):
-        self.bullet_markers = ['•', '-', '●', '○', '*', '»', '→', '▪', '▫', '–', '—', '·', '►', '➤']
+PDF_ENGINES = ('auto', 'pypdf2', 'pdfplumber')
 
-    def extract_from_pdf(self, file_bytes: bytes) -> Dict:
-        """Extract from PDF - Working well"""
-        try:
-            pdf_file = BytesIO(file_bytes)
-            all_lines = []
+# Fast-path layout checks, in PDF points / fraction of page width
+ROW_TOLERANCE = 2.0
+COLUMN_GAP_RATIO = 0.25
+TEXT_OPERATORS = (b'Tj', b'TJ', b"'", b'"')
+# Control characters and unmapped glyphs mean the text layer can't be trusted
+GARBLED_TEXT = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\ufffd]|\(cid:\d+\)')
 
-            with pdfplumber.open(pdf_file) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        all_lines.extend(page_text.split('\n'))
 
-            merged_lines = self._merge_continuation_lines(all_lines)
-            full_text = '\n'.join(merged_lines)
-            sections = self._parse_sections_complete(merged_lines)
+BULLET_MARKERS = ('•', '-', '●', '○', '*', '»', '→', '▪', '▫', '–', '—', '·', '►', '➤')
+NUMBERED_BULLET = re.compile(r'^\d+[\.)]\s')
+ACTION_VERBS = frozenset([
+    'achieved', 'developed', 'created', 'managed', 'led', 'implemented',
+    'designed', 'built', 'improved', 'launched', 'delivered', 'collaborated',
+    'spearheaded', 'established', 'optimized', 'coordinated', 'drove',
+    'executed', 'engineered', 'architected', 'streamlined', 'reduced',
+    'increased', 'generated', 'transformed', 'automated', 'analyzed'
+])
 
-            return {
-                'success': True,
-                'text': full_text,
-                'sections': sections,
-                'lines': merged_lines,
-                'word_count': len(full_text.split()),
-                'line_count': len([l for l in merged_lines if l.strip()])
-            }
+JOB_DATE = re.compile(r'\b(19|20)\d{2}\b|present|current|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec', re.IGNORECASE)
+TITLE_KEYWORDS = (
+    'engineer', 'developer', 'manager', 'analyst', 'designer',
+    'consultant', 'specialist', 'lead', 'senior', 'junior', 'director',
+    'coordinator', 'associate', 'intern', 'architect', 'scientist'
+)
+
+UNIVERSITY_KEYWORDS = (
+    'university', 'college', 'institute', 'school', 'academy',
+    'polytechnic', 'campus', 'university of', 'state university',
+    'tech', 'institute of technology'
+)
+YEAR = re.compile(r'\b(19|20)\d{2}\b')
+LOCATION = re.compile(r',\s*[A-Z]{2}\b|,\s*[A-Z][a-z]+\s*$')
+
+EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+PHONE_ANYWHERE = re.compile(r'\d{3}[-.]?\d{3}[-.]?\d{4}')
+LINKEDIN = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+
+# Built once per process; shared by every extractor
+SECTION_CLASSIFIER = SectionClassifier(BULLET_MARKERS)
+
+
+class TextRun(NamedTuple):
+    """A string drawn by one text operator: where it starts and what it says"""
+    x: float
+    y: float
+    text: str
+
+
+class PdfPage(NamedTuple):
+    """Raw text lines of one page and the engine that read them"""
+    lines: List[str]
+    engine: str
+
+
+class PdfExtraction(NamedTuple):
+    """extract_pdf's answer; result is None when the pages are left for the caller to split"""
+    result: Optional[Dict]
+    page_count: int
+
+
+class DocumentExtractor:
+    """V6.2 with improved detection"""
+
+    def __init__(self, pdf_engine: Optional[str] = None):
+        self.bullet_markers = list(BULLET_MARKERS)
+        # 'auto' tries PyPDF2 per page and falls back to pdfplumber when the layout looks complex
+        self.pdf_engine = (pdf_engine or os.getenv('PDF_ENGINE', 'auto')).lower()
+        if self.pdf_engine not in PDF_ENGINES:
+            raise ValueError(f"Unknown PDF engine: {self.pdf_engine}")
+
+    @timed('extract_pdf')
+    def extract_from_pdf(self, source: Source, max_pages: Optional[int] = None) -> Dict:
+        """Extract from PDF - Working well"""
+        try:
+            return self.extract_pdf(source, max_pages).result
 
         except Exception as e:
             return {
@@ -49,12 +106,149 @@ class DocumentExtractor:
                 'error': f"PDF extraction failed: {str(e)}"
             }
 
-    def extract_from_word(self, file_bytes: bytes) -> Dict:
+    def extract_pdf(self, source: Source, max_pages: Optional[int] = None, split_from: int = 0) -> PdfExtraction:
+        """
+        Count, extract and build in one call, so a short PDF costs one pool job.
+        With split_from set, a PDF with that many pages to extract is only
+        counted, and the caller spreads its pages over workers.
+        """
+        page_count = self.count_pdf_pages(source)
+        end = min(page_count, max_pages) if max_pages else page_count
+        if split_from and end >= split_from:
+            return PdfExtraction(None, page_count)
+        return PdfExtraction(self.build_pdf_result(self.extract_pdf_pages(source, 0, end), page_count), page_count)
+
+    @staticmethod
+    def _open(source: Source):
+        """File-like for bytes; paths are passed through and read lazily"""
+        return BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+    @timed('pdf_count_pages')
+    def count_pdf_pages(self, source: Source) -> int:
+        """Number of pages in a PDF"""
+        import pdfplumber
+
+        with pdfplumber.open(self._open(source)) as pdf:
+            return len(pdf.pages)
+
+    def extract_pdf_pages(self, source: Source, start: int, end: int) -> List[PdfPage]:
+        """Raw text lines for pages [start, end), one entry per page"""
+        pages: List[Optional[PdfPage]] = [None] * (end - start)
+
+        if self.pdf_engine != 'pdfplumber':
+            import PyPDF2
+
+            try:
+                reader = PyPDF2.PdfReader(self._open(source))
+                for index in range(start, end):
+                    with span('pdf_page_pypdf2'):
+                        lines = self._fast_page_lines(reader.pages[index], checked=self.pdf_engine == 'auto')
+                    if lines is not None:
+                        pages[index - start] = PdfPage(lines, 'pypdf2')
+            except Exception:
+                # Anything PyPDF2 can't read goes to pdfplumber
+                if self.pdf_engine == 'pypdf2':
+                    raise
+
+        remaining = [index for index, page in enumerate(pages) if page is None]
+        if remaining:
+            import pdfplumber
+
+            with pdfplumber.open(self._open(source)) as pdf:
+                for index in remaining:
+                    with span('pdf_page_pdfplumber'):
+                        page_text = pdf.pages[start + index].extract_text()
+                    pages[index] = PdfPage(page_text.split('\n') if page_text else [], 'pdfplumber')
+
+        return pages
+
+    def _fast_page_lines(self, page, checked: bool = True) -> Optional[List[str]]:
+        """Text-layer lines via PyPDF2, or None when the page needs layout analysis"""
+        runs = []
+
+        def visit(operator, operands, cm, tm):
+            # Where each non-blank string is drawn, and what it says, in content stream order
+            if operator not in TEXT_OPERATORS or not operands:
+                return
+            strings = operands[0] if operator == b'TJ' else operands[-1:]
+            text = ''.join(
+                item.decode('latin-1') if isinstance(item, bytes) else item
+                for item in strings if isinstance(item, (str, bytes))
+            )
+            if text.strip():
+                runs.append(TextRun(
+                    tm[4] * cm[0] + tm[5] * cm[2] + cm[4],
+                    tm[4] * cm[1] + tm[5] * cm[3] + cm[5],
+                    text
+                ))
+
+        text = page.extract_text(visitor_operand_before=visit if checked else None)
+        if checked and self._is_complex_layout(text, runs, float(page.mediabox.width)):
+            return None
+
+        # pdfplumber drops blank lines and collapses spacing; match it
+        return [' '.join(line.split()) for line in text.split('\n') if line.strip()]
+
+    def _is_complex_layout(self, text: str, runs: List[TextRun], page_width: float) -> bool:
+        """Columns, tables, out-of-order text, runs PyPDF2 would glue together or unmapped glyphs"""
+        if GARBLED_TEXT.search(text):
+            return True
+
+        column_gap = page_width * COLUMN_GAP_RATIO
+        for previous, run in zip(runs, runs[1:]):
+            # Moving back up the page: a second column or out-of-order content
+            if run.y > previous.y + ROW_TOLERANCE:
+                return True
+            if abs(run.y - previous.y) <= ROW_TOLERANCE:
+                # Far apart on the same row: table cells or side-by-side columns
+                if abs(run.x - previous.x) > column_gap:
+                    return True
+                # PyPDF2 joins runs on one row as drawn, and the space between
+                # them is a cursor move rather than a character: only
+                # pdfplumber's glyph positions can tell "Skills:Python" apart
+                if not (previous.text[-1].isspace() or run.text[0].isspace()):
+                    return True
+
+        return False
+
+    def build_pdf_result(self, pages: List[PdfPage], page_count: Optional[int] = None) -> Dict:
+        """Stitch per-page lines in page order, then merge and parse them"""
+        all_lines = []
+        for page in pages:
+            all_lines.extend(page.lines)
+
+        merged_lines = self._merge_continuation_lines(all_lines)
+        full_text = '\n'.join(merged_lines)
+        sections = self.parse_sections(merged_lines)
+
+        result = {
+            'success': True,
+            'text': full_text,
+            'sections': sections,
+            'lines': merged_lines,
+            'word_count': len(full_text.split()),
+            'line_count': len([l for l in merged_lines if l.strip()]),
+            'engine': engine_used(page.engine for page in pages)
+        }
+
+        # Runaway documents are cut at the page cap; say so
+        if page_count is not None and page_count > len(pages):
+            result['truncated'] = True
+            result['page_count'] = page_count
+            result['pages_extracted'] = len(pages)
+
+        return result
+
+    @timed('extract_word')
+    def extract_from_word(self, source: Source) -> Dict:
         """
         IMPROVED Word extraction - Even more careful
         """
         try:
-            doc = DocxDocument(BytesIO(file_bytes))
+            # Inside the try: a missing or broken python-docx is an extraction failure, not a crash
+            from docx import Document as DocxDocument
+
+            doc = DocxDocument(self._open(source))
             lines = []
 
             # Extract paragraphs - Word has good structure
@@ -87,53 +281,10 @@ class DocumentExtractor:
                         lines.append(' | '.join(cells_text))
 
             # Very gentle merging for Word (it's already structured)
-            merged_lines = []
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                if not line:
-                    i += 1
-                    continue
-
-                # Check if section header
-                if self._is_section_header_strict(line):
-                    merged_lines.append(line)
-                    i += 1
-                    continue
-
-                # Check if bullet
-                if self._is_bullet_start(line):
-                    merged_lines.append(line)
-                    i += 1
-                    continue
-
-                # Otherwise, check if next line is continuation
-                current_text = line
-                j = i + 1
-
-                # Only merge if next line is short and lowercase
-                while j < len(lines):
-                    next_line = lines[j].strip()
-                    if not next_line:
-                        j += 1
-                        continue
-
-                    # Stop if it's a header or bullet
-                    if self._is_section_header_strict(next_line) or self._is_bullet_start(next_line):
-                        break
-
-                    # Only merge if clearly continuation (lowercase start, short)
-                    if len(next_line) < 40 and next_line[0].islower():
-                        current_text += ' ' + next_line
-                        j += 1
-                    else:
-                        break
-
-                merged_lines.append(current_text)
-                i = j if j > i + 1 else i + 1
+            merged_lines = self._merge_word_lines(lines)
 
             full_text = '\n'.join(merged_lines)
-            sections = self._parse_sections_complete(merged_lines)
+            sections = self.parse_sections(merged_lines)
 
             return {
                 'success': True,
@@ -150,73 +301,22 @@ class DocumentExtractor:
                 'error': f"Word extraction failed: {str(e)}"
             }
 
+    @timed('merge_lines')
     def _merge_continuation_lines(self, lines: List[str]) -> List[str]:
         """PDF merging - Works well"""
-        merged = []
-        current_bullet = None
-        current_paragraph = None
-
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-
-            if not stripped:
-                if current_bullet:
-                    merged.append(current_bullet)
-                    current_bullet = None
-                elif current_paragraph:
-                    merged.append(current_paragraph)
-                    current_paragraph = None
-                continue
-
-            is_bullet_start = self._is_bullet_start(stripped)
-            is_header = self._is_section_header_strict(stripped)
-
-            if is_header:
-                if current_bullet:
-                    merged.append(current_bullet)
-                    current_bullet = None
-                if current_paragraph:
-                    merged.append(current_paragraph)
-                    current_paragraph = None
-                merged.append(line)
-                continue
-
-            if is_bullet_start:
-                if current_bullet:
-                    merged.append(current_bullet)
-                if current_paragraph:
-                    merged.append(current_paragraph)
-                    current_paragraph = None
-                current_bullet = line
-                continue
-
-            is_continuation = self._is_continuation(stripped, lines, i)
-
-            if is_continuation:
-                if current_bullet:
-                    current_bullet += ' ' + stripped
-                elif current_paragraph:
-                    current_paragraph += ' ' + stripped
-                else:
-                    current_paragraph = line
-            else:
-                if current_bullet:
-                    merged.append(current_bullet)
-                    current_bullet = None
-                if current_paragraph:
-                    merged.append(current_paragraph)
-                    current_paragraph = None
-
-                if not is_bullet_start and len(stripped) > 20:
-                    current_paragraph = line
-                else:
-                    merged.append(line)
-
-        if current_bullet:
-            merged.append(current_bullet)
-        if current_paragraph:
-            merged.append(current_paragraph)
+        return self._run_merger(LineMerger(self), lines)
+
+    @timed('merge_word_lines')
+    def _merge_word_lines(self, lines: List[str]) -> List[str]:
+        """Word merging - only short lowercase lines join the line before"""
+        return self._run_merger(WordLineMerger(self), lines)
 
+    @staticmethod
+    def _run_merger(merger, lines: List[str]) -> List[str]:
+        merged = []
+        for line in lines:
+            merged.extend(merger.feed(line))
+        merged.extend(merger.close())
         return merged
 
     def _is_bullet_start(self, line: str) -> bool:
@@ -225,25 +325,16 @@ class DocumentExtractor:
             return False
 
         # Bullet symbols
-        if any(line.startswith(marker) for marker in self.bullet_markers):
+        if line.startswith(BULLET_MARKERS):
             return True
 
         # Numbered bullets
-        if re.match(r'^\d+[\.)]\s', line):
+        if NUMBERED_BULLET.match(line):
             return True
 
         # Action verbs
-        if len(line) > 40:
-            action_verbs = [
-                'achieved', 'developed', 'created', 'managed', 'led', 'implemented',
-                'designed', 'built', 'improved', 'launched', 'delivered', 'collaborated',
-                'spearheaded', 'established', 'optimized', 'coordinated', 'drove',
-                'executed', 'engineered', 'architected', 'streamlined', 'reduced',
-                'increased', 'generated', 'transformed', 'automated', 'analyzed'
-            ]
-
-            first_word = line.split()[0].lower() if line else ""
-            if first_word in action_verbs and line[0].isupper():
+        if len(line) > 40 and line[0].isupper():
+            if line.split()[0].lower() in ACTION_VERBS:
                 return True
 
         return False
@@ -253,66 +344,14 @@ class DocumentExtractor:
         STRICT section header detection
         IMPROVED: More education keywords
         """
-        if not line:
-            return False
+        return SECTION_CLASSIFIER.classify(line) is not None
 
-        line_upper = line.upper()
-        line_stripped = line.strip()
-
-        # Expanded section keywords
-        known_sections = [
-            # Summary
-            'SUMMARY', 'PROFESSIONAL SUMMARY', 'PROFILE', 'OBJECTIVE', 'ABOUT ME', 'OVERVIEW',
-            # Experience
-            'EXPERIENCE', 'WORK EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'EMPLOYMENT',
-            'WORK HISTORY', 'CAREER HISTORY', 'EMPLOYMENT HISTORY',
-            # Education - EXPANDED
-            'EDUCATION', 'ACADEMIC BACKGROUND', 'ACADEMIC QUALIFICATIONS', 'EDUCATIONAL BACKGROUND',
-            'ACADEMIC CREDENTIALS', 'DEGREES', 'ACADEMIC HISTORY', 'EDUCATIONAL QUALIFICATIONS',
-            'QUALIFICATIONS', 'TRAINING', 'ACADEMIC TRAINING',
-            # Skills
-            'SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES', 'TECHNOLOGIES', 'EXPERTISE',
-            'PROFICIENCIES', 'TECHNICAL PROFICIENCIES', 'TECHNICAL EXPERTISE',
-            # Other sections
-            'PROJECTS', 'KEY PROJECTS', 'NOTABLE PROJECTS', 'PROFESSIONAL PROJECTS',
-            'CERTIFICATIONS', 'CERTIFICATES', 'LICENSES', 'CREDENTIALS', 'PROFESSIONAL CERTIFICATIONS',
-            'AWARDS', 'HONORS', 'ACHIEVEMENTS', 'RECOGNITION', 'ACCOMPLISHMENTS', 'HONORS AND AWARDS',
-            'PUBLICATIONS', 'RESEARCH', 'PAPERS', 'RESEARCH PUBLICATIONS',
-            'VOLUNTEER', 'VOLUNTEER EXPERIENCE', 'COMMUNITY SERVICE', 'VOLUNTEER WORK',
-            'LANGUAGES', 'LANGUAGE SKILLS', 'LANGUAGE PROFICIENCY',
-            'INTERESTS', 'HOBBIES', 'ACTIVITIES', 'PERSONAL INTERESTS'
-        ]
-
-        # Exact match (case insensitive)
-        for section in known_sections:
-            if line_upper == section or line_upper == section + ':':
-                return True
-
-        # Check partial matches for common patterns
-        # "EDUCATION & TRAINING", "SKILLS & EXPERTISE", etc.
-        for section in known_sections:
-            if section in line_upper and len(line_upper) < 40:
-                # Make sure it's not part of a longer sentence
-                if line_upper.count(' ') <= 5:
-                    return True
-
-        # All caps and very short (2-4 words)
-        word_count = len(line_stripped.split())
-        if line_stripped == line_upper and 1 <= word_count <= 4:
-            # Must not start with bullet
-            if any(line_stripped.startswith(m) for m in self.bullet_markers):
-                return False
-            # Must not have numbers (dates, etc)
-            if re.search(r'\d', line_stripped):
-                return False
-            # Must be reasonable length
-            if 3 < len(line_stripped) < 35:
-                return True
+    def _header_section(self, line: str) -> Optional[str]:
+        """The section a header line opens, or None if it is not a header"""
+        return SECTION_CLASSIFIER.classify(line)
 
-        return False
-
-    def _is_continuation(self, line: str, all_lines: List[str], current_idx: int) -> bool:
-        """Check if line is continuation"""
+    def _is_continuation(self, line: str, prev_line: Optional[str]) -> bool:
+        """Check if line is continuation of the previous non-blank line"""
         if not line:
             return False
 
@@ -320,177 +359,49 @@ class DocumentExtractor:
             return True
 
         if len(line) < 50:
-            prev_idx = current_idx - 1
-            while prev_idx >= 0 and not all_lines[prev_idx].strip():
-                prev_idx -= 1
-
-            if prev_idx >= 0:
-                prev_line = all_lines[prev_idx].strip()
-                if prev_line and not prev_line.endswith(('.', '!', '?', ':')):
-                    return True
+            if prev_line and not prev_line.endswith(('.', '!', '?', ':')):
+                return True
 
         return False
 
-    def _parse_sections_complete(self, lines: List[str]) -> Dict:
-        """Parse ALL sections"""
-        sections = {
-            'header': {'content': '', 'lines': [], 'blocks': []},
-            'summary': {'content': '', 'lines': [], 'blocks': []},
-            'experience': {'content': '', 'lines': [], 'jobs': []},
-            'skills': {'content': '', 'lines': [], 'blocks': []},
-            'education': {'content': '', 'lines': [], 'blocks': []},
-            'projects': {'content': '', 'lines': [], 'blocks': []},
-            'certifications': {'content': '', 'lines': [], 'blocks': []},
-            'awards': {'content': '', 'lines': [], 'blocks': []},
-            'publications': {'content': '', 'lines': [], 'blocks': []},
-            'volunteer': {'content': '', 'lines': [], 'blocks': []},
-            'languages': {'content': '', 'lines': [], 'blocks': []},
-            'interests': {'content': '', 'lines': [], 'blocks': []},
-            'other': {'content': '', 'lines': [], 'blocks': []}
-        }
+    @timed('parse_sections')
+    def parse_sections(self, lines: List[str]) -> Dict:
+        """Sections of already merged lines, as extracted documents get them"""
+        parser = SectionParser(self)
+        for line in lines:
+            parser.feed(line)
+        return parser.close()
 
-        current_section = 'header'
-        current_job = None
-
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-
-            if not stripped:
-                continue
-
-            # Detect section headers
-            if self._is_section_header_strict(stripped):
-                # Save current job if in experience
-                if current_job and current_section == 'experience':
-                    sections['experience']['jobs'].append(current_job)
-                    current_job = None
-
-                # Determine which section
-                line_lower = stripped.lower()
-
-                if any(kw in line_lower for kw in ['summary', 'profile', 'objective', 'about', 'overview']):
-                    current_section = 'summary'
-                elif any(kw in line_lower for kw in ['experience', 'work', 'employment', 'history', 'career']):
-                    current_section = 'experience'
-                elif any(kw in line_lower for kw in ['skill', 'technical', 'competenc', 'technolog', 'expertise', 'proficienc']):
-                    current_section = 'skills'
-                elif any(kw in line_lower for kw in ['education', 'academic', 'qualification', 'degree', 'training']):
-                    current_section = 'education'
-                elif any(kw in line_lower for kw in ['project']):
-                    current_section = 'projects'
-                elif any(kw in line_lower for kw in ['certification', 'certificate', 'license', 'credential']):
-                    current_section = 'certifications'
-                elif any(kw in line_lower for kw in ['award', 'honor', 'achievement', 'recognition', 'accomplishment']):
-                    current_section = 'awards'
-                elif any(kw in line_lower for kw in ['publication', 'research', 'paper']):
-                    current_section = 'publications'
-                elif any(kw in line_lower for kw in ['volunteer', 'community']):
-                    current_section = 'volunteer'
-                elif any(kw in line_lower for kw in ['language']):
-                    current_section = 'languages'
-                elif any(kw in line_lower for kw in ['interest', 'hobbies', 'activities']):
-                    current_section = 'interests'
-                else:
-                    current_section = 'other'
-
-                sections[current_section]['lines'].append(line)
-                continue
-
-            # Add to current section
-            sections[current_section]['lines'].append(line)
-
-            # Experience section - special handling for jobs
-            if current_section == 'experience':
-                if self._is_job_title_line(stripped, lines, i):
-                    if current_job:
-                        sections['experience']['jobs'].append(current_job)
-
-                    current_job = {
-                        'title': stripped,
-                        'lines': [line],
-                        'bullets': []
-                    }
-                elif current_job:
-                    current_job['lines'].append(line)
-                    if self._is_bullet_start(stripped):
-                        current_job['bullets'].append(stripped)
-
-            # All other sections - each non-empty line is a block
-            elif current_section != 'header':
-                if stripped and not self._is_section_header_strict(stripped):
-                    # For education, check if it looks like a degree line that should be grouped
-                    if current_section == 'education':
-                        # If this looks like a university/college line and we have blocks
-                        if sections['education']['blocks'] and self._looks_like_university(stripped):
-                            # Add to previous block instead of creating new one
-                            prev_block = sections['education']['blocks'][-1]
-                            prev_block['text'] += '\n' + stripped
-                        else:
-                            sections[current_section]['blocks'].append({
-                                'text': stripped,
-                                'type': 'bullet' if self._is_bullet_start(stripped) else 'text'
-                            })
-                    else:
-                        sections[current_section]['blocks'].append({
-                            'text': stripped,
-                            'type': 'bullet' if self._is_bullet_start(stripped) else 'text'
-                        })
-
-        # Save last job
-        if current_job:
-            sections['experience']['jobs'].append(current_job)
-
-        # Build content strings
-        for section_name, section_data in sections.items():
-            section_data['content'] = '\n'.join(section_data['lines'])
-
-        return sections
-
-    def _is_job_title_line(self, line: str, all_lines: List[str], idx: int) -> bool:
-        """Detect job title"""
-        date_pattern = r'\b(19|20)\d{2}\b|present|current|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec'
-
-        has_date = bool(re.search(date_pattern, line, re.IGNORECASE))
-
-        if not has_date and idx + 1 < len(all_lines):
-            next_line = all_lines[idx + 1].strip()
-            has_date = bool(re.search(date_pattern, next_line, re.IGNORECASE))
-
-        title_keywords = ['engineer', 'developer', 'manager', 'analyst', 'designer',
-                         'consultant', 'specialist', 'lead', 'senior', 'junior', 'director',
-                         'coordinator', 'associate', 'intern', 'architect', 'scientist']
-
-        has_title_keyword = any(kw in line.lower() for kw in title_keywords)
-        is_bullet = self._is_bullet_start(line)
-
-        return (has_date or has_title_keyword) and not is_bullet
+    def _is_job_title(self, line: str, next_line: Optional[str]) -> bool:
+        """Detect job title: a title keyword, or a date on this or the next line"""
+        if self._is_bullet_start(line):
+            return False
+
+        line_lower = line.lower()
+        if any(kw in line_lower for kw in TITLE_KEYWORDS):
+            return True
+
+        if JOB_DATE.search(line):
+            return True
+        return next_line is not None and JOB_DATE.search(next_line.strip()) is not None
 
     def _looks_like_university(self, line: str) -> bool:
         """Check if line looks like a university/college name"""
-        university_keywords = [
-            'university', 'college', 'institute', 'school', 'academy',
-            'polytechnic', 'campus', 'university of', 'state university',
-            'tech', 'institute of technology'
-        ]
-
         line_lower = line.lower()
 
         # Check for university keywords
-        has_university = any(kw in line_lower for kw in university_keywords)
-
-        # Check if line has dates (if so, it's more likely a separate entry)
-        has_date = bool(re.search(r'\b(19|20)\d{2}\b', line))
+        if not any(kw in line_lower for kw in UNIVERSITY_KEYWORDS):
+            return False
 
         # If has university keyword but no date, likely continuation
         # If has date, it's a separate degree
-        if has_university and not has_date:
+        if not YEAR.search(line):
             return True
 
         # Check for location patterns (City, State or City, Country)
-        has_location = bool(re.search(r',\s*[A-Z]{2}\b|,\s*[A-Z][a-z]+\s*$', line))
-
-        return has_university and has_location
+        return LOCATION.search(line) is not None
 
+    @timed('extract_contact')
     def extract_contact_info(self, text: str) -> Dict[str, str]:
         """Extract contact info"""
         contact = {
@@ -504,19 +415,19 @@ class DocumentExtractor:
         lines = text.split('\n')[:10]
 
         for line in lines:
-            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', line)
+            email_match = EMAIL.search(line)
             if email_match and not contact['email']:
                 contact['email'] = email_match.group()
 
-            phone_match = re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', line)
+            phone_match = PHONE.search(line)
             if phone_match and not contact['phone']:
                 contact['phone'] = phone_match.group()
 
-            linkedin_match = re.search(r'linkedin\.com/in/[\w-]+', line, re.IGNORECASE)
+            linkedin_match = LINKEDIN.search(line)
             if linkedin_match and not contact['linkedin']:
                 contact['linkedin'] = linkedin_match.group()
 
-            if not contact['name'] and line.strip() and '@' not in line and not re.search(r'\d{3}[-.]?\d{3}[-.]?\d{4}', line):
+            if not contact['name'] and line.strip() and '@' not in line and not PHONE_ANYWHERE.search(line):
                 if len(line.split()) <= 5 and not line.isupper():
                     contact['name'] = line.strip()
 
@@ -0,0 +1,36 @@
+"""
+Extraction - the shared document extractors and spooled-upload extraction
+Used by every route that accepts resume files, so they all extract the same
+way: PDFs split across the extraction pool, Word documents in one job.
+"""
+from typing import Dict, Optional
+
+from api.services.bulk_ingest import SUPPORTED_EXTENSIONS
+from api.services.document_extractor import DocumentExtractor
+from api.services.parallel_extractor import ParallelPDFExtractor
+from api.services.uploads import remove_spooled
+from api.services.workers import extraction_pool
+
+extractor = DocumentExtractor()
+pdf_extractor = ParallelPDFExtractor(extractor, extraction_pool)
+
+
+def document_extension(filename: Optional[str]) -> str:
+    """The lower-cased extension of a resume file; ValueError unless it is one we extract"""
+    if not filename:
+        raise ValueError("No file provided")
+
+    file_extension = filename.split('.')[-1].lower()
+    if file_extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+    return file_extension
+
+
+async def extract_spooled(file_extension: str, path: str) -> Dict:
+    """Extract a spooled upload, then remove it"""
+    try:
+        if file_extension == 'pdf':
+            return await pdf_extractor.extract(path)
+        return await extraction_pool.run(extractor.extract_from_word, path)
+    finally:
+        remove_spooled(path)
@@ -0,0 +1,387 @@
+"""
+Extraction Pipeline - incremental line merging and section parsing
+- LineMerger joins wrapped PDF bullets and paragraphs one raw line at a time
+- WordLineMerger does the same, more gently, for Word paragraphs
+- SectionParser assigns merged lines to sections with one line of lookahead
+- StreamingExtraction feeds pages through both and emits NDJSON-ready events
+The batch extractor runs the same state machines over a whole document,
+so streamed and non-streamed results agree line for line.
+"""
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from api.services.metrics import timed
+
+SECTION_NAMES = [
+    'header', 'summary', 'experience', 'skills', 'education', 'projects', 'certifications',
+    'awards', 'publications', 'volunteer', 'languages', 'interests', 'other'
+]
+
+# Lines of merged text scanned for contact details
+CONTACT_LINES = 10
+
+
+class ParsedLine(NamedTuple):
+    """
+    One line as SectionParser saw it. role is 'blank', 'heading', 'title' (a
+    job title), 'bullet' (the first line of a bullet) or 'text'; job is the
+    title of the experience job the line belongs to.
+    """
+    line: str
+    section: str
+    role: str
+    job: Optional[str]
+
+
+def engine_used(engines: Iterable[str]) -> Optional[str]:
+    """The engine that read every page, or 'mixed'"""
+    engines = set(engines)
+    if len(engines) > 1:
+        return 'mixed'
+    return engines.pop() if engines else None
+
+
+def empty_section(name: str) -> Dict:
+    return {'content': '', 'lines': [], 'jobs' if name == 'experience' else 'blocks': []}
+
+
+class LineMerger:
+    """Push raw PDF lines in, get merged lines out as soon as they are complete"""
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.current_bullet: Optional[str] = None
+        self.current_paragraph: Optional[str] = None
+        self.previous: Optional[str] = None  # last non-blank raw line, stripped
+
+    def feed(self, line: str) -> List[str]:
+        merged = []
+        stripped = line.strip()
+
+        if not stripped:
+            if self.current_bullet:
+                merged.append(self.current_bullet)
+                self.current_bullet = None
+            elif self.current_paragraph:
+                merged.append(self.current_paragraph)
+                self.current_paragraph = None
+            return merged
+
+        previous, self.previous = self.previous, stripped
+        is_bullet_start = self.extractor._is_bullet_start(stripped)
+        is_header = self.extractor._is_section_header_strict(stripped)
+
+        if is_header:
+            if self.current_bullet:
+                merged.append(self.current_bullet)
+                self.current_bullet = None
+            if self.current_paragraph:
+                merged.append(self.current_paragraph)
+                self.current_paragraph = None
+            merged.append(line)
+            return merged
+
+        if is_bullet_start:
+            if self.current_bullet:
+                merged.append(self.current_bullet)
+            if self.current_paragraph:
+                merged.append(self.current_paragraph)
+                self.current_paragraph = None
+            self.current_bullet = line
+            return merged
+
+        if self.extractor._is_continuation(stripped, previous):
+            if self.current_bullet:
+                self.current_bullet += ' ' + stripped
+            elif self.current_paragraph:
+                self.current_paragraph += ' ' + stripped
+            else:
+                self.current_paragraph = line
+        else:
+            if self.current_bullet:
+                merged.append(self.current_bullet)
+                self.current_bullet = None
+            if self.current_paragraph:
+                merged.append(self.current_paragraph)
+                self.current_paragraph = None
+
+            if len(stripped) > 20:
+                self.current_paragraph = line
+            else:
+                merged.append(line)
+
+        return merged
+
+    def close(self) -> List[str]:
+        merged = []
+        if self.current_bullet:
+            merged.append(self.current_bullet)
+            self.current_bullet = None
+        if self.current_paragraph:
+            merged.append(self.current_paragraph)
+            self.current_paragraph = None
+        return merged
+
+
+class WordLineMerger:
+    """
+    Word paragraphs are already structured: headers and bullets stand alone,
+    and only a short line starting lowercase joins the line before it.
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.current: Optional[str] = None
+
+    def feed(self, line: str) -> List[str]:
+        merged = []
+        stripped = line.strip()
+        if not stripped:
+            return merged
+
+        if self.extractor._is_section_header_strict(stripped) or self.extractor._is_bullet_start(stripped):
+            if self.current is not None:
+                merged.append(self.current)
+                self.current = None
+            merged.append(stripped)
+            return merged
+
+        if self.current is not None and len(stripped) < 40 and stripped[0].islower():
+            self.current += ' ' + stripped
+            return merged
+
+        if self.current is not None:
+            merged.append(self.current)
+        self.current = stripped
+        return merged
+
+    def close(self) -> List[str]:
+        merged = [self.current] if self.current is not None else []
+        self.current = None
+        return merged
+
+
+class SectionParser:
+    """
+    Section state machine over merged lines. Job title detection looks at the
+    following line, so each line is processed when the next one arrives.
+
+    With retain=False each run of lines under one header is handed out by
+    drain() and then dropped, keeping memory flat; a section whose header
+    appears twice is reported as two runs. The last education block of a run
+    is held back until the next education run (or close), since a university
+    line there still joins it.
+    """
+
+    def __init__(self, extractor, retain: bool = True):
+        self.extractor = extractor
+        self.retain = retain
+        self.sections = {name: empty_section(name) for name in SECTION_NAMES}
+        self.current_section = 'header'
+        self.current_job: Optional[Dict] = None
+        self._pending: Optional[str] = None
+        self._finished: List[Dict] = []
+
+    def feed(self, line: str):
+        if self._pending is not None:
+            self._process(self._pending, line)
+        self._pending = line
+
+    def parse_lines(self, lines: List[str]) -> Iterator[ParsedLine]:
+        """
+        Process a whole list of lines as feed() would, yielding each line's
+        section and role as it is processed. close() still returns the sections.
+        """
+        extractor = self.extractor
+        for index, line in enumerate(lines):
+            job = self.current_job
+            bullets = len(job['bullets']) if job else 0
+            self._process(line, lines[index + 1] if index + 1 < len(lines) else None)
+            stripped = line.strip()
+            section = self.current_section
+
+            if not stripped:
+                role = 'blank'
+            elif extractor._header_section(stripped) is not None:
+                role = 'heading'
+            elif section == 'experience':
+                if self.current_job is not None and self.current_job is not job:
+                    role = 'title'
+                elif job is not None and len(job['bullets']) > bullets:
+                    role = 'bullet'
+                else:
+                    role = 'text'
+            else:
+                role = 'bullet' if extractor._is_bullet_start(stripped) else 'text'
+
+            title = self.current_job['title'] if section == 'experience' and self.current_job else None
+            yield ParsedLine(line, section, role, title)
+
+    def close(self) -> Dict:
+        """Process the last line and return the sections"""
+        if self._pending is not None:
+            self._process(self._pending, None)
+            self._pending = None
+
+        if self.current_job:
+            self.sections['experience']['jobs'].append(self.current_job)
+            self.current_job = None
+        self._end_run(final=True)
+        if self.current_section != 'education':
+            # A block still held back from an earlier education run
+            self._end_run('education', final=True)
+
+        for section_data in self.sections.values():
+            section_data['content'] = '\n'.join(section_data['lines'])
+        return self.sections
+
+    def drain(self) -> List[Dict]:
+        """Runs of lines completed since the last call"""
+        finished, self._finished = self._finished, []
+        return finished
+
+    def _end_run(self, name: Optional[str] = None, final: bool = False):
+        if self.retain:
+            return
+        name = name or self.current_section
+        section_data = self.sections[name]
+        if not section_data['lines'] and not (final and section_data.get('blocks')):
+            return
+
+        fresh = empty_section(name)
+        if name == 'education' and section_data['blocks'] and not final:
+            fresh['blocks'].append(section_data['blocks'].pop())
+
+        self._finished.append(dict(section_data, section=name, content='\n'.join(section_data['lines'])))
+        self.sections[name] = fresh
+
+    def _process(self, line: str, next_line: Optional[str]):
+        extractor = self.extractor
+        sections = self.sections
+        stripped = line.strip()
+
+        if not stripped:
+            return
+
+        header_section = extractor._header_section(stripped)
+        if header_section is not None:
+            if self.current_job and self.current_section == 'experience':
+                sections['experience']['jobs'].append(self.current_job)
+                self.current_job = None
+
+            self._end_run()
+            self.current_section = header_section
+            sections[self.current_section]['lines'].append(line)
+            return
+
+        current_section = self.current_section
+        sections[current_section]['lines'].append(line)
+
+        # Experience section - special handling for jobs
+        if current_section == 'experience':
+            if extractor._is_job_title(stripped, next_line):
+                if self.current_job:
+                    sections['experience']['jobs'].append(self.current_job)
+
+                self.current_job = {
+                    'title': stripped,
+                    'lines': [line],
+                    'bullets': []
+                }
+            elif self.current_job:
+                self.current_job['lines'].append(line)
+                if extractor._is_bullet_start(stripped):
+                    self.current_job['bullets'].append(stripped)
+
+        # All other sections - each non-empty line is a block
+        elif current_section != 'header':
+            blocks = sections[current_section]['blocks']
+            # University lines join the degree line before them
+            if current_section == 'education' and blocks and extractor._looks_like_university(stripped):
+                blocks[-1]['text'] += '\n' + stripped
+            else:
+                blocks.append({
+                    'text': stripped,
+                    'type': 'bullet' if extractor._is_bullet_start(stripped) else 'text'
+                })
+
+
+class StreamingExtraction:
+    """
+    Page-at-a-time extraction that never holds the whole document:
+    feed_page() returns the events ready after each page, finish() the rest.
+    """
+
+    def __init__(self, extractor, page_count: Optional[int] = None, pages: Optional[int] = None):
+        self.extractor = extractor
+        self.page_count = page_count
+        self.pages = pages
+        self.merger = LineMerger(extractor)
+        self.parser = SectionParser(extractor, retain=False)
+        self.pages_extracted = 0
+        self.engines = set()
+        self.word_count = 0
+        self.line_count = 0
+        self._contact_lines: Optional[List[str]] = []
+
+    def start_event(self) -> Dict:
+        return {'event': 'start', 'page_count': self.page_count, 'pages': self.pages}
+
+    def _add(self, lines: List[str]):
+        for line in lines:
+            self.word_count += len(line.split())
+            if line.strip():
+                self.line_count += 1
+            if self._contact_lines is not None:
+                self._contact_lines.append(line)
+            self.parser.feed(line)
+
+    def _contact_event(self, force: bool = False) -> List[Dict]:
+        if self._contact_lines is None or (len(self._contact_lines) < CONTACT_LINES and not force):
+            return []
+        text = '\n'.join(self._contact_lines[:CONTACT_LINES])
+        self._contact_lines = None
+        return [{'event': 'contact', 'contact': self.extractor.extract_contact_info(text)}]
+
+    def _section_events(self) -> List[Dict]:
+        return [{'event': 'section', **run} for run in self.parser.drain()]
+
+    @timed('stream_page')
+    def feed_page(self, raw_lines: List[str], engine: Optional[str] = None) -> List[Dict]:
+        for raw in raw_lines:
+            self._add(self.merger.feed(raw))
+        self.pages_extracted += 1
+        self.engines.add(engine)
+
+        events = [{'event': 'page', 'page': self.pages_extracted, 'page_count': self.page_count, 'engine': engine}]
+        return events + self._contact_event() + self._section_events()
+
+    def finish(self) -> List[Dict]:
+        self._add(self.merger.close())
+        self.parser.close()
+
+        done = {'event': 'done', 'word_count': self.word_count, 'line_count': self.line_count}
+        if self.engines:
+            done['engine'] = engine_used(self.engines)
+        if self.page_count is not None and self.page_count > self.pages_extracted:
+            done.update(truncated=True, page_count=self.page_count, pages_extracted=self.pages_extracted)
+
+        return self._contact_event(force=True) + self._section_events() + [done]
+
+
+def result_events(result: Dict) -> List[Dict]:
+    """The event stream for an already complete extraction result"""
+    events = [{'event': 'start', 'page_count': result.get('page_count'), 'pages': result.get('pages_extracted')}]
+    if 'contact' in result:
+        events.append({'event': 'contact', 'contact': result['contact']})
+    for name in SECTION_NAMES:
+        section_data = result['sections'][name]
+        if section_data['lines']:
+            events.append({'event': 'section', 'section': name, **section_data})
+
+    done = {'event': 'done', 'word_count': result['word_count'], 'line_count': result['line_count']}
+    if result.get('engine'):
+        done['engine'] = result['engine']
+    if result.get('truncated'):
+        done.update(truncated=True, page_count=result['page_count'], pages_extracted=result['pages_extracted'])
+    events.append(done)
+    return events
@@ -0,0 +1,385 @@
+"""
+LLM Provider Layer - async clients over one pooled HTTP connection pool
+- SDK clients are reused per (provider, api_key)
+- All providers share a keep-alive httpx connection pool
+- Pool sizes, timeouts and base URLs come from environment variables
+- Provider SDKs are imported on first use; they dominate startup time
+- Every call is timed (time to first token too, for streams) and the token
+  counts providers report are recorded (see metrics)
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from api.services.config import env_float, env_int
+from api.services.metrics import LLM_FIRST_TOKEN_SECONDS, LLM_SECONDS, record_tokens
+
+if TYPE_CHECKING:
+    import anthropic
+    import openai
+
+
+class ProviderError(Exception):
+    """A provider answered with an error status"""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ProviderSettings:
+    """Connection pool and timeout settings shared by every provider"""
+
+    def __init__(self):
+        self.max_connections = env_int('LLM_MAX_CONNECTIONS', 100)
+        self.max_keepalive_connections = env_int('LLM_MAX_KEEPALIVE', 20)
+        self.keepalive_expiry = env_float('LLM_KEEPALIVE_EXPIRY', 30.0)
+        self.timeout = env_float('LLM_TIMEOUT', 60.0)
+        self.connect_timeout = env_float('LLM_CONNECT_TIMEOUT', 10.0)
+        self.max_cached_clients = env_int('LLM_MAX_CACHED_CLIENTS', 256)
+
+        self.openai_base_url = os.getenv('OPENAI_BASE_URL') or None
+        self.anthropic_base_url = os.getenv('ANTHROPIC_BASE_URL') or None
+        self.openrouter_base_url = os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1')
+
+    def build_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+    def build_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+
+class ClientPool:
+    """
+    One shared httpx.AsyncClient plus a bounded LRU of SDK clients keyed by
+    (provider, api_key). SDK clients are thin wrappers around the shared
+    connection pool, so reusing them keeps TCP+TLS connections warm.
+    """
+
+    def __init__(self, settings: Optional[ProviderSettings] = None):
+        self.settings = settings or ProviderSettings()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._clients: "OrderedDict[tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._http is None or self._http.is_closed:
+                self._http = httpx.AsyncClient(
+                    timeout=self.settings.build_timeout(),
+                    limits=self.settings.build_limits()
+                )
+            return self._http
+
+    def get(self, provider: str, api_key: str, factory):
+        """Return the cached SDK client for (provider, api_key), creating it with factory(http)"""
+        key = (provider, api_key)
+        http = self.http
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+
+            client = factory(http)
+            self._clients[key] = client
+            while len(self._clients) > self.settings.max_cached_clients:
+                self._clients.popitem(last=False)
+            return client
+
+    async def aclose(self):
+        """Close the shared connection pool and forget cached clients"""
+        with self._lock:
+            http, self._http = self._http, None
+            self._clients.clear()
+        if http is not None:
+            await http.aclose()
+
+
+class LLMProvider:
+    """
+    Base class: send one chat prompt, return the completion text.
+    Subclasses implement _complete and _stream; the public methods time them.
+    """
+
+    name = ''
+
+    def __init__(self, pool: ClientPool):
+        self.pool = pool
+        self.settings = pool.settings
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str,
+        api_key: str,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: int = 3000
+    ) -> str:
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            text = await self._complete(prompt, model, api_key, system, temperature, max_tokens)
+            outcome = 'ok'
+            return text
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            raise
+        finally:
+            LLM_SECONDS.observe(time.perf_counter() - started, provider=self.name, mode='complete', outcome=outcome)
+
+    async def stream(
+        self,
+        prompt: str,
+        model: str,
+        api_key: str,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: int = 3000
+    ) -> AsyncIterator[str]:
+        """Yield completion text as the provider produces it"""
+        started = time.perf_counter()
+        outcome = 'error'
+        first = True
+        try:
+            async for text in self._stream(prompt, model, api_key, system, temperature, max_tokens):
+                if first:
+                    LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started, provider=self.name)
+                    first = False
+                yield text
+            outcome = 'ok'
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client went away before the stream finished
+            outcome = 'cancelled'
+            raise
+        finally:
+            LLM_SECONDS.observe(time.perf_counter() - started, provider=self.name, mode='stream', outcome=outcome)
+
+    async def _complete(self, prompt, model, api_key, system, temperature, max_tokens) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, prompt, model, api_key, system, temperature, max_tokens) -> AsyncIterator[str]:
+        raise NotImplementedError
+        yield
+
+    def _record_usage(self, usage, prompt_field: Optional[str], completion_field: Optional[str]):
+        """Record a usage report, given as an SDK object or a JSON dict"""
+        if usage is None:
+            return
+
+        def field(name):
+            if name is None:
+                return None
+            return usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+
+        record_tokens(self.name, field(prompt_field), field(completion_field))
+
+
+class OpenAIProvider(LLMProvider):
+    name = 'openai'
+
+    def _client(self, api_key: str) -> 'openai.AsyncOpenAI':
+        import openai
+
+        return self.pool.get(self.name, api_key, lambda http: openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.settings.openai_base_url,
+            timeout=self.settings.build_timeout(),
+            # Retries are done by LLMService (see resilience)
+            max_retries=0,
+            http_client=http
+        ))
+
+    def _messages(self, prompt: str, system: Optional[str]) -> List[Dict]:
+        messages: List[Dict] = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    async def _complete(self, prompt, model, api_key, system, temperature, max_tokens):
+        kwargs = {'temperature': temperature} if temperature is not None else {}
+        response = await self._client(api_key).chat.completions.create(
+            model=model,
+            messages=self._messages(prompt, system),
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        self._record_usage(response.usage, 'prompt_tokens', 'completion_tokens')
+        return response.choices[0].message.content.strip()
+
+    async def _stream(self, prompt, model, api_key, system, temperature, max_tokens):
+        kwargs = {'temperature': temperature} if temperature is not None else {}
+        response = await self._client(api_key).chat.completions.create(
+            model=model,
+            messages=self._messages(prompt, system),
+            max_tokens=max_tokens,
+            stream=True,
+            # Usage arrives in one last chunk with no choices
+            stream_options={'include_usage': True},
+            **kwargs
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            self._record_usage(getattr(chunk, 'usage', None), 'prompt_tokens', 'completion_tokens')
+
+
+class ClaudeProvider(LLMProvider):
+    name = 'claude'
+
+    def _client(self, api_key: str) -> 'anthropic.AsyncAnthropic':
+        import anthropic
+
+        def factory(http):
+            kwargs = {
+                'api_key': api_key,
+                'base_url': self.settings.anthropic_base_url,
+                'timeout': self.settings.timeout,
+                'max_retries': 0
+            }
+            try:
+                return anthropic.AsyncAnthropic(http_client=http, **kwargs)
+            except TypeError:
+                # Newer SDK releases ship their own HTTP stack and reject an
+                # httpx client; the cached SDK client still keeps its own
+                # connections alive between requests.
+                return anthropic.AsyncAnthropic(**kwargs)
+
+        return self.pool.get(self.name, api_key, factory)
+
+    def _options(self, system: Optional[str], temperature: Optional[float]) -> Dict:
+        kwargs = {}
+        if system:
+            kwargs['system'] = system
+        if temperature is not None:
+            kwargs['temperature'] = temperature
+        return kwargs
+
+    async def _complete(self, prompt, model, api_key, system, temperature, max_tokens):
+        response = await self._client(api_key).messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            **self._options(system, temperature)
+        )
+        self._record_usage(response.usage, 'input_tokens', 'output_tokens')
+        return response.content[0].text.strip()
+
+    async def _stream(self, prompt, model, api_key, system, temperature, max_tokens):
+        response = await self._client(api_key).messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            **self._options(system, temperature)
+        )
+        async for event in response:
+            if event.type == 'content_block_delta' and getattr(event.delta, 'text', None):
+                yield event.delta.text
+            # Input tokens come with message_start, the output total with message_delta
+            elif event.type == 'message_start':
+                self._record_usage(event.message.usage, 'input_tokens', None)
+            elif event.type == 'message_delta':
+                self._record_usage(event.usage, None, 'output_tokens')
+
+
+class OpenRouterProvider(LLMProvider):
+    name = 'openrouter'
+
+    @property
+    def url(self) -> str:
+        return self.settings.openrouter_base_url.rstrip('/') + '/chat/completions'
+
+    def _headers(self, api_key: str) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _payload(self, prompt, model, system, temperature, max_tokens) -> Dict:
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        data = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens
+        }
+        if temperature is not None:
+            data["temperature"] = temperature
+        return data
+
+    async def _complete(self, prompt, model, api_key, system, temperature, max_tokens):
+        response = await self.pool.http.post(
+            self.url,
+            headers=self._headers(api_key),
+            json=self._payload(prompt, model, system, temperature, max_tokens)
+        )
+
+        if response.status_code == 200:
+            body = response.json()
+            self._record_usage(body.get('usage'), 'prompt_tokens', 'completion_tokens')
+            return body['choices'][0]['message']['content'].strip()
+        else:
+            raise ProviderError(f"OpenRouter API error: {response.status_code} - {response.text}",
+                                response.status_code, response.headers.get('retry-after'))
+
+    async def _stream(self, prompt, model, api_key, system, temperature, max_tokens):
+        data = self._payload(prompt, model, system, temperature, max_tokens)
+        data["stream"] = True
+
+        async with self.pool.http.stream('POST', self.url, headers=self._headers(api_key), json=data) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode('utf-8', 'replace')
+                raise ProviderError(f"OpenRouter API error: {response.status_code} - {body}",
+                                    response.status_code, response.headers.get('retry-after'))
+
+            # Server-sent events; lines starting with ':' are keep-alive comments.
+            # Reading on past [DONE] to the end of the body hands the
+            # connection back to the pool instead of closing it.
+            done = False
+            async for line in response.aiter_lines():
+                if done or not line.startswith('data:'):
+                    continue
+                payload = line[len('data:'):].strip()
+                if payload == '[DONE]':
+                    done = True
+                    continue
+                chunk = json.loads(payload)
+                if 'error' in chunk:
+                    error = chunk['error']
+                    code = error.get('code') if isinstance(error, dict) else None
+                    raise ProviderError(f"OpenRouter API error: {error}", code if isinstance(code, int) else 502)
+                self._record_usage(chunk.get('usage'), 'prompt_tokens', 'completion_tokens')
+                choices = chunk.get('choices') or []
+                text = choices[0].get('delta', {}).get('content') if choices else None
+                if text:
+                    yield text
+
+
+client_pool = ClientPool()
+
+
+def build_providers(pool: ClientPool = client_pool) -> Dict[str, LLMProvider]:
+    return {
+        'openai': OpenAIProvider(pool),
+        'claude': ClaudeProvider(pool),
+        'openrouter': OpenRouterProvider(pool)
+    }
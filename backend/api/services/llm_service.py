@@ -1,51 +1,212 @@
 """
 LLM Enhancement Service - FOCUS ON ATS SCORE IMPROVEMENT
 Supports OpenAI, Claude, and OpenRouter
+Provider calls go through a per-provider guard (rate limit, retry, circuit
+breaker) and can fall back to other providers listed in LLM_FALLBACKS.
 """
-import openai
-import anthropic
-import requests
-from typing import Dict, Optional
+import os
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from api.services.llm_providers import ClientPool, build_providers, client_pool
+from api.services.resilience import ProviderGuard, ProviderUnavailable, is_retryable, parse_fallbacks
+from api.services.response_cache import ResponseCache, build_response_cache
+from api.services.single_flight import SingleFlight, content_key
+
+# Server-side keys used when falling back to a different provider than requested
+FALLBACK_KEY_ENV = {
+    'openai': 'OPENAI_API_KEY',
+    'claude': 'ANTHROPIC_API_KEY',
+    'openrouter': 'OPENROUTER_API_KEY'
+}
 
 
 class LLMService:
     """Service to call various LLM providers for resume enhancement"""
 
-    def __init__(self):
-        self.providers = {
-            'openai': self._call_openai,
-            'claude': self._call_claude,
-            'openrouter': self._call_openrouter
-        }
+    def __init__(self, pool: ClientPool = client_pool, cache: Optional[ResponseCache] = None):
+        self.pool = pool
+        self.clients = build_providers(pool)
+        self.cache = cache if cache is not None else build_response_cache()
+        self.flights = SingleFlight()
+        self.guards = {name: ProviderGuard(name) for name in self.clients}
+        # e.g. LLM_FALLBACKS="openrouter=claude:claude-3-5-haiku-latest|openai:gpt-4o-mini"
+        self.fallbacks = parse_fallbacks(os.getenv('LLM_FALLBACKS'))
 
-    def enhance_resume(
+    async def enhance_resume(
         self,
         resume: str,
         job_description: str,
         provider: str,
         model: str,
-        api_key: str
+        api_key: str,
+        bypass_cache: bool = False
     ) -> Dict:
         """Enhance resume using specified LLM provider"""
 
-        if provider not in self.providers:
+        result = await self.complete(
+            lambda name: self._provider_request(name, resume, job_description),
+            provider, model, api_key, bypass_cache=bypass_cache
+        )
+        if not result['success']:
+            return result
+        text = result.pop('text')
+        return {'success': True, 'enhanced_resume': text, 'word_count': len(text.split()), **result}
+
+    async def complete(
+        self,
+        request_for: Callable[[str], Dict],
+        provider: str,
+        model: str,
+        api_key: str,
+        bypass_cache: bool = False
+    ) -> Dict:
+        """
+        One completion through the provider guard, fallbacks and response cache.
+        request_for(provider) gives the prompt and sampling options for a provider.
+        """
+
+        if provider not in self.clients:
             return {
                 'success': False,
                 'error': f'Unknown provider: {provider}'
             }
 
+        cache_key = ResponseCache.make_key(provider=provider, model=model, **request_for(provider))
+        cached = None if bypass_cache else await self.cache.aget(cache_key)
+        if cached is not None:
+            return {'success': True, 'text': cached, 'cached': True}
+
         try:
-            result = self.providers[provider](resume, job_description, model, api_key)
+            # Identical requests already waiting on the provider share its answer;
+            # the API key is part of the flight so one key's errors or quota
+            # never leak into another caller's request
+            result, fallback = await self.flights.do(
+                (cache_key, content_key(api_key)),
+                lambda: self._call_and_cache(cache_key, request_for, provider, model, api_key)
+            )
+            response = {'success': True, 'text': result, 'cached': False}
+            if fallback:
+                response['fallback'] = fallback
+            return response
+        except Exception as e:
+            response = {
+                'success': False,
+                'error': str(e),
+                # Worth trying again later: throttled, overloaded or refused by our own limits
+                'retryable': self._should_fall_back(e)
+            }
+            if isinstance(e, ProviderUnavailable) and e.retry_after is not None:
+                response['retry_after'] = round(e.retry_after, 3)
+            return response
+
+    async def _call_and_cache(self, cache_key, request_for, provider, model, api_key):
+        """The completion and, if another provider answered, which one"""
+        targets = self._targets(provider, model, api_key)
+        for index, (name, target_model, key) in enumerate(targets):
+            try:
+                result = await self.guards[name].call(
+                    key,
+                    lambda name=name, target_model=target_model, key=key:
+                        self.clients[name].complete(model=target_model, api_key=key, **request_for(name))
+                )
+            except Exception as e:
+                if index == len(targets) - 1 or not self._should_fall_back(e):
+                    raise
+                continue
+
+            if index == 0:
+                await self.cache.aset(cache_key, result)
+                return result, None
+            # Not what was asked for, so not cached under this request
+            return result, {'provider': name, 'model': target_model}
+
+    def _targets(self, provider: str, model: str, api_key: str) -> List[Tuple[str, str, str]]:
+        """The requested (provider, model, key), then each usable fallback"""
+        targets = [(provider, model, api_key)]
+        for fallback_provider, fallback_model in self.fallbacks.get(provider, ()):
+            if fallback_provider not in self.clients:
+                continue
+            key = api_key if fallback_provider == provider else os.getenv(FALLBACK_KEY_ENV[fallback_provider])
+            if key:
+                targets.append((fallback_provider, fallback_model, key))
+        return targets
+
+    @staticmethod
+    def _should_fall_back(error: Exception) -> bool:
+        return isinstance(error, ProviderUnavailable) or is_retryable(error)
+
+    async def stream_enhance_resume(
+        self,
+        resume: str,
+        job_description: str,
+        provider: str,
+        model: str,
+        api_key: str,
+        bypass_cache: bool = False
+    ) -> AsyncIterator[str]:
+        """Yield enhanced resume text as the provider streams it (all at once on a cache hit)"""
+
+        if provider not in self.clients:
+            raise ValueError(f'Unknown provider: {provider}')
+
+        cache_key = self._cache_key(provider, model, resume, job_description)
+        cached = None if bypass_cache else await self.cache.aget(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        targets = self._targets(provider, model, api_key)
+        for index, (name, target_model, key) in enumerate(targets):
+            request = self._provider_request(name, resume, job_description)
+            try:
+                async for text in self.guards[name].stream(
+                    key,
+                    lambda name=name, target_model=target_model, key=key, request=request:
+                        self.clients[name].stream(model=target_model, api_key=key, **request)
+                ):
+                    parts.append(text)
+                    yield text
+            except Exception as e:
+                # Once text has been sent, switching provider would mix two answers
+                if parts or index == len(targets) - 1 or not self._should_fall_back(e):
+                    raise
+                continue
+
+            # Only a completed stream from the requested provider is cached
+            if index == 0:
+                await self.cache.aset(cache_key, ''.join(parts).strip())
+            return
+
+    def provider_stats(self) -> Dict:
+        """Circuit state, limits and retry counters per provider"""
+        return {name: guard.stats() for name, guard in self.guards.items()}
+
+    def _cache_key(self, provider: str, model: str, resume: str, job_desc: str) -> str:
+        """Content hash of everything that determines the completion"""
+        request = self._provider_request(provider, resume, job_desc)
+        return ResponseCache.make_key(provider=provider, model=model, **request)
+
+    def _provider_request(self, provider: str, resume: str, job_desc: str) -> Dict:
+        """Prompt and sampling options each provider is called with"""
+        if provider == 'openai':
             return {
-                'success': True,
-                'enhanced_resume': result,
-                'word_count': len(result.split())
+                'prompt': self._build_prompt(resume, job_desc),
+                'system': "You are an expert ATS optimizer who maximizes keyword matching and scoring. Your goal is to make every resume score HIGHER on ATS systems.",
+                'temperature': 0.5,
+                'max_tokens': 3000
             }
-        except Exception as e:
+        if provider == 'claude':
             return {
-                'success': False,
-                'error': str(e)
+                'prompt': self._build_prompt(resume, job_desc),
+                'max_tokens': 3000
+            }
+        if provider == 'openrouter':
+            return {
+                'prompt': self._build_openrouter_prompt(resume, job_desc),
+                'temperature': 0.5,
+                'max_tokens': 3000
             }
+        raise ValueError(f'Unknown provider: {provider}')
 
     def _build_prompt(self, resume: str, job_desc: str) -> str:
         """Build the enhancement prompt - FOCUS ON ATS SCORE IMPROVEMENT"""
@@ -144,45 +305,11 @@ FINAL CHECKLIST BEFORE RETURNING:
 RESPONSE FORMAT:
 Return ONLY the enhanced resume text. NO preamble, NO explanations, NO markdown - just the resume content with all formatting and contact information intact."""
 
-    def _call_openai(self, resume: str, job_desc: str, model: str, api_key: str) -> str:
-        """Call OpenAI API"""
-        client = openai.OpenAI(api_key=api_key)
-        prompt = self._build_prompt(resume, job_desc)
-
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert ATS optimizer who maximizes keyword matching and scoring. Your goal is to make every resume score HIGHER on ATS systems."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5,
-            max_tokens=3000
-        )
-
-        return response.choices[0].message.content.strip()
-
-    def _call_claude(self, resume: str, job_desc: str, model: str, api_key: str) -> str:
-        """Call Claude API"""
-        client = anthropic.Anthropic(api_key=api_key)
-        prompt = self._build_prompt(resume, job_desc)
-
-        response = client.messages.create(
-            model=model,
-            max_tokens=3000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        return response.content[0].text.strip()
-
-    def _call_openrouter(self, resume: str, job_desc: str, model: str, api_key: str) -> str:
-        """Call OpenRouter API"""
+    def _build_openrouter_prompt(self, resume: str, job_desc: str) -> str:
+        """ATS-focused prompt for OpenRouter"""
         original_word_count = len(resume.split())
 
-        # ATS-focused prompt for OpenRouter
-        prompt = f"""MAXIMIZE ATS SCORE: Enhance this resume to match the job description below.
+        return f"""MAXIMIZE ATS SCORE: Enhance this resume to match the job description below.
 
 Job Description:
 {job_desc}
@@ -203,27 +330,3 @@ INSTRUCTIONS:
 GOAL: Make ATS score go UP by adding maximum relevant keywords.
 
 Return only the enhanced resume with all contact info intact."""
-
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-
-        data = {
-            "model": model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.5,
-            "max_tokens": 3000
-        }
-
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-
-        if response.status_code == 200:
-            return response.json()['choices'][0]['message']['content'].strip()
-        else:
-            raise Exception(f"OpenRouter API error: {response.status_code} - {response.text}")
\ No newline at end of file
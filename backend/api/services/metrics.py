@@ -0,0 +1,241 @@
+"""
+Metrics - latency histograms in the Prometheus text format
+- span(stage) / @timed(stage) time one processing stage
+- Samples recorded inside a process-pool job are shipped back with its
+  result and replayed here (see workers), so /metrics covers every process
+- No client library; Registry.render() writes the text exposition format
+"""
+import bisect
+import contextvars
+import functools
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Parsing stages take microseconds to seconds, LLM calls seconds to minutes
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192)
+
+# (metric name, label values, value) recorded while a journal is open
+Sample = Tuple[str, Tuple[str, ...], float]
+_journal: contextvars.ContextVar = contextvars.ContextVar('metrics_journal', default=None)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def _record(self, key: Tuple[str, ...], value: float):
+        raise NotImplementedError
+
+    def _observe(self, key: Tuple[str, ...], value: float):
+        journal = _journal.get()
+        if journal is not None:
+            journal.append((self.name, key, value))
+        self._record(key, value)
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = STAGE_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: count per bucket (last one is +Inf), sum
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        self._observe(self._key(labels), value)
+
+    def _record(self, key, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in sorted(self._series.items())]
+
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_label_text(self.labels, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_label_text(self.labels, key)} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Every metric the process exports, by name"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = STAGE_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def replay(self, samples: Sequence[Sample]):
+        """Record samples journaled in another process"""
+        for name, key, value in samples:
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric._record(tuple(key), value)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'resume_stage_duration_seconds', 'Time spent in each extraction and scoring stage', ('stage',), STAGE_BUCKETS)
+REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency until the response body is sent',
+    ('method', 'route', 'status'), REQUEST_BUCKETS)
+LLM_SECONDS = REGISTRY.histogram(
+    'llm_request_duration_seconds', 'Provider call latency until the last token',
+    ('provider', 'mode', 'outcome'), LLM_BUCKETS)
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    'llm_time_to_first_token_seconds', 'Time from a streaming provider call to its first text',
+    ('provider',), LLM_BUCKETS)
+LLM_TOKENS = REGISTRY.histogram(
+    'llm_tokens', 'Tokens per provider call, as reported by the provider',
+    ('provider', 'kind'), TOKEN_BUCKETS)
+
+
+class span:
+    """Time a block into resume_stage_duration_seconds{stage=...}"""
+
+    __slots__ = ('stage', 'started')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, stage=self.stage)
+        return False
+
+
+def timed(stage: str) -> Callable:
+    """Decorator form of span()"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_tokens(provider: str, prompt: Optional[int], completion: Optional[int]):
+    """Token counts from a provider's usage report; missing counts are skipped"""
+    if prompt is not None:
+        LLM_TOKENS.observe(prompt, provider=provider, kind='prompt')
+    if completion is not None:
+        LLM_TOKENS.observe(completion, provider=provider, kind='completion')
+
+
+def call_journaled(func: Callable, *args, **kwargs) -> Tuple[object, List[Sample]]:
+    """Run func, returning its result and the metric samples it recorded"""
+    samples: List[Sample] = []
+    token = _journal.set(samples)
+    try:
+        return func(*args, **kwargs), samples
+    finally:
+        _journal.reset(token)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request, streamed bodies included"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = ['500']
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = str(message['status'])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope['method'],
+                route=_route_template(scope),
+                status=status[0]
+            )
+
+
+def _route_template(scope) -> str:
+    """The matched route's path template; raw paths would make labels unbounded"""
+    route = scope.get('route')
+    if route is None:
+        return 'unmatched'
+    # Newer FastAPI releases keep routes of an included router relative to its prefix
+    included = (scope.get('fastapi') or {}).get('included_router')
+    prefix = getattr(getattr(included, 'include_context', None), 'prefix', '')
+    return prefix + route.path
+
@@ -0,0 +1,305 @@
+"""
+Resilience - keep provider calls within limits and fail fast when a provider is down
+- Token bucket and concurrency cap per (provider, api_key)
+- Jittered exponential retry on 429 / 5xx / connection errors, honouring Retry-After
+- Circuit breaker per provider: after repeated failures calls are refused
+  until a cool-down passes, then one trial call decides whether to close it
+Limits come from LLM_* environment variables; each can be overridden per
+provider with a suffix, e.g. LLM_RATE_LIMIT_OPENROUTER.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from api.services.config import env_float
+from api.services.single_flight import content_key
+
+# Rate limited, overloaded or unavailable; 529 is Anthropic's "overloaded"
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+# SDK exceptions for requests that never got a response
+RETRYABLE_ERRORS = ('APIConnectionError', 'APITimeoutError', 'ConnectError', 'ReadTimeout',
+                    'ConnectTimeout', 'RemoteProtocolError', 'ReadError', 'PoolTimeout')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def _env_float(name: str, provider: str, default: float) -> float:
+    """A provider's own setting (name_PROVIDER), else the shared one"""
+    return env_float(f'{name}_{provider.upper()}', env_float(name, default))
+
+
+class ProviderUnavailable(Exception):
+    """Refused before reaching the provider: circuit open or rate limit wait too long"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a provider error (SDK errors and ProviderError carry one)"""
+    code = getattr(error, 'status_code', None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return type(error).__name__ in RETRYABLE_ERRORS or isinstance(error, asyncio.TimeoutError)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, if it said"""
+    value = getattr(error, 'retry_after', None)
+    if value is None:
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+        value = headers.get('retry-after') if headers is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        # HTTP-date form; fall back to our own backoff
+        return None
+
+
+class TokenBucket:
+    """rate tokens per second, holding at most burst"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token now, returning how long the caller must wait for it"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def cancel(self):
+        """Give back a reserved token that will not be used"""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures; one trial call after `reset_after` seconds"""
+
+    def __init__(self, failures: int, reset_after: float):
+        self.failure_threshold = failures
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise ProviderUnavailable if the call should not be made"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.reset_after - time.monotonic()
+                if remaining > 0:
+                    raise ProviderUnavailable('Provider circuit is open after repeated failures', remaining)
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._trial_running:
+                    raise ProviderUnavailable('Provider circuit is half-open; a trial call is running',
+                                              self.reset_after)
+                self._trial_running = True
+
+    def record(self, success: bool):
+        with self._lock:
+            self._trial_running = False
+            if success:
+                self.state = CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """The call was abandoned without an outcome (e.g. cancelled)"""
+        with self._lock:
+            self._trial_running = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            data = {'state': self.state, 'consecutive_failures': self.failures}
+            if self.state == OPEN:
+                data['retry_in'] = round(max(0.0, self.opened_at + self.reset_after - time.monotonic()), 3)
+            return data
+
+
+class ProviderGuard:
+    """Rate limit, concurrency cap, retries and circuit breaker for one provider"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        # Requests per second and burst per (provider, api_key); 0 = unlimited
+        self.rate = _env_float('LLM_RATE_LIMIT', provider, 10.0)
+        self.burst = _env_float('LLM_RATE_BURST', provider, 20.0)
+        # Longest a caller waits for a token or slot before being refused
+        self.max_wait = _env_float('LLM_RATE_MAX_WAIT', provider, 30.0)
+        self.max_concurrent = int(_env_float('LLM_MAX_CONCURRENT_PER_KEY', provider, 8))
+        self.retries = int(_env_float('LLM_RETRIES', provider, 2))
+        self.retry_base = _env_float('LLM_RETRY_BASE', provider, 0.5)
+        self.retry_max_delay = _env_float('LLM_RETRY_MAX_DELAY', provider, 8.0)
+        self.breaker = CircuitBreaker(
+            failures=int(_env_float('LLM_BREAKER_FAILURES', provider, 5)),
+            reset_after=_env_float('LLM_BREAKER_RESET', provider, 30.0)
+        )
+        self.max_keys = 1024
+        self._limits: "OrderedDict[str, Tuple[Optional[TokenBucket], asyncio.Semaphore]]" = OrderedDict()
+        self.retried = 0
+        self.refused = 0
+
+    def _limit(self, api_key: str) -> Tuple[Optional[TokenBucket], asyncio.Semaphore]:
+        key = content_key(api_key)
+        limit = self._limits.get(key)
+        if limit is None:
+            bucket = TokenBucket(self.rate, self.burst) if self.rate > 0 else None
+            limit = (bucket, asyncio.Semaphore(max(1, self.max_concurrent)))
+            self._limits[key] = limit
+            while len(self._limits) > self.max_keys:
+                self._limits.popitem(last=False)
+        else:
+            self._limits.move_to_end(key)
+        return limit
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """Full-jitter exponential delay, but never shorter than a Retry-After"""
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base * 2 ** attempt))
+        asked = retry_after(error)
+        return max(delay, asked) if asked is not None else delay
+
+    async def _admit(self, api_key: str) -> asyncio.Semaphore:
+        """Pass the breaker, then wait for a token and a concurrency slot; returns the held slot"""
+        self.breaker.before_call()
+        try:
+            return await self._acquire(api_key)
+        except BaseException:
+            # Refused or cancelled before calling: a half-open trial never ran
+            self.breaker.release()
+            raise
+
+    async def _acquire(self, api_key: str) -> asyncio.Semaphore:
+        bucket, slots = self._limit(api_key)
+        if bucket is not None:
+            wait = bucket.reserve()
+            if wait > self.max_wait:
+                bucket.cancel()
+                self.refused += 1
+                raise ProviderUnavailable('Rate limit for this provider and key exceeded', wait)
+            if wait:
+                await asyncio.sleep(wait)
+        try:
+            await asyncio.wait_for(slots.acquire(), self.max_wait)
+        except asyncio.TimeoutError:
+            self.refused += 1
+            raise ProviderUnavailable('Too many concurrent requests for this provider and key', self.max_wait)
+        return slots
+
+    async def call(self, api_key: str, make_call: Callable[[], Awaitable]):
+        """Await make_call() within the limits, retrying retryable failures"""
+        attempt = 0
+        while True:
+            slots = await self._admit(api_key)
+            try:
+                result = await make_call()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    self.breaker.record(success=False)
+                else:
+                    # Client errors (bad key, bad model) say nothing about provider
+                    # health: they neither close a half-open circuit nor clear failures
+                    self.breaker.release()
+                if not retryable or attempt >= self.retries:
+                    raise
+                delay = self.backoff(attempt, e)
+            else:
+                self.breaker.record(success=True)
+                return result
+            finally:
+                slots.release()
+
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(delay)
+
+    async def stream(self, api_key: str, make_stream: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Yield from make_stream() within the limits. Failures before the first
+        chunk are retried like call(); after it, text already sent can't be
+        taken back, so the error is raised as is.
+        """
+        attempt = 0
+        while True:
+            slots = await self._admit(api_key)
+            started = False
+            delay = None
+            try:
+                async for text in make_stream():
+                    started = True
+                    yield text
+                self.breaker.record(success=True)
+                return
+            except (asyncio.CancelledError, GeneratorExit):
+                self.breaker.release()
+                raise
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    self.breaker.record(success=False)
+                else:
+                    self.breaker.release()
+                if started or not retryable or attempt >= self.retries:
+                    raise
+                delay = self.backoff(attempt, e)
+            finally:
+                slots.release()
+
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict:
+        return {
+            'circuit': self.breaker.snapshot(),
+            'rate_limit': self.rate or None,
+            'max_concurrent_per_key': self.max_concurrent,
+            'retried': self.retried,
+            'refused': self.refused
+        }
+
+
+def parse_fallbacks(value: Optional[str]) -> Dict[str, Tuple[Tuple[str, str], ...]]:
+    """'openrouter=claude:claude-3-5-haiku-latest|openai:gpt-4o-mini,claude=openai:gpt-4o'"""
+    fallbacks = {}
+    for entry in (value or '').split(','):
+        if '=' not in entry:
+            continue
+        provider, targets = entry.split('=', 1)
+        chain = []
+        for target in targets.split('|'):
+            if ':' in target:
+                fallback_provider, model = target.split(':', 1)
+                chain.append((fallback_provider.strip(), model.strip()))
+        fallbacks[provider.strip()] = tuple(chain)
+    return fallbacks
@@ -0,0 +1,335 @@
+"""
+Response Cache - content-addressed caches for LLM and extraction results
+- Keyed on a hash of everything that determines the result
+- Pluggable backends: in-memory LRU or on-disk SQLite, optionally tiered
+- TTL, entry-count and byte-size eviction, hit/miss counters
+- aget/aset for async callers: caches with a disk tier are read and written
+  on the I/O thread pool, memory-only caches inline
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from api.services.config import env_int
+from api.services.workers import io_pool
+
+# A hit refreshes a SQLite row's last access at most this often, in seconds,
+# so hot keys are not written (and committed) on every read
+ACCESS_RESOLUTION = 60.0
+
+
+class CacheBackend:
+    """Storage for cached values"""
+
+    max_bytes: Optional[int] = None
+    size_bytes = 0
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Bounded LRU held in process memory"""
+
+    def __init__(self, max_entries: int = 512, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _drop(self, key: str):
+        value, _ = self._entries.pop(key)
+        self.size_bytes -= len(value)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.time())
+            self.size_bytes += len(value)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.size_bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk store that survives restarts; least recently used rows are evicted"""
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        table: str = 'responses'
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.table = table
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL DEFAULT 0, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+        self._conn.commit()
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at, accessed_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at, accessed_at = row
+            if self.ttl is not None and now - stored_at > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            if now - accessed_at > ACCESS_RESOLUTION:
+                self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str):
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        now = time.time()
+        table = self.table
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} (key, value, size, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now)
+            )
+            if self.ttl is not None:
+                self._conn.execute(f"DELETE FROM {table} WHERE stored_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE key IN ("
+                f"SELECT key FROM {table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            if self.max_bytes is not None:
+                # Keep the most recently used rows whose running size fits
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE key IN ("
+                    f"SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running "
+                    f"FROM {table}) WHERE running > ?)",
+                    (self.max_bytes,)
+                )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class ResponseCache:
+    """Content-addressed cache with hit/miss accounting"""
+
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """SHA-256 over the canonical JSON of the parts that determine a completion"""
+        canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        if self.backend is not None:
+            self.backend.set(key, value)
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether reads and writes touch disk, and so belong off the event loop"""
+        return self.backend is not None and not isinstance(self.backend, MemoryCacheBackend)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await io_pool.run(self.get, key) if self.on_disk else self.get(key)
+
+    async def aset(self, key: str, value: str):
+        if self.on_disk:
+            await io_pool.run(self.set, key, value)
+        else:
+            self.set(key, value)
+
+    async def astats(self) -> Dict:
+        return await io_pool.run(self.stats) if self.on_disk else self.stats()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__ if self.backend is not None else None,
+            'entries': len(self.backend) if self.backend is not None else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class TieredCache(ResponseCache):
+    """
+    Fast tier first, slower tiers behind it. A hit in a later tier is copied
+    into the earlier ones; writes go to every tier.
+    """
+
+    def __init__(self, tiers: List[CacheBackend]):
+        super().__init__(tiers[0] if tiers else None)
+        self.tiers = tiers
+        self.tier_hits = [0] * len(tiers)
+
+    def get(self, key: str) -> Optional[str]:
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for earlier in self.tiers[:index]:
+                    earlier.set(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.tier_hits[index] += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    @property
+    def on_disk(self) -> bool:
+        return any(not isinstance(tier, MemoryCacheBackend) for tier in self.tiers)
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats['backend'] = [type(tier).__name__ for tier in self.tiers]
+        stats['tiers'] = [
+            {
+                'backend': type(tier).__name__,
+                'entries': len(tier),
+                'size_bytes': tier.size_bytes,
+                'max_bytes': tier.max_bytes,
+                'hits': hits
+            }
+            for tier, hits in zip(self.tiers, self.tier_hits)
+        ]
+        return stats
+
+
+def build_response_cache() -> ResponseCache:
+    """Create the enhancement cache configured by ENHANCE_CACHE_* environment variables"""
+    kind = os.getenv('ENHANCE_CACHE_BACKEND', 'memory').lower()
+    ttl_value = os.getenv('ENHANCE_CACHE_TTL', '86400')
+    ttl = float(ttl_value) if ttl_value and float(ttl_value) > 0 else None
+    max_entries = env_int('ENHANCE_CACHE_MAX_ENTRIES', 512)
+
+    if kind == 'sqlite':
+        path = os.getenv('ENHANCE_CACHE_PATH', '.cache/enhancements.sqlite3')
+        return ResponseCache(SQLiteCacheBackend(path, max_entries=max_entries, ttl=ttl))
+    if kind == 'memory':
+        return ResponseCache(MemoryCacheBackend(max_entries=max_entries, ttl=ttl))
+    return ResponseCache(None)
+
+
+def build_extraction_cache() -> TieredCache:
+    """
+    Create the document extraction cache configured by EXTRACT_CACHE_*
+    environment variables: a memory tier, plus a SQLite tier when
+    EXTRACT_CACHE_PATH is set.
+    """
+    tiers: List[CacheBackend] = []
+
+    memory_bytes = env_int('EXTRACT_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+    if memory_bytes > 0:
+        tiers.append(MemoryCacheBackend(
+            max_entries=env_int('EXTRACT_CACHE_MAX_ENTRIES', 256),
+            max_bytes=memory_bytes
+        ))
+
+    path = os.getenv('EXTRACT_CACHE_PATH')
+    if path:
+        tiers.append(SQLiteCacheBackend(
+            path,
+            max_entries=env_int('EXTRACT_CACHE_DISK_MAX_ENTRIES', 10000),
+            max_bytes=env_int('EXTRACT_CACHE_DISK_MAX_BYTES', 1024 * 1024 * 1024),
+            table='extractions'
+        ))
+
+    return TieredCache(tiers)
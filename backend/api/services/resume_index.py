@@ -0,0 +1,530 @@
+"""
+Resume Index - on-disk inverted index for top-k resumes by job description
+- Postings per (term, section) from the sections DocumentExtractor parses, so
+  a keyword under SKILLS can count for more than one in the header
+- Postings are stored in blocks of up to BLOCK_SIZE documents: doc-id gaps
+  packed at the narrowest integer width that fits, then term frequencies as
+  bytes. A block decodes with array.frombytes and accumulate, at C speed
+- Resumes are added, replaced and deleted incrementally; each keeps its own
+  (term, section) list, so deleting one rewrites only the blocks it is in
+- A query is the JD's top keywords (the ones ATSScorer matches) ranked with
+  BM25F. Terms are visited rarest first; once no unseen resume can reach
+  the current top k, only resumes still in contention are scored
+Search time grows with the postings a JD's keywords touch, which is roughly
+linear in the number of resumes: on generated corpora p50 is about 33 ms at
+10k resumes and 240 ms at 100k (benchmarks/resume_index.py), against ~1 ms
+per resume for brute-force scoring. Decoding and accumulating stay in
+Python, so single-digit milliseconds at 100k is out of reach here; that
+needs compiled scoring or sharding the index across processes.
+"""
+import heapq
+import itertools
+import json
+import math
+import operator
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from api.services.ats_scorer import JobDescriptionProfile, keyword_words
+from api.services.extraction_pipeline import SECTION_NAMES
+from api.services.metrics import timed
+
+BLOCK_SIZE = 128
+SECTION_COUNT = len(SECTION_NAMES)
+SECTION_IDS = {name: index for index, name in enumerate(SECTION_NAMES)}
+
+# BM25F: per-section weights, saturation and length normalisation
+SECTION_WEIGHTS = {'skills': 2.0, 'experience': 1.5, 'summary': 1.2, 'projects': 1.2, 'certifications': 1.2}
+K1 = 1.2
+B = 0.75
+
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+_GAP_CODES = (('B', 1 << 8), ('H', 1 << 16), (_UINT32, 1 << 32))
+# Blocks are little-endian on disk whatever the host
+_SWAP = sys.byteorder == 'big'
+
+
+def encode_block(doc_ids: Sequence[int], tfs: Sequence[int]) -> bytes:
+    """Gaps after the first doc id at the narrowest width, then tfs capped at 255"""
+    gaps = list(map(operator.sub, doc_ids[1:], doc_ids[:-1]))
+    widest = max(gaps, default=0)
+    code = next(code for code, limit in _GAP_CODES if widest < limit)
+    packed = array(code, gaps)
+    if _SWAP:
+        packed.byteswap()
+    counts = array('B', tfs) if max(tfs) < 256 else array('B', [min(tf, 255) for tf in tfs])
+    return code.encode() + packed.tobytes() + counts.tobytes()
+
+
+def decode_block(first_doc: int, count: int, data: bytes) -> Tuple[List[int], array]:
+    """(doc ids, tfs) of a block"""
+    packed = array(chr(data[0]))
+    gap_bytes = (count - 1) * packed.itemsize
+    packed.frombytes(data[1:1 + gap_bytes])
+    if _SWAP:
+        packed.byteswap()
+    tfs = array('B')
+    tfs.frombytes(data[1 + gap_bytes:])
+    return list(itertools.accumulate(packed, initial=first_doc)), tfs
+
+
+def _pack_ints(values: Iterable[int]) -> bytes:
+    packed = array(_UINT32, values)
+    if _SWAP:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_ints(data: bytes) -> array:
+    packed = array(_UINT32)
+    packed.frombytes(data)
+    if _SWAP:
+        packed.byteswap()
+    return packed
+
+
+def section_terms(sections: Dict) -> Dict[int, Counter]:
+    """Term frequencies per section id, from a parse_sections result"""
+    counts = {}
+    for name, section_data in sections.items():
+        section = SECTION_IDS.get(name)
+        content = section_data.get('content', '') if isinstance(section_data, dict) else section_data
+        if section is not None and content:
+            terms = Counter(keyword_words(content))
+            if terms:
+                counts[section] = terms
+    return counts
+
+
+class ResumeIndex:
+    """BM25F inverted index over resume sections, stored in SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS terms ("
+            "term_id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL, df INTEGER NOT NULL);"
+            # AUTOINCREMENT: doc ids never go back, so new postings always append
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "doc_id INTEGER PRIMARY KEY AUTOINCREMENT, resume_id TEXT UNIQUE NOT NULL, "
+            "lengths BLOB NOT NULL, terms BLOB NOT NULL, tfs BLOB NOT NULL, metadata TEXT, added_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term_id INTEGER NOT NULL, section INTEGER NOT NULL, first_doc INTEGER NOT NULL, "
+            "count INTEGER NOT NULL, data BLOB NOT NULL, "
+            "PRIMARY KEY (term_id, section, first_doc)) WITHOUT ROWID;"
+        )
+        self._conn.commit()
+
+        # Section lengths by doc id, loaded on first use; small enough to hold for 100k+ resumes
+        self._lengths: Optional[List[array]] = None
+        self._totals = [0] * SECTION_COUNT
+        self._doc_count = 0
+
+    def _load(self):
+        if self._lengths is not None:
+            return
+        self._lengths = [array(_UINT32) for _ in range(SECTION_COUNT)]
+        for doc_id, lengths in self._conn.execute("SELECT doc_id, lengths FROM docs"):
+            self._set_lengths(doc_id, _unpack_ints(lengths))
+
+    def _set_lengths(self, doc_id: int, lengths: Sequence[int], sign: int = 1):
+        for section, length in enumerate(lengths):
+            column = self._lengths[section]
+            if len(column) <= doc_id:
+                column.extend(itertools.repeat(0, doc_id + 1 - len(column)))
+            column[doc_id] = length if sign > 0 else 0
+            self._totals[section] += sign * length
+        self._doc_count += sign
+
+    def _rollback(self):
+        self._conn.rollback()
+        # In-memory lengths may have moved with the rolled back rows; reload them
+        self._lengths = None
+        self._totals = [0] * SECTION_COUNT
+        self._doc_count = 0
+
+    # ---- writes ----
+
+    def add(self, resume_id: str, sections: Dict, metadata: Optional[Dict] = None) -> Dict:
+        """Index one resume, replacing any earlier version with the same id"""
+        return self.add_many([(resume_id, sections, metadata)])[0]
+
+    @timed('index_add')
+    def add_many(self, resumes: Iterable[Tuple[str, Dict, Optional[Dict]]]) -> List[Dict]:
+        """
+        Index several resumes in one transaction. Postings for the whole batch
+        are appended per (term, section), so large batches touch each posting
+        list once.
+        """
+        resumes = list(resumes)
+        with self._lock:
+            self._load()
+            try:
+                summaries = self._add_many(resumes)
+                self._conn.commit()
+            except BaseException:
+                self._rollback()
+                raise
+        return summaries
+
+    def _add_many(self, resumes: List[Tuple[str, Dict, Optional[Dict]]]) -> List[Dict]:
+        # Later copies of an id in one batch win
+        resumes = list({resume_id: (resume_id, sections, metadata)
+                        for resume_id, sections, metadata in resumes}.values())
+        # Replaced versions go first, so their terms' df is settled before ids are looked up
+        for resume_id, _, _ in resumes:
+            self._delete(resume_id)
+
+        parsed = [(resume_id, section_terms(sections), metadata) for resume_id, sections, metadata in resumes]
+        term_ids = self._term_ids({term for _, counts, _ in parsed for terms in counts.values() for term in terms})
+
+        # Postings to append per (term, section) key: term_id * SECTION_COUNT + section
+        pending: Dict[int, Tuple[List[int], List[int]]] = {}
+        df_changes: Counter = Counter()
+        summaries = []
+
+        for resume_id, counts, metadata in parsed:
+            lengths = [0] * SECTION_COUNT
+            keys, tfs = [], []
+            for section, terms in counts.items():
+                lengths[section] = sum(terms.values())
+                for term, tf in terms.items():
+                    keys.append(term_ids[term] * SECTION_COUNT + section)
+                    tfs.append(tf)
+
+            # The resume's own (term, section) list, sorted, with tfs alongside
+            forward = sorted(zip(keys, tfs))
+            cursor = self._conn.execute(
+                "INSERT INTO docs (resume_id, lengths, terms, tfs, metadata, added_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (resume_id, _pack_ints(lengths), _pack_ints(key for key, _ in forward),
+                 bytes(min(tf, 255) for _, tf in forward),
+                 json.dumps(metadata) if metadata is not None else None, time.time())
+            )
+            doc_id = cursor.lastrowid
+            self._set_lengths(doc_id, lengths)
+
+            for key, tf in zip(keys, tfs):
+                entry = pending.get(key)
+                if entry is None:
+                    entry = pending[key] = ([], [])
+                entry[0].append(doc_id)
+                entry[1].append(tf)
+            df_changes.update({key // SECTION_COUNT for key in keys})
+            summaries.append({'resume_id': resume_id, 'terms': len(keys), 'length': sum(lengths)})
+
+        blocks = []
+        for key, (docs, tfs) in pending.items():
+            blocks.extend(self._appended_blocks(*divmod(key, SECTION_COUNT), docs, tfs))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO postings (term_id, section, first_doc, count, data) VALUES (?, ?, ?, ?, ?)", blocks)
+        self._conn.executemany("UPDATE terms SET df = df + ? WHERE term_id = ?",
+                               [(change, term_id) for term_id, change in df_changes.items()])
+        return summaries
+
+    def _term_ids(self, terms: Iterable[str]) -> Dict[str, int]:
+        """Ids for terms, creating the missing ones"""
+        terms = list(terms)
+        ids = {}
+        # Well under SQLite's bound-parameter limit
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT term, term_id FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk)
+            ids.update(rows)
+        missing = [term for term in terms if term not in ids]
+        for term in missing:
+            ids[term] = self._conn.execute("INSERT INTO terms (term, df) VALUES (?, 0)", (term,)).lastrowid
+        return ids
+
+    def _appended_blocks(self, term_id: int, section: int, docs: List[int], tfs: List[int]) -> List[tuple]:
+        """Rows appending postings above every existing doc id, filling the last block first"""
+        last = self._conn.execute(
+            "SELECT first_doc, count, data FROM postings WHERE term_id = ? AND section = ? "
+            "ORDER BY first_doc DESC LIMIT 1", (term_id, section)
+        ).fetchone()
+        if last is not None and last[1] < BLOCK_SIZE:
+            old_docs, old_tfs = decode_block(*last)
+            docs = old_docs + docs
+            tfs = old_tfs.tolist() + tfs
+        return self._blocks(term_id, section, docs, tfs)
+
+    @staticmethod
+    def _blocks(term_id: int, section: int, docs: List[int], tfs: List[int]) -> List[tuple]:
+        return [
+            (term_id, section, docs[start], len(docs[start:start + BLOCK_SIZE]),
+             encode_block(docs[start:start + BLOCK_SIZE], tfs[start:start + BLOCK_SIZE]))
+            for start in range(0, len(docs), BLOCK_SIZE)
+        ]
+
+    def delete(self, resume_id: str) -> bool:
+        """Remove a resume, returning whether it was indexed"""
+        with self._lock:
+            self._load()
+            try:
+                deleted = self._delete(resume_id)
+                self._conn.commit()
+            except BaseException:
+                self._rollback()
+                raise
+        return deleted
+
+    def _delete(self, resume_id: str) -> bool:
+        row = self._conn.execute(
+            "SELECT doc_id, lengths, terms FROM docs WHERE resume_id = ?", (resume_id,)).fetchone()
+        if row is None:
+            return False
+        doc_id, lengths, keys = row
+
+        term_ids = set()
+        for key in _unpack_ints(keys):
+            term_id, section = divmod(key, SECTION_COUNT)
+            term_ids.add(term_id)
+            self._remove_posting(term_id, section, doc_id)
+
+        changed = [(term_id,) for term_id in term_ids]
+        self._conn.executemany("UPDATE terms SET df = df - 1 WHERE term_id = ?", changed)
+        self._conn.executemany("DELETE FROM terms WHERE term_id = ? AND df <= 0", changed)
+        self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+        self._set_lengths(doc_id, _unpack_ints(lengths), sign=-1)
+        return True
+
+    def _remove_posting(self, term_id: int, section: int, doc_id: int):
+        block = self._conn.execute(
+            "SELECT first_doc, count, data FROM postings WHERE term_id = ? AND section = ? AND first_doc <= ? "
+            "ORDER BY first_doc DESC LIMIT 1", (term_id, section, doc_id)
+        ).fetchone()
+        if block is None:
+            return
+        docs, tfs = decode_block(*block)
+        position = bisect_left(docs, doc_id)
+        if position == len(docs) or docs[position] != doc_id:
+            return
+        del docs[position]
+        del tfs[position]
+
+        if position == 0:
+            # The block's key is its first doc id
+            self._conn.execute("DELETE FROM postings WHERE term_id = ? AND section = ? AND first_doc = ?",
+                               (term_id, section, doc_id))
+        if docs:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO postings (term_id, section, first_doc, count, data) VALUES (?, ?, ?, ?, ?)",
+                self._blocks(term_id, section, docs, tfs.tolist()))
+
+    # ---- queries ----
+
+    @timed('index_search')
+    def search(self, job_description: str, k: int = 10, sections: Optional[Sequence[str]] = None) -> Dict:
+        """Top k resumes for a JD by BM25F over its top keywords, optionally limited to some sections"""
+        started = time.perf_counter()
+        unknown = set(sections or ()) - SECTION_IDS.keys()
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+        query = JobDescriptionProfile(job_description).top_keywords
+        section_ids = [SECTION_IDS[name] for name in sections] if sections else list(range(SECTION_COUNT))
+
+        with self._lock:
+            self._load()
+            rows = self._conn.execute(
+                f"SELECT term, term_id, df FROM terms WHERE term IN ({','.join('?' * len(query))})", query
+            ).fetchall() if query else []
+            doc_count = self._doc_count
+
+            # Rarest first, so the top k settles before the common terms
+            weighted = sorted(
+                ((math.log(1 + (doc_count - df + 0.5) / (df + 0.5)), term, term_id) for term, term_id, df in rows),
+                reverse=True
+            )
+            plan = _Query(self, weighted, section_ids)
+            scores = plan.top_k(k)
+            top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+            results = self._results(top, {term_id: term for _, term, term_id in weighted})
+
+        return {
+            'results': results,
+            'query_terms': [term for _, term, _ in weighted],
+            'total_resumes': doc_count,
+            'took_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def _results(self, top: List[Tuple[int, float]], query_terms: Dict[int, str]) -> List[Dict]:
+        results = []
+        for doc_id, score in top:
+            resume_id, keys, metadata = self._conn.execute(
+                "SELECT resume_id, terms, metadata FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+            matched = {key // SECTION_COUNT for key in _unpack_ints(keys)}
+            results.append({
+                'resume_id': resume_id,
+                'score': round(score, 4),
+                'matched_terms': [term for term_id, term in query_terms.items() if term_id in matched],
+                'metadata': json.loads(metadata) if metadata else None
+            })
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._load()
+            terms, = self._conn.execute("SELECT COUNT(*) FROM terms").fetchone()
+            blocks, postings, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(count), 0), COALESCE(SUM(LENGTH(data)), 0) FROM postings"
+            ).fetchone()
+        return {
+            'resumes': self._doc_count,
+            'terms': terms,
+            'postings': postings,
+            'blocks': blocks,
+            'postings_bytes': size,
+            'bytes_per_posting': round(size / postings, 3) if postings else None
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Query:
+    """
+    One search: per-query constants plus the two ways to score resumes,
+    term at a time from postings or resume at a time from their own term lists
+    """
+
+    # Once pruning leaves this few candidates, they are scored from their own term lists
+    FORWARD_LIMIT = 64
+
+    def __init__(self, index: ResumeIndex, weighted: List[Tuple[float, str, int]], section_ids: List[int]):
+        self.conn = index._conn
+        self.lengths = index._lengths
+        self.weighted = weighted
+        self.idf = {term_id: idf for idf, _, term_id in weighted}
+        self.section_ids = section_ids
+        # Per section: (BM25F weight, length scale), None if the section is empty or not searched
+        self.norms = [
+            (SECTION_WEIGHTS.get(SECTION_NAMES[section], 1.0), B * index._doc_count / total)
+            if total and section in section_ids else None
+            for section, total in enumerate(index._totals)
+        ]
+        self.keys = frozenset(term_id * SECTION_COUNT + section for term_id in self.idf for section in section_ids)
+
+    def top_k(self, k: int) -> Dict[int, float]:
+        """
+        Scores that include the true top k, each exact. Others may be
+        underestimates, which is safe: they were already out of reach.
+        """
+        weighted = self.weighted
+        # Before term i, the most any resume can still gain (each term adds under its idf)
+        remaining = list(itertools.accumulate(reversed([idf for idf, _, _ in weighted])))[::-1] + [0.0]
+        # Partial scores: lower bounds that become exact once every term is added
+        scores: Dict[int, float] = {}
+        threshold = 0.0
+        pruned = False
+
+        for position, (idf, _, term_id) in enumerate(weighted):
+            bound = remaining[position]
+            # The k-th best partial score is a lower bound on the k-th final one;
+            # no partial score exceeds the idf already spent, so check only once it could prune
+            if len(scores) >= k and (pruned or remaining[0] - bound >= bound):
+                threshold = heapq.nlargest(k, scores.values())[-1]
+
+            if threshold >= bound:
+                # No resume without a score yet can reach the top k; keep those that still can
+                candidates = [doc for doc, score in scores.items() if score + bound >= threshold]
+                if len(candidates) <= self.FORWARD_LIMIT:
+                    return self.exact_scores(candidates)
+                scores = {doc: scores[doc] for doc in candidates}
+                pruned = True
+
+            weights = self.term_weights(term_id, sorted(scores) if pruned else None)
+            saturated = [(doc, idf * weight / (K1 + weight)) for doc, weight in weights.items()]
+            if pruned:
+                for doc, contribution in saturated:
+                    scores[doc] += contribution
+                continue
+            # A resume first seen here needs at least this much from this term to reach the top k
+            admit = threshold - remaining[position + 1]
+            get = scores.get
+            for doc, contribution in saturated:
+                previous = get(doc)
+                if previous is not None:
+                    scores[doc] = previous + contribution
+                elif contribution >= admit:
+                    scores[doc] = contribution
+
+        return scores
+
+    def term_weights(self, term_id: int, candidates: Optional[List[int]] = None) -> Dict[int, float]:
+        """
+        Section-weighted, length-normalised tf per resume for one term. With
+        candidates (sorted doc ids), only blocks that can hold one are decoded.
+        """
+        weights: Dict[int, float] = {}
+        section_ids = self.section_ids
+        blocks = self.conn.execute(
+            f"SELECT section, first_doc, count, data FROM postings WHERE term_id = ? "
+            f"AND section IN ({','.join('?' * len(section_ids))}) ORDER BY section, first_doc",
+            (term_id, *section_ids)
+        ).fetchall()
+
+        for index, (section, first_doc, count, data) in enumerate(blocks):
+            norm = self.norms[section]
+            if norm is None:
+                continue
+            if candidates is not None:
+                # A block holds ids from its first doc up to the next block's first doc
+                following = blocks[index + 1] if index + 1 < len(blocks) else None
+                end = following[1] if following is not None and following[0] == section else math.inf
+                lo = bisect_left(candidates, first_doc)
+                hi = bisect_left(candidates, end, lo)
+                if lo == hi:
+                    continue
+
+            weight, scale = norm
+            lengths = self.lengths[section]
+            docs, tfs = decode_block(first_doc, count, data)
+            if candidates is not None:
+                postings = dict(zip(docs, tfs))
+                pairs = [(doc, postings[doc]) for doc in candidates[lo:hi] if doc in postings]
+            else:
+                pairs = zip(docs, tfs)
+            get = weights.get
+            for doc, tf in pairs:
+                weights[doc] = get(doc, 0.0) + weight * tf / (1 - B + scale * lengths[doc])
+        return weights
+
+    def exact_scores(self, doc_ids: Sequence[int]) -> Dict[int, float]:
+        """Full BM25F scores from each resume's own (term, section) list"""
+        scores = {}
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT doc_id, terms, tfs FROM docs WHERE doc_id IN ({','.join('?' * len(chunk))})", chunk)
+            for doc_id, keys, tfs in rows:
+                keys = _unpack_ints(keys)
+                weights: Dict[int, float] = {}
+                for key in self.keys.intersection(keys):
+                    term_id, section = divmod(key, SECTION_COUNT)
+                    norm = self.norms[section]
+                    if norm is None:
+                        continue
+                    weight, scale = norm
+                    tf = tfs[bisect_left(keys, key)]
+                    weights[term_id] = weights.get(term_id, 0.0) + weight * tf / (
+                        1 - B + scale * self.lengths[section][doc_id])
+                scores[doc_id] = sum(self.idf[term_id] * weight / (K1 + weight) for term_id, weight in weights.items())
+        return scores
+
+
+def build_resume_index() -> ResumeIndex:
+    """Index at RESUME_INDEX_PATH (':memory:' keeps it in process memory)"""
+    return ResumeIndex(os.getenv('RESUME_INDEX_PATH', '.cache/resume_index.sqlite3'))
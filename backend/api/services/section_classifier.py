@@ -0,0 +1,109 @@
+"""
+Section Classifier - decide once whether a line is a section header, and which
+- Hashed table for exact header names
+- One compiled alternation for header names inside longer lines
+- Ordered keyword table routing a header to its section
+- Memoized per line; resumes repeat the same short lines a lot
+"""
+import functools
+import re
+from typing import List, Optional, Sequence, Tuple
+
+KNOWN_SECTIONS = [
+    # Summary
+    'SUMMARY', 'PROFESSIONAL SUMMARY', 'PROFILE', 'OBJECTIVE', 'ABOUT ME', 'OVERVIEW',
+    # Experience
+    'EXPERIENCE', 'WORK EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'EMPLOYMENT',
+    'WORK HISTORY', 'CAREER HISTORY', 'EMPLOYMENT HISTORY',
+    # Education - EXPANDED
+    'EDUCATION', 'ACADEMIC BACKGROUND', 'ACADEMIC QUALIFICATIONS', 'EDUCATIONAL BACKGROUND',
+    'ACADEMIC CREDENTIALS', 'DEGREES', 'ACADEMIC HISTORY', 'EDUCATIONAL QUALIFICATIONS',
+    'QUALIFICATIONS', 'TRAINING', 'ACADEMIC TRAINING',
+    # Skills
+    'SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES', 'TECHNOLOGIES', 'EXPERTISE',
+    'PROFICIENCIES', 'TECHNICAL PROFICIENCIES', 'TECHNICAL EXPERTISE',
+    # Other sections
+    'PROJECTS', 'KEY PROJECTS', 'NOTABLE PROJECTS', 'PROFESSIONAL PROJECTS',
+    'CERTIFICATIONS', 'CERTIFICATES', 'LICENSES', 'CREDENTIALS', 'PROFESSIONAL CERTIFICATIONS',
+    'AWARDS', 'HONORS', 'ACHIEVEMENTS', 'RECOGNITION', 'ACCOMPLISHMENTS', 'HONORS AND AWARDS',
+    'PUBLICATIONS', 'RESEARCH', 'PAPERS', 'RESEARCH PUBLICATIONS',
+    'VOLUNTEER', 'VOLUNTEER EXPERIENCE', 'COMMUNITY SERVICE', 'VOLUNTEER WORK',
+    'LANGUAGES', 'LANGUAGE SKILLS', 'LANGUAGE PROFICIENCY',
+    'INTERESTS', 'HOBBIES', 'ACTIVITIES', 'PERSONAL INTERESTS'
+]
+
+# First matching row wins; headers matching none go to 'other'
+SECTION_ROUTES: List[Tuple[str, Tuple[str, ...]]] = [
+    ('summary', ('summary', 'profile', 'objective', 'about', 'overview')),
+    ('experience', ('experience', 'work', 'employment', 'history', 'career')),
+    ('skills', ('skill', 'technical', 'competenc', 'technolog', 'expertise', 'proficienc')),
+    ('education', ('education', 'academic', 'qualification', 'degree', 'training')),
+    ('projects', ('project',)),
+    ('certifications', ('certification', 'certificate', 'license', 'credential')),
+    ('awards', ('award', 'honor', 'achievement', 'recognition', 'accomplishment')),
+    ('publications', ('publication', 'research', 'paper')),
+    ('volunteer', ('volunteer', 'community')),
+    ('languages', ('language',)),
+    ('interests', ('interest', 'hobbies', 'activities'))
+]
+
+# Header names inside a longer line count only for short lines
+PARTIAL_MAX_LENGTH = 40
+PARTIAL_MAX_SPACES = 5
+
+DIGIT = re.compile(r'\d')
+
+
+class SectionClassifier:
+    """Header detection and section routing in one memoized call"""
+
+    def __init__(
+        self,
+        bullet_markers: Sequence[str],
+        known_sections: Sequence[str] = KNOWN_SECTIONS,
+        routes: Sequence[Tuple[str, Tuple[str, ...]]] = SECTION_ROUTES,
+        cache_size: int = 8192
+    ):
+        self.bullet_markers = tuple(bullet_markers)
+        self.exact = frozenset(known_sections) | frozenset(section + ':' for section in known_sections)
+        self.partial = re.compile('|'.join(re.escape(section) for section in known_sections))
+        self.routes = [(name, tuple(keywords)) for name, keywords in routes]
+        self.classify = functools.lru_cache(maxsize=cache_size)(self._classify)
+
+    def is_header(self, line: str) -> bool:
+        return self.classify(line) is not None
+
+    def _classify(self, line: str) -> Optional[str]:
+        """The section a header line opens, or None if it is not a header"""
+        if not line:
+            return None
+        return self.route(line.strip().lower()) if self._is_header(line) else None
+
+    def _is_header(self, line: str) -> bool:
+        line_upper = line.upper()
+
+        # Exact match (case insensitive)
+        if line_upper in self.exact:
+            return True
+
+        # "EDUCATION & TRAINING", "SKILLS & EXPERTISE", etc. but not part of a sentence
+        if (len(line_upper) < PARTIAL_MAX_LENGTH and line_upper.count(' ') <= PARTIAL_MAX_SPACES
+                and self.partial.search(line_upper)):
+            return True
+
+        # All caps and very short (1-4 words), no bullet, no numbers (dates, etc)
+        line_stripped = line.strip()
+        if line_stripped != line_upper or not 3 < len(line_stripped) < 35:
+            return False
+        if not 1 <= len(line_stripped.split()) <= 4:
+            return False
+        if line_stripped.startswith(self.bullet_markers):
+            return False
+        return not DIGIT.search(line_stripped)
+
+    def route(self, line_lower: str) -> str:
+        """Which section a header line opens"""
+        for name, keywords in self.routes:
+            if any(keyword in line_lower for keyword in keywords):
+                return name
+        return 'other'
@@ -0,0 +1,238 @@
+"""
+Section Enhancement - rewrite only the parts of a resume that can gain ATS score
+- The resume is laid out line by line with SectionParser. The editable parts
+  are the body of the summary and skills sections and each experience or
+  project bullet (with any lines it wraps onto)
+- ATSScorer's breakdown decides which parts are sent: JD keywords the resume
+  misses open the summary, skills and bullets; a weak action-verb or metric
+  score opens the bullets. A resume with nothing left to gain there gets no
+  LLM call at all
+- The prompt carries the parts by id and the missing JD keywords (the only
+  part of the JD the scorer counts); the reply is JSON by id
+- Rewrites are spliced back in place of their parts. Every other line -
+  headings, contact details, job titles, companies, dates, education,
+  certifications - is copied through verbatim
+"""
+import json
+from typing import Dict, List, Optional
+
+from api.services.ats_scorer import ATSScorer, ResumeScan
+from api.services.bullet_variants import bullet_text, json_object
+from api.services.document_extractor import BULLET_MARKERS, NUMBERED_BULLET, DocumentExtractor
+from api.services.extraction_pipeline import SectionParser
+from api.services.llm_service import LLMService
+from api.services.workers import WorkerPool
+
+# Rewritten as a whole
+BODY_SECTIONS = ('summary', 'skills')
+# Rewritten bullet by bullet; other lines there are titles, companies and dates
+BULLET_SECTIONS = ('experience', 'projects')
+MAX_ACTION_VERBS_SCORE = 15
+MAX_METRICS_SCORE = 10
+
+
+def layout_parts(extractor: DocumentExtractor, lines: List[str]) -> List[Dict]:
+    """
+    Editable parts of a resume in order: dicts with 'id', 'section', 'kind'
+    ('body' or 'bullet'), the [start, end) range of lines they replace,
+    their 'text' and, for experience bullets, the 'job' title.
+    """
+    parts: List[Dict] = []
+    current: Optional[Dict] = None
+    counts: Dict[str, int] = {}
+
+    def start(section: str, kind: str, index: int, text: str, job: Optional[str] = None) -> Dict:
+        counts[section] = counts.get(section, 0) + 1
+        number = counts[section]
+        # "summary", "experience-3"
+        part_id = section if kind == 'body' and number == 1 else f'{section}-{number}'
+        part = {'id': part_id, 'section': section, 'kind': kind, 'start': index, 'end': index + 1,
+                'lines': [text], 'job': job}
+        parts.append(part)
+        return part
+
+    for index, parsed in enumerate(SectionParser(extractor).parse_lines(lines)):
+        stripped = parsed.line.strip()
+        section = parsed.section
+
+        if parsed.role == 'blank':
+            # A blank line ends a bullet, not a paragraph
+            if current is not None and current['kind'] == 'bullet':
+                current = None
+        elif parsed.role == 'heading':
+            current = None
+        elif section in BODY_SECTIONS:
+            if current is not None and current['section'] == section:
+                current['end'] = index + 1
+                current['lines'].append(stripped)
+            else:
+                current = start(section, 'body', index, stripped)
+        elif section in BULLET_SECTIONS:
+            if parsed.role == 'bullet':
+                current = start(section, 'bullet', index, stripped, parsed.job)
+            elif (parsed.role == 'text' and current is not None and current['kind'] == 'bullet'
+                  and current['section'] == section):
+                # Wrapped onto the next line
+                current['end'] = index + 1
+                current['lines'].append(stripped)
+            else:
+                current = None
+        else:
+            current = None
+
+    for part in parts:
+        lines_of = part.pop('lines')
+        part['text'] = bullet_text(' '.join(lines_of)) if part['kind'] == 'bullet' else '\n'.join(lines_of)
+    return parts
+
+
+def build_prompt(parts: List[Dict], missing_keywords: List[str], weak_bullets: bool) -> str:
+    """One prompt asking for every part back, rewritten, keyed by id"""
+    blocks = []
+    for part in parts:
+        if part['kind'] == 'bullet':
+            context = f" ({part['job']})" if part['job'] else ''
+            blocks.append(f"[{part['id']}]{context} {part['text']}")
+        else:
+            blocks.append(f"[{part['id']}]\n{part['text']}")
+
+    goals = []
+    if missing_keywords:
+        goals.append("- work in these job description keywords wherever they truthfully fit: "
+                     + ', '.join(missing_keywords))
+    if weak_bullets:
+        goals.append("- open each bullet with a strong action verb (achieved, led, developed, implemented, "
+                     "optimized, delivered) and keep or add truthful metrics (numbers, percentages, amounts)")
+    example = json.dumps({part['id']: 'rewritten text' for part in parts[:2]})
+    return f"""Rewrite these parts of a resume so it scores higher on an ATS. Each part starts with its id in brackets.
+
+Goals:
+{chr(10).join(goals)}
+
+Rules:
+- keep every fact true: do not invent employers, titles, tools, degrees or numbers
+- keep each part about as long as it is now
+- a bullet stays one line of plain text with no bullet marker; skills keep their list layout
+- do not add section headings
+
+Parts:
+{chr(10).join(blocks)}
+
+Return ONLY a JSON object mapping every id to its rewritten text, e.g.
+{example}"""
+
+
+class SectionEnhancer:
+    """Enhance a resume by rewriting only its weak sections through one LLM call"""
+
+    def __init__(self, llm_service: LLMService, extractor: DocumentExtractor, scorer: ATSScorer, pool: WorkerPool):
+        self.llm_service = llm_service
+        self.extractor = extractor
+        self.scorer = scorer
+        self.pool = pool
+
+    def plan(self, resume: str, job_description: str) -> Dict:
+        """The parts worth sending and why, from the resume's current score"""
+        profile = self.scorer.get_jd_profile(job_description)
+        scan = ResumeScan.from_text(resume, profile.matcher)
+        breakdown = self.scorer.score_from_scan(scan, profile)['breakdown']
+
+        missing = [keyword for keyword in profile.top_keywords if keyword not in scan.keywords]
+        weak_bullets = (breakdown['action_verbs']['score'] < MAX_ACTION_VERBS_SCORE
+                        or breakdown['metrics']['score'] < MAX_METRICS_SCORE)
+        sections = set()
+        if missing:
+            sections.update(BODY_SECTIONS + BULLET_SECTIONS)
+        if weak_bullets:
+            sections.update(BULLET_SECTIONS)
+
+        lines = resume.split('\n')
+        parts = [part for part in layout_parts(self.extractor, lines) if part['section'] in sections]
+        return {'lines': lines, 'parts': parts, 'missing_keywords': missing, 'weak_bullets': weak_bullets}
+
+    @staticmethod
+    def _request(plan: Dict) -> Dict:
+        words = sum(len(part['text'].split()) for part in plan['parts'])
+        return {
+            'prompt': build_prompt(plan['parts'], plan['missing_keywords'], plan['weak_bullets']),
+            'temperature': 0.5,
+            # Room for parts that grow by a third, at about two tokens a word, plus ids and quoting
+            'max_tokens': min(3000, 200 + int(words * 2.7) + 15 * len(plan['parts']))
+        }
+
+    def splice(self, lines: List[str], parts: List[Dict], rewrites: Dict) -> Dict:
+        """The resume with each rewritten part in place of its lines, and the ids left as they were"""
+        output: List[str] = []
+        unchanged = []
+        position = 0
+        for part in parts:
+            output.extend(lines[position:part['start']])
+            position = part['end']
+            replacement = self._render(lines[part['start']], part, rewrites.get(part['id']))
+            if replacement is None:
+                unchanged.append(part['id'])
+                output.extend(lines[part['start']:part['end']])
+            else:
+                output.extend(replacement)
+        output.extend(lines[position:])
+        return {'text': '\n'.join(output), 'unchanged': unchanged}
+
+    def _render(self, first_line: str, part: Dict, rewrite) -> Optional[List[str]]:
+        if not isinstance(rewrite, str) or not rewrite.strip():
+            return None
+        indent = first_line[:len(first_line) - len(first_line.lstrip())]
+
+        if part['kind'] == 'bullet':
+            # Same marker (or number) and indent as the original bullet
+            stripped = first_line.strip()
+            match = NUMBERED_BULLET.match(stripped)
+            marker = stripped[0] + ' ' if stripped.startswith(BULLET_MARKERS) else match.group(0) if match else ''
+            return [indent + marker + bullet_text(' '.join(rewrite.split()))]
+
+        # A line that reads as a heading would start a new section when the resume is parsed again
+        body = [line.strip() for line in rewrite.strip().split('\n')
+                if self.extractor._header_section(line.strip()) is None]
+        return [indent + line if line else line for line in body] if any(body) else None
+
+    async def enhance_resume(
+        self,
+        resume: str,
+        job_description: str,
+        provider: str,
+        model: str,
+        api_key: str,
+        bypass_cache: bool = False
+    ) -> Dict:
+        """Same arguments and response as LLMService.enhance_resume, plus what was sent"""
+
+        if provider not in self.llm_service.clients:
+            return {'success': False, 'error': f'Unknown provider: {provider}'}
+
+        plan = await self.pool.run(self.plan, resume, job_description)
+        sent = sorted({part['section'] for part in plan['parts']})
+        if not plan['parts']:
+            return {'success': True, 'enhanced_resume': resume, 'word_count': len(resume.split()),
+                    'cached': False, 'sections': [], 'unchanged': []}
+
+        request = self._request(plan)
+        result = await self.llm_service.complete(
+            lambda name: request, provider, model, api_key, bypass_cache=bypass_cache)
+        if not result['success']:
+            return result
+
+        spliced = self.splice(plan['lines'], plan['parts'], json_object(result['text']))
+        if len(spliced['unchanged']) == len(plan['parts']):
+            return {'success': False, 'error': 'The provider reply had no usable rewrites', 'retryable': False}
+
+        enhanced = spliced['text']
+        response = {
+            'success': True,
+            'enhanced_resume': enhanced,
+            'word_count': len(enhanced.split()),
+            'cached': result['cached'],
+            'sections': sent,
+            'unchanged': spliced['unchanged']
+        }
+        if 'fallback' in result:
+            response['fallback'] = result['fallback']
+        return response
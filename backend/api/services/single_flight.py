@@ -0,0 +1,51 @@
+"""
+Single Flight - coalesce concurrent identical requests
+The first caller for a key starts the work; callers that arrive while it is
+still running await the same task and receive the same result (or error).
+"""
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+def content_key(*parts: str) -> str:
+    """SHA-256 over the given strings, separated so ('ab', 'c') != ('a', 'bc')"""
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode('utf-8')
+        digest.update(str(len(encoded)).encode('ascii') + b':')
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Share one in-flight computation between concurrent callers with the same key"""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable]):
+        """Await factory() for the first caller with this key; later callers join it"""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            self.started += 1
+            task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+        else:
+            self.shared += 1
+
+        # Shielded so one caller disconnecting does not cancel the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved if every waiter has gone away
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
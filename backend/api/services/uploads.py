@@ -0,0 +1,41 @@
+"""
+Uploads - spool request files to disk without holding them in memory
+The upload is copied to a temporary file in fixed-size chunks while it is
+hashed, so extraction workers can open it by path and the cache key is known
+without a second pass. Temp files honour TMPDIR.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Tuple
+
+from fastapi import UploadFile
+
+CHUNK_SIZE = 1024 * 1024
+
+
+async def spool_upload(upload: UploadFile, suffix: str = '') -> Tuple[str, str]:
+    """Copy an upload to a temp file; returns (path, sha256 hex digest). The caller removes the file."""
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(prefix='upload-', suffix=suffix)
+
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        remove_spooled(path)
+        raise
+
+    return path, digest.hexdigest()
+
+
+def remove_spooled(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,49 @@
+"""
+Warm-up - load lazily imported modules ahead of the first request
+Provider SDKs and document parsers are imported on first use so API workers
+start fast. Extraction workers preload every parser that imports when they start;
+with WARM_UP=1 the API process also imports the SDKs and starts every
+extraction worker during startup, so the first request pays nothing.
+"""
+import importlib
+import os
+import time
+from typing import Dict, Iterable
+
+PARSER_MODULES = ('pdfplumber', 'PyPDF2', 'docx')
+PROVIDER_MODULES = ('openai', 'anthropic')
+
+
+def warm_up_enabled() -> bool:
+    return os.getenv('WARM_UP', '').lower() in ('1', 'true', 'yes')
+
+
+def preload(modules: Iterable[str], skip_missing: bool = False) -> Dict[str, float]:
+    """
+    Import modules now; returns seconds spent per module (0 if already loaded).
+    With skip_missing, modules that fail to import are left out instead of raising.
+    """
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            if not skip_missing:
+                raise
+            continue
+        timings[name] = round(time.perf_counter() - started, 4)
+    return timings
+
+
+def preload_parsers():
+    """
+    Extraction worker initializer. Best effort: a parser that can't be
+    imported fails only the extractions that need it, as an error result,
+    instead of every worker in the pool.
+    """
+    preload(PARSER_MODULES, skip_missing=True)
+
+
+def preload_providers():
+    preload(PROVIDER_MODULES)
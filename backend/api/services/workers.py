@@ -0,0 +1,145 @@
+"""
+Worker Pools - keep blocking work off the event loop
+- Process pool for CPU-heavy document extraction
+- Thread pool for scoring
+- Thread pool for disk I/O (SQLite caches and the job store)
+LLM calls are natively async (see llm_providers) and need no pool.
+Process jobs send the metric samples they record back with their result.
+Pool sizes and concurrency limits come from environment variables.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+from api.services.config import env_int
+from api.services.metrics import REGISTRY, call_journaled
+from api.services.single_flight import SingleFlight
+from api.services.warmup import preload_parsers
+
+
+class WorkerPool:
+    """
+    An executor plus a semaphore capping how many jobs may be running or
+    queued at once. Callers past the limit wait on the event loop instead of
+    piling work (and request payloads) into the executor's queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        max_workers: int,
+        max_concurrency: int,
+        initializer: Optional[Callable[[], None]] = None
+    ):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        # Runs once in each worker as it starts
+        self.initializer = initializer
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self.flights = SingleFlight()
+
+    @property
+    def executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=self.initializer
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.name,
+                        initializer=self.initializer
+                    )
+            return self._executor
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run func(*args, **kwargs) in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+
+        async with self._semaphore():
+            if self.kind != 'process':
+                return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+            result, samples = await loop.run_in_executor(
+                self.executor, functools.partial(call_journaled, func, *args, **kwargs)
+            )
+            REGISTRY.replay(samples)
+            return result
+
+    async def run_shared(self, key: Hashable, func: Callable, *args, **kwargs):
+        """Like run(), but concurrent calls with the same key share one job"""
+        return await self.flights.do(key, lambda: self.run(func, *args, **kwargs))
+
+    async def start(self):
+        """Start every worker now instead of on first use"""
+        await asyncio.gather(*[self.run(_ready) for _ in range(self.max_workers)])
+
+    def shutdown(self, wait: bool = True):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+        self._semaphores.clear()
+
+
+def _ready() -> bool:
+    return True
+
+
+_cpu_count = os.cpu_count() or 2
+
+extraction_pool = WorkerPool(
+    'extraction',
+    kind='process',
+    max_workers=env_int('EXTRACTION_WORKERS', _cpu_count),
+    max_concurrency=env_int('EXTRACTION_CONCURRENCY', _cpu_count * 2),
+    initializer=preload_parsers
+)
+
+scoring_pool = WorkerPool(
+    'scoring',
+    kind='thread',
+    max_workers=env_int('SCORING_WORKERS', 4),
+    max_concurrency=env_int('SCORING_CONCURRENCY', 64)
+)
+
+# SQLite serialises each connection behind a lock, so a few threads are enough
+io_pool = WorkerPool(
+    'io',
+    kind='thread',
+    max_workers=env_int('IO_WORKERS', 4),
+    max_concurrency=env_int('IO_CONCURRENCY', 256)
+)
+
+
+async def start_pools():
+    """Start every pool's workers; used by the optional startup warm-up"""
+    for pool in (extraction_pool, scoring_pool):
+        await pool.start()
+
+
+def shutdown_pools(wait: bool = True):
+    """Stop every pool; called when the app shuts down"""
+    for pool in (extraction_pool, scoring_pool, io_pool):
+        pool.shutdown(wait=wait)
@@ -0,0 +1,103 @@
+"""
+Bulk Ingestion Benchmark - resumes per second per core
+Builds a ZIP of generated PDF and Word resumes (plus a few broken files),
+ingests it with BulkIngestion on pools of several sizes and reports
+throughput against a per-core target.
+
+Usage (from backend/):
+    python -m benchmarks.bulk_ingest --resumes 200 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import zipfile
+from typing import Dict, List
+
+from api.services.bulk_ingest import BulkIngestion
+from api.services.document_extractor import DocumentExtractor
+from api.services.warmup import preload_parsers
+from api.services.workers import WorkerPool, _ready
+from benchmarks.fixtures import job_description, resume_docx, resume_pdf
+from benchmarks.suite import summarize
+
+BROKEN_FILES = {
+    'broken/truncated.pdf': b'%PDF-1.4\n1 0 obj',
+    'broken/not-a-resume.txt': b'hello',
+    'broken/empty.docx': b''
+}
+
+
+def build_archive(resumes: int) -> str:
+    """A ZIP of 1-2 page PDFs and DOCX files in a 3:1 ratio, plus BROKEN_FILES"""
+    fd, path = tempfile.mkstemp(prefix='bulk-', suffix='.zip')
+    os.close(fd)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for index in range(resumes):
+            if index % 4 == 3:
+                archive.writestr(f'resumes/candidate-{index}.docx', resume_docx(1 + index % 2, seed=index))
+            else:
+                archive.writestr(f'resumes/candidate-{index}.pdf', resume_pdf(1 + index % 2, seed=index))
+        for name, data in BROKEN_FILES.items():
+            archive.writestr(name, data)
+    return path
+
+
+async def ingest(path: str, workers: int, job_descriptions):
+    pool = WorkerPool('bulk', kind='process', max_workers=workers,
+                      max_concurrency=workers * 2, initializer=preload_parsers)
+    try:
+        # Start the worker processes before timing anything
+        await asyncio.gather(*[pool.run(_ready) for _ in range(workers)])
+
+        bulk = BulkIngestion(DocumentExtractor(), pool)
+        members, skipped = bulk.list_members(path)
+        started = time.perf_counter()
+        events = [event async for event in bulk.events(path, members, skipped, job_descriptions)]
+        return events, time.perf_counter() - started
+    finally:
+        pool.shutdown()
+
+
+def cases(resumes: int, worker_counts: List[int], jds: int) -> Dict[str, Dict]:
+    """One ingestion of a generated archive per pool size"""
+    job_descriptions = [job_description(200, seed=seed) for seed in range(jds)]
+    path = build_archive(resumes)
+    results = {}
+    try:
+        for workers in worker_counts:
+            events, elapsed = asyncio.run(ingest(path, workers, job_descriptions))
+            done = events[-1]
+            # Workers beyond the machine's cores share them
+            per_core = resumes / elapsed / min(workers, os.cpu_count() or 1)
+            results[f'bulk_ingest/workers{workers}-{resumes}'] = summarize(
+                [elapsed], elapsed, throughput_per_s=round(resumes / elapsed, 3), per_core_per_s=round(per_core, 3),
+                succeeded=done['succeeded'], failed=done['failed'], archive_bytes=os.path.getsize(path))
+    finally:
+        os.unlink(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--jds', type=int, default=3, help='job descriptions to score against')
+    parser.add_argument('--target', type=float, default=30.0, help='resumes per second per core')
+    args = parser.parse_args()
+
+    results = cases(args.resumes, args.workers, args.jds)
+    first = next(iter(results.values()))
+    print(f"{args.resumes} resumes + {len(BROKEN_FILES)} broken files, {args.jds} JDs, "
+          f"archive {first['archive_bytes'] / 1024:.0f} KB")
+    print(f"{'workers':>7} {'seconds':>8} {'ok':>5} {'failed':>6} {'resumes/s':>10} {'per core':>9}")
+    for workers in args.workers:
+        row = results[f'bulk_ingest/workers{workers}-{args.resumes}']
+        verdict = 'ok' if row['per_core_per_s'] >= args.target else f'below target {args.target}'
+        print(f"{workers:>7} {row['p50_ms'] / 1000:>8.2f} {row['succeeded']:>5} {row['failed']:>6} "
+              f"{row['throughput_per_s']:>10.1f} {row['per_core_per_s']:>9.1f}  {verdict}")
+
+
+if __name__ == '__main__':
+    main()
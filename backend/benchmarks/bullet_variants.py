@@ -0,0 +1,92 @@
+"""
+Bullet Variants Benchmark - one prompt per bullet vs packed prompts
+Rewrites the experience bullets of a generated resume against the stub
+provider, first one bullet per call (as the Interactive Studio did), then
+packed several to a prompt, and reports wall time, provider calls and how
+much prompt text (job description copies included) was sent.
+
+Usage (from backend/):
+    python -m benchmarks.bullet_variants --bullets 30 --delay 0.5
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict
+
+from api.services.bullet_variants import BulletVariantGenerator, build_prompt
+from api.services.document_extractor import DocumentExtractor
+from benchmarks.fixtures import job_description, resume_lines
+from benchmarks.stub_provider import StubServer
+from benchmarks.suite import patched_env, summarize
+
+# (label, bullets per prompt, prompts at once)
+STRATEGIES = [
+    ('one per call, sequential', 1, 1),
+    ('one per call, 4 at once', 1, 4),
+    ('packed, 4 at once', None, 4),
+]
+
+
+def resume_bullets(count: int):
+    """The first `count` experience bullets of generated resumes, as the route builds them"""
+    extractor = DocumentExtractor()
+    bullets = []
+    seed = 0
+    while len(bullets) < count:
+        sections = extractor.parse_sections(resume_lines(2, seed=seed))
+        for job_index, job in enumerate(sections['experience']['jobs']):
+            for bullet_index, text in enumerate(job['bullets']):
+                bullets.append({'id': f'{seed}-job-{job_index}-bullet-{bullet_index}', 'text': text,
+                                'job': job['title']})
+        seed += 1
+    return bullets[:count]
+
+
+async def _run(generator: BulletVariantGenerator, bullets, jd: str, variants: int):
+    started = time.perf_counter()
+    result = await generator.generate(bullets, jd, variants, 'openrouter', 'stub', 'stub', bypass_cache=True)
+    await generator.llm_service.pool.aclose()
+    return result, time.perf_counter() - started
+
+
+def cases(bullet_count: int, variants: int, port: int, delay: float, token_delay: float) -> Dict[str, Dict]:
+    """Each strategy once over the same bullets, against a stub answering after `delay` seconds"""
+    bullets = resume_bullets(bullet_count)
+    jd = job_description(300)
+    results = {}
+    with StubServer(port=port, delay=delay, token_delay=token_delay) as stub, \
+            patched_env({**stub.provider_env(), 'LLM_RATE_LIMIT': '0'}):
+        from api.services.llm_providers import ClientPool, ProviderSettings
+        from api.services.llm_service import LLMService
+        from api.services.response_cache import ResponseCache
+
+        for label, per_prompt, concurrency in STRATEGIES:
+            service = LLMService(pool=ClientPool(ProviderSettings()), cache=ResponseCache(None))
+            generator = BulletVariantGenerator(service, bullets_per_prompt=per_prompt, concurrency=concurrency)
+            sent = sum(len(build_prompt(chunk, jd, variants)) for chunk in generator.pack(bullets))
+            result, elapsed = asyncio.run(_run(generator, bullets, jd, variants))
+            results[f"bullet_variants/{label.replace(', ', '-').replace(' ', '-')}"] = summarize(
+                [elapsed], elapsed, label=label, bullets=len(bullets), calls=result['prompts'],
+                prompt_chars=sent, variants=len(result['variants']), jd_chars=len(jd))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bullets', type=int, default=30)
+    parser.add_argument('--variants', type=int, default=3)
+    parser.add_argument('--delay', type=float, default=0.5, help='stub time to first byte, seconds')
+    parser.add_argument('--token-delay', type=float, default=0.005, help='stub seconds per word of reply')
+    parser.add_argument('--port', type=int, default=8912)
+    args = parser.parse_args()
+
+    results = cases(args.bullets, args.variants, args.port, args.delay, args.token_delay)
+    print(f"{args.bullets} bullets, {args.variants} variants each, JD {next(iter(results.values()))['jd_chars']} chars")
+    print(f"{'strategy':<26} {'seconds':>8} {'calls':>6} {'prompt chars':>13} {'variants':>9}")
+    for row in results.values():
+        print(f"{row['label']:<26} {row['p50_ms'] / 1000:>8.2f} {row['calls']:>6} {row['prompt_chars']:>13} "
+              f"{row['variants']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Compact Result Benchmark - full extraction result vs text plus offsets
+Extracts generated resumes and reports, per page count, the JSON payload of
+each format, the heap each keeps alive once loaded (a parsed full result vs
+a CompactResult built from the compact payload) and the time to convert
+between them. Every compact result is checked to expand back to the full
+result exactly.
+
+Usage (from backend/):
+    python -m benchmarks.compact_result --pages 1 2 5 20
+"""
+import argparse
+import gc
+import json
+import statistics
+import tracemalloc
+from typing import Dict, List
+
+from api.services.compact_result import CompactResult
+from api.services.document_extractor import DocumentExtractor
+from benchmarks.fixtures import resume_pdf
+from benchmarks.suite import summarize, time_calls
+
+
+def _retained(build) -> int:
+    """Bytes still allocated once build() has returned and everything it dropped is freed"""
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def cases(page_counts: List[int], resumes: int, repeat: int = 5) -> Dict[str, Dict]:
+    """Conversion timings per page count, with the payload and heap sizes averaged over `resumes`"""
+    extractor = DocumentExtractor()
+    results = {}
+    for pages in page_counts:
+        sizes, to_compact, expand = [], [], []
+        for seed in range(resumes):
+            result = extractor.extract_from_pdf(resume_pdf(pages, seed=seed))
+            result['contact'] = extractor.extract_contact_info(result['text'])
+            full_json = json.dumps(result)
+            compact_json = json.dumps(CompactResult.from_result(result).to_dict())
+            assert CompactResult.from_dict(json.loads(compact_json)).expand() == json.loads(full_json), \
+                'compact result did not expand back to the full result'
+
+            full_heap = _retained(lambda: json.loads(full_json))
+            compact_heap = _retained(lambda: CompactResult.from_dict(json.loads(compact_json)))
+            sizes.append((len(full_json), len(compact_json), full_heap, compact_heap))
+            to_compact.extend(time_calls(lambda: CompactResult.from_result(result), repeat))
+            compact = CompactResult.from_dict(json.loads(compact_json))
+            expand.extend(time_calls(compact.expand, repeat))
+
+        full_bytes, compact_bytes, full_heap, compact_heap = (
+            round(statistics.fmean(column)) for column in zip(*sizes))
+        extra = {'pages': pages, 'full_bytes': full_bytes, 'compact_bytes': compact_bytes,
+                 'full_heap_bytes': full_heap, 'compact_heap_bytes': compact_heap}
+        results[f'compact/to-compact-{pages}p'] = summarize(to_compact, sum(to_compact), **extra)
+        results[f'compact/expand-{pages}p'] = summarize(expand, sum(expand), **extra)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 2, 5, 20])
+    parser.add_argument('--resumes', type=int, default=5, help='resumes per page count')
+    args = parser.parse_args()
+
+    results = cases(args.pages, args.resumes)
+    print(f"{'pages':>5} {'full JSON':>10} {'compact':>9} {'ratio':>6} {'full heap':>10} {'compact':>9} "
+          f"{'ratio':>6} {'to compact':>11} {'expand':>8}")
+    for pages in args.pages:
+        row = results[f'compact/to-compact-{pages}p']
+        expand = results[f'compact/expand-{pages}p']
+        print(f"{pages:>5} {row['full_bytes'] / 1024:>8.1f}KB {row['compact_bytes'] / 1024:>7.1f}KB "
+              f"{row['full_bytes'] / row['compact_bytes']:>5.1f}x {row['full_heap_bytes'] / 1024:>8.1f}KB "
+              f"{row['compact_heap_bytes'] / 1024:>7.1f}KB {row['full_heap_bytes'] / row['compact_heap_bytes']:>5.1f}x "
+              f"{row['mean_ms']:>9.2f}ms {expand['mean_ms']:>6.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark Fixtures - generated resumes and job descriptions
+PDFs are written directly (no extra dependency); Word files use python-docx.
+Generation is seeded, so the same arguments always give the same bytes.
+"""
+import random
+from io import BytesIO
+from typing import List
+
+from docx import Document as DocxDocument
+
+SKILLS = [
+    'Python', 'Go', 'Java', 'TypeScript', 'React', 'Next.js', 'Django', 'Flask', 'FastAPI',
+    'PostgreSQL', 'MongoDB', 'Redis', 'Kafka', 'AWS', 'GCP', 'Azure', 'Docker', 'Kubernetes',
+    'Terraform', 'CI/CD', 'Agile', 'Scrum', 'GraphQL', 'REST APIs', 'Spark', 'Airflow', 'TensorFlow'
+]
+VERBS = [
+    'Led', 'Developed', 'Implemented', 'Designed', 'Built', 'Optimized', 'Delivered',
+    'Spearheaded', 'Architected', 'Engineered', 'Improved', 'Launched', 'Streamlined'
+]
+TITLES = ['Senior Software Engineer', 'Backend Developer', 'Data Engineer', 'Platform Engineer', 'Engineering Manager']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Enterprises']
+SCHOOLS = ['State University', 'Institute of Technology', 'City College']
+
+
+def resume_lines(pages: int = 1, seed: int = 0, table_density: float = 0.0) -> List[str]:
+    """Plain resume lines sized to roughly `pages` pages"""
+    rng = random.Random(seed)
+    lines = [
+        'Jordan Lee',
+        f'jordan.lee{seed}@example.com | 555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)} | linkedin.com/in/jordanlee{seed}',
+        '',
+        'PROFESSIONAL SUMMARY',
+        f'Engineer with {rng.randint(3, 15)} years of experience building {rng.choice(SKILLS)} and '
+        f'{rng.choice(SKILLS)} systems for high-traffic products.',
+        '',
+        'EXPERIENCE'
+    ]
+
+    year = 2024
+    for _ in range(max(1, pages * 3)):
+        start = year - rng.randint(1, 4)
+        lines.append(f'{rng.choice(TITLES)} | {rng.choice(COMPANIES)} {start} - {year}')
+        for _ in range(rng.randint(3, 6)):
+            lines.append(
+                f'• {rng.choice(VERBS)} {rng.choice(SKILLS)} services with {rng.choice(SKILLS)}, '
+                f'improving throughput by {rng.randint(5, 90)}%'
+            )
+            if rng.random() < table_density:
+                lines.append(f'{rng.choice(SKILLS)}\t{rng.choice(SKILLS)}\t{rng.randint(1, 9)} years')
+        lines.append('')
+        year = start
+
+    lines += [
+        'SKILLS',
+        ', '.join(rng.sample(SKILLS, 10)),
+        '',
+        'EDUCATION',
+        f'BS Computer Science, {rng.choice(SCHOOLS)} {year - 4}'
+    ]
+    return lines
+
+
+def job_description(words: int = 200, seed: int = 0) -> str:
+    """A job description of roughly `words` words"""
+    rng = random.Random(seed)
+    filler = ['building', 'scalable', 'platform', 'team', 'product', 'customers', 'reliable', 'services',
+              'ownership', 'collaborate', 'cross-functional', 'mentoring', 'experience', 'with', 'and']
+    out = ['We', 'are', 'hiring', 'a', rng.choice(TITLES).lower(), 'with']
+    while len(out) < words:
+        out.append(rng.choice(SKILLS) if rng.random() < 0.3 else rng.choice(filler))
+    return ' '.join(out)
+
+
+def _pdf_escape(text: str) -> bytes:
+    encoded = text.encode('cp1252', 'replace')
+    return encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _text_width(text: str, size: int = 10) -> float:
+    """Width of a string in Helvetica, in points"""
+    from pdfminer.fontmetrics import FONT_METRICS
+
+    widths = FONT_METRICS['Helvetica'][1]
+    return sum(widths.get(char, 556) for char in text) * size / 1000
+
+
+def make_pdf(lines: List[str], lines_per_page: int = 48, columns: int = 1,
+             split_runs: float = 0.0, seed: int = 0) -> bytes:
+    """
+    A text PDF using the built-in Helvetica font. columns > 1 lays pages out
+    side by side; tab-separated cells in a line are spread across the column
+    like a table row. split_runs is the fraction of lines drawn one word per
+    text run, with the spaces between them left to cursor moves, as many
+    typesetters do for mixed fonts and kerning.
+    """
+    rng = random.Random(seed)
+    per_column = lines_per_page
+    per_page = per_column * columns
+    pages = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+    column_width = 540 // columns
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in below
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>'
+    ]
+    page_ids = []
+
+    for page in pages:
+        stream = [b'BT /F1 10 Tf']
+        for index, line in enumerate(page):
+            column, row = divmod(index, per_column)
+            y = 756 - row * 14
+            cells = line.split('\t')
+            for cell_index, cell in enumerate(cells):
+                x = 36 + column * column_width + cell_index * column_width // len(cells)
+                stream.append(b'1 0 0 1 %d %d Tm' % (x, y))
+                if len(cells) == 1 and rng.random() < split_runs:
+                    for word in cell.split():
+                        # A justified-text gap; pdfplumber reads gaps under 3pt as no space
+                        advance = _text_width(word) + 4
+                        stream.append(b'(' + _pdf_escape(word) + b') Tj %.2f 0 Td' % advance)
+                else:
+                    stream.append(b'(' + _pdf_escape(cell) + b') Tj')
+        stream.append(b'ET')
+        content = b'\n'.join(stream)
+
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        content_id = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        page_ids.append(len(objects))
+
+    kids = b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+    objects[1] = b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % len(page_ids)
+
+    out = BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(lines: List[str], table_rows: int = 0, seed: int = 0) -> bytes:
+    """A Word document with one paragraph per line and an optional skills table"""
+    rng = random.Random(seed)
+    doc = DocxDocument()
+    for line in lines:
+        if line:
+            doc.add_paragraph(line.replace('\t', ' | '))
+
+    if table_rows:
+        table = doc.add_table(rows=table_rows, cols=3)
+        for row in table.rows:
+            row.cells[0].text = rng.choice(SKILLS)
+            row.cells[1].text = rng.choice(SKILLS)
+            row.cells[2].text = f'{rng.randint(1, 9)} years'
+
+    out = BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def resume_pdf(pages: int = 1, seed: int = 0, columns: int = 1, table_density: float = 0.0,
+               split_runs: float = 0.0) -> bytes:
+    return make_pdf(resume_lines(pages, seed, table_density), columns=columns, split_runs=split_runs, seed=seed)
+
+
+def resume_docx(pages: int = 1, seed: int = 0, table_rows: int = 0) -> bytes:
+    return make_docx(resume_lines(pages, seed), table_rows=table_rows, seed=seed)
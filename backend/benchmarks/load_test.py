@@ -0,0 +1,124 @@
+"""
+Load test - event loop responsiveness while enhancements are in flight
+
+Starts the API in-process with every provider pointed at a local stub that
+takes a few seconds to answer, then measures /health and /api/scoring/calculate latency with and
+without concurrent /api/enhance requests. With blocking work kept off the
+event loop the two latency profiles should match.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --enhancements 8 --stub-seconds 5
+"""
+import argparse
+import asyncio
+import threading
+import time
+from typing import Dict
+
+import httpx
+import uvicorn
+
+from benchmarks.stub_provider import StubServer, free_port
+from benchmarks.suite import patched_env, summarize
+
+SAMPLE_RESUME = (
+    "Jane Doe\njane@example.com | 555-123-4567\n\nEXPERIENCE\n"
+    "Senior Software Engineer 2019 - Present\n"
+    "• Led migration of 40 services to Kubernetes, cutting deploy time by 60%\n"
+    "• Developed Python data pipelines processing $2M in daily transactions\n"
+    "\nSKILLS\nPython, Go, AWS, Docker, PostgreSQL\n\nEDUCATION\nBS Computer Science"
+)
+SAMPLE_JD = (
+    "We are hiring a senior backend engineer with Python, Kubernetes, AWS and "
+    "PostgreSQL experience to build scalable data pipelines and lead platform work."
+)
+
+
+async def _probe(client: httpx.AsyncClient, duration: float):
+    latencies = {'health': [], 'scoring': []}
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get('/health')
+        latencies['health'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await client.post('/api/scoring/calculate', json={
+            'resume': SAMPLE_RESUME,
+            'job_description': SAMPLE_JD
+        })
+        latencies['scoring'].append(time.perf_counter() - start)
+
+        await asyncio.sleep(0.05)
+
+    return latencies
+
+
+async def _enhance(client: httpx.AsyncClient):
+    await client.post('/api/enhance/', json={
+        'resume': SAMPLE_RESUME,
+        'job_description': SAMPLE_JD,
+        'provider': 'openrouter',
+        'model': 'stub',
+        'api_key': 'stub'
+    }, timeout=None)
+
+
+async def _run(base_url: str, enhancements: int, duration: float) -> Dict[str, Dict]:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        idle = await _probe(client, duration)
+
+        in_flight = [asyncio.create_task(_enhance(client)) for _ in range(enhancements)]
+        await asyncio.sleep(0.2)
+        busy = await _probe(client, duration)
+        await asyncio.gather(*in_flight)
+
+    results = {}
+    for label, count, latencies in (('idle', 0, idle), (f'busy{enhancements}', enhancements, busy)):
+        for endpoint, values in latencies.items():
+            results[f'load/{label}-{endpoint}'] = summarize(values, duration, enhancements=count)
+    return results
+
+
+def cases(port: int, enhancements: int, stub_seconds: float, duration: float) -> Dict[str, Dict]:
+    """Probe latencies with the API idle and with `enhancements` slow enhancements in flight"""
+    with StubServer(port=free_port(), delay=stub_seconds) as stub, patched_env(stub.provider_env()):
+        from main import app
+        from api.services.llm_providers import client_pool
+
+        # The app's shared pool may have been configured before this stub existed
+        stub.route(client_pool.settings)
+        server = uvicorn.Server(uvicorn.Config(app, port=port, log_level='warning'))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        try:
+            return asyncio.run(_run(f'http://127.0.0.1:{port}', enhancements, duration))
+        finally:
+            server.should_exit = True
+            thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--enhancements', type=int, default=8)
+    parser.add_argument('--stub-seconds', type=float, default=5.0)
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = parser.parse_args()
+
+    for name, stats in cases(args.port, args.enhancements, args.stub_seconds, args.duration).items():
+        endpoint = name.rsplit('-', 1)[1]
+        label = f"{stats['enhancements']} enhancements" if stats['enhancements'] else 'idle'
+        print(
+            f"{label:<22} {endpoint:<8} n={stats['n']:<4} "
+            f"p50={stats['p50_ms']:7.2f}ms p99={stats['p99_ms']:7.2f}ms "
+            f"max={stats['max_ms']:7.2f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Merge Scaling Benchmark - continuation merging + section parsing vs document size
+Per-line time should stay flat from 1k to 100k lines. Runs the PDF and Word
+merge paths on ordinary resume text and on blank-heavy text (long runs of
+empty lines between short fragments, as some PDFs produce).
+
+Usage (from backend/):
+    python -m benchmarks.merge_scaling --sizes 1000 10000 100000
+"""
+import argparse
+from typing import Callable, Dict, List
+
+from api.services.document_extractor import DocumentExtractor, SECTION_CLASSIFIER
+from benchmarks.section_classifier import synthetic_lines
+from benchmarks.suite import measure
+
+
+def blank_heavy_lines(count: int) -> List[str]:
+    pattern = ['Short fragment', '', '', '', '', 'another piece', '', '', 'Acme Corp 2019', '', '', '', '']
+    return (pattern * (count // len(pattern) + 1))[:count]
+
+
+def cases(sizes: List[int], repeat: int) -> Dict[str, Dict]:
+    """Merge + parse per path, input kind and size, each run with a cold classifier memo"""
+    extractor = DocumentExtractor()
+    paths: Dict[str, Callable[[List[str]], None]] = {
+        'pdf': lambda lines: extractor.parse_sections(extractor._merge_continuation_lines(lines)),
+        'word': lambda lines: extractor.parse_sections(extractor._merge_word_lines(lines))
+    }
+    inputs: Dict[str, Callable[[int], List[str]]] = {
+        'resume': synthetic_lines,
+        'blank-heavy': blank_heavy_lines
+    }
+
+    results = {}
+    for path_name, run in paths.items():
+        for input_name, make in inputs.items():
+            for size in sizes:
+                lines = make(size)
+                # A cold memo each run, or small documents would be fully cached
+                results[f'merge/{path_name}-{input_name}-{size}'] = measure(
+                    lambda: run(lines), repeat, 0, setup=SECTION_CLASSIFIER.classify.cache_clear, lines=size)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = cases(args.sizes, args.repeat)
+    print(f"{'path':<6} {'input':<12} " + ' '.join(f'{size:>10}' for size in args.sizes) + f" {'growth':>8}")
+    for path_name in ('pdf', 'word'):
+        for input_name in ('resume', 'blank-heavy'):
+            per_line = [results[f'merge/{path_name}-{input_name}-{size}']['min_ms'] * 1000 / size
+                        for size in args.sizes]
+            # Per-line cost at the largest size relative to the smallest; ~1.0 means linear
+            growth = per_line[-1] / per_line[0]
+            print(f"{path_name:<6} {input_name:<12} " + ' '.join(f'{us:>8.2f}us' for us in per_line) + f" {growth:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+PDF Engine Benchmark - adaptive PyPDF2 fast path vs pdfplumber only
+For each document in a generated fixture corpus (plus any PDFs given with
+--pdf) reports which engine the adaptive extractor used, both latencies,
+and how many sections parse identically.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_engines --repeat 3 --pdf ~/resumes/*.pdf
+"""
+import argparse
+import os
+from typing import Dict, List, Tuple
+
+from api.services.document_extractor import DocumentExtractor
+from benchmarks.fixtures import resume_pdf
+from benchmarks.suite import measure
+
+
+def corpus() -> List[Tuple[str, bytes]]:
+    """Single-column, two-column, table-heavy and word-per-run resumes of a few lengths"""
+    documents = []
+    for pages in (1, 3, 8):
+        documents.append((f'plain-{pages}p', resume_pdf(pages, seed=pages)))
+        documents.append((f'columns-{pages}p', resume_pdf(pages, seed=pages, columns=2)))
+        documents.append((f'tables-{pages}p', resume_pdf(pages, seed=pages, table_density=0.3)))
+        # A few lines drawn word by word, and every line
+        documents.append((f'runs-some-{pages}p', resume_pdf(pages, seed=pages, split_runs=0.1)))
+        documents.append((f'runs-all-{pages}p', resume_pdf(pages, seed=pages, split_runs=1.0)))
+    return documents
+
+
+def section_agreement(a: Dict, b: Dict) -> Tuple[int, int]:
+    """(sections parsed identically, sections present in either result)"""
+    present = [name for name in a['sections'] if a['sections'][name]['lines'] or b['sections'][name]['lines']]
+    same = sum(1 for name in present if a['sections'][name] == b['sections'][name])
+    return same, len(present)
+
+
+def cases(documents: List[Tuple[str, bytes]], repeat: int) -> Dict[str, Dict]:
+    """Adaptive and pdfplumber-only extraction per document; a failed document gets an error entry"""
+    adaptive = DocumentExtractor(pdf_engine='auto')
+    layout = DocumentExtractor(pdf_engine='pdfplumber')
+
+    results = {}
+    for name, file_bytes in documents:
+        auto_result = adaptive.extract_from_pdf(file_bytes)
+        layout_result = layout.extract_from_pdf(file_bytes)
+        if not (auto_result['success'] and layout_result['success']):
+            results[f'pdf_engine/{name}'] = {'error': auto_result.get('error') or layout_result.get('error')}
+            continue
+
+        same, present = section_agreement(auto_result, layout_result)
+        results[f'pdf_engine/auto/{name}'] = measure(
+            lambda: adaptive.extract_from_pdf(file_bytes), repeat, 0,
+            engine=auto_result['engine'], sections_same=same, sections_present=present)
+        results[f'pdf_engine/pdfplumber/{name}'] = measure(
+            lambda: layout.extract_from_pdf(file_bytes), repeat, 0)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--pdf', nargs='*', default=[], help='extra PDF files to include')
+    args = parser.parse_args()
+
+    documents = corpus()
+    for path in args.pdf:
+        with open(path, 'rb') as f:
+            documents.append((os.path.basename(path), f.read()))
+    results = cases(documents, args.repeat)
+
+    print(f"{'document':<24} {'engine':<11} {'auto':>9} {'pdfplumber':>11} {'speedup':>8} {'sections':>9}")
+    total_auto = total_layout = 0.0
+    total_same = total_present = 0
+
+    for name, _ in documents:
+        if f'pdf_engine/{name}' in results:
+            print(f"{name:<24} failed: {results[f'pdf_engine/{name}']['error']}")
+            continue
+        auto = results[f'pdf_engine/auto/{name}']
+        layout_time = results[f'pdf_engine/pdfplumber/{name}']['min_ms']
+        total_auto += auto['min_ms']
+        total_layout += layout_time
+        total_same += auto['sections_same']
+        total_present += auto['sections_present']
+
+        print(f"{name:<24} {auto['engine']:<11} {auto['min_ms']:>7.1f}ms {layout_time:>9.1f}ms "
+              f"{layout_time / auto['min_ms']:>7.2f}x {auto['sections_same']:>4}/{auto['sections_present']:<4}")
+
+    if total_auto:
+        print(f"\n{'total':<24} {'':<11} {total_auto:>7.1f}ms {total_layout:>9.1f}ms "
+              f"{total_layout / total_auto:>7.2f}x {total_same:>4}/{total_present:<4}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+PDF Page Benchmark - sequential vs page-parallel extraction
+Generates multi-page resumes and times extraction in-process against the
+extraction pool split by page range.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_pages --pages 1 5 20 --repeat 3
+"""
+import argparse
+import asyncio
+from typing import Dict, List
+
+from api.services.document_extractor import DocumentExtractor
+from api.services.parallel_extractor import ParallelPDFExtractor
+from api.services.workers import extraction_pool, shutdown_pools
+from benchmarks.fixtures import resume_pdf
+from benchmarks.suite import ameasure, measure
+
+
+async def _cases(page_counts: List[int], repeat: int) -> Dict[str, Dict]:
+    extractor = DocumentExtractor()
+    parallel = ParallelPDFExtractor(extractor, extraction_pool, min_pages=1, max_pages=0)
+
+    # Start the worker processes before timing anything
+    await extraction_pool.run(extractor.count_pdf_pages, resume_pdf(1))
+
+    results = {}
+    for pages in page_counts:
+        file_bytes = resume_pdf(pages * 4)
+        page_count = extractor.count_pdf_pages(file_bytes)
+
+        expected = extractor.extract_from_pdf(file_bytes)
+        actual = await parallel.extract(file_bytes)
+        assert actual['text'] == expected['text'], 'parallel extraction diverged from sequential'
+
+        results[f'pdf_pages/sequential-{page_count}p'] = measure(
+            lambda: extractor.extract_from_pdf(file_bytes), repeat, 0, pages=page_count)
+        results[f'pdf_pages/parallel-{page_count}p'] = await ameasure(
+            lambda: parallel.extract(file_bytes), repeat, 0, pages=page_count)
+    return results
+
+
+def cases(page_counts: List[int], repeat: int) -> Dict[str, Dict]:
+    """Sequential and parallel extraction per generated page count"""
+    try:
+        return asyncio.run(_cases(page_counts, repeat))
+    finally:
+        shutdown_pools()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5, 20],
+                        help='approximate page counts to generate')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = cases(args.pages, args.repeat)
+    print(f"{'pages':>6} {'sequential':>12} {'parallel':>10} {'speedup':>8}")
+    for name, sequential in results.items():
+        if not name.startswith('pdf_pages/sequential-'):
+            continue
+        parallel = results[name.replace('sequential', 'parallel')]
+        print(f"{sequential['pages']:>6} {sequential['min_ms']:>10.1f}ms {parallel['min_ms']:>8.1f}ms "
+              f"{sequential['min_ms'] / parallel['min_ms']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
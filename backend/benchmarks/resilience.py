@@ -0,0 +1,143 @@
+"""
+Resilience Check - retries, rate limits, circuit breaking and fallback
+Runs LLMService against the stub provider with injected faults and reports,
+per scenario, what the caller saw, how many requests reached the stub and
+how long it took. The behaviour itself is asserted in tests/test_resilience.py.
+
+Usage (from backend/):
+    python -m benchmarks.resilience
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.stub_provider import StubServer
+from benchmarks.suite import patched_env, summarize
+
+RESUME = "Jane Doe\njane@example.com\n\nEXPERIENCE\nBuilt Python services"
+JD = "Python engineer with AWS and Kubernetes experience"
+
+# Fast settings so each scenario finishes in seconds
+BASE_ENV = {
+    'LLM_RETRY_BASE': '0.05',
+    'LLM_RETRY_MAX_DELAY': '0.5',
+    'LLM_BREAKER_FAILURES': '3',
+    'LLM_BREAKER_RESET': '1',
+    'LLM_RATE_LIMIT': '0'
+}
+
+
+class Scenario:
+    def __init__(self, name: str, faults: Optional[Dict] = None, env: Optional[Dict] = None,
+                 requests: int = 1, provider: str = 'openrouter', concurrent: bool = False,
+                 expect: str = ''):
+        self.name = name
+        self.faults = faults or {}
+        self.env = env or {}
+        self.requests = requests
+        self.provider = provider
+        self.concurrent = concurrent
+        self.expect = expect
+
+
+SCENARIOS = [
+    Scenario('transient 503 x2', {'status': 503, 'count': 2},
+             expect='succeeds on the third attempt'),
+    Scenario('429 with Retry-After 1s', {'status': 429, 'count': 1, 'retry_after': 1},
+             expect='waits ~1s, then succeeds'),
+    Scenario('401 bad key', {'status': 401, 'count': 1},
+             expect='fails at once, no retry'),
+    Scenario('outage', {'status': 503, 'rate': 1.0}, requests=6,
+             expect='circuit opens; later calls fail fast without reaching the stub'),
+    Scenario('outage with fallback', {'status': 503, 'rate': 1.0, 'routes': ['chat']},
+             env={'LLM_FALLBACKS': 'openrouter=claude:stub-fallback', 'ANTHROPIC_API_KEY': 'stub'},
+             expect='answered by the fallback provider'),
+    Scenario('rate limit 5/s burst 5', env={'LLM_RATE_LIMIT': '5', 'LLM_RATE_BURST': '5'},
+             requests=15, concurrent=True, expect='15 requests take ~2s'),
+]
+
+
+async def _run(scenario: Scenario, stub: StubServer) -> Dict:
+    from api.services.llm_providers import ClientPool, ProviderSettings
+    from api.services.llm_service import LLMService
+    from api.services.response_cache import ResponseCache
+
+    pool = ClientPool(ProviderSettings())
+    service = LLMService(pool=pool, cache=ResponseCache(None))
+
+    async with httpx.AsyncClient(base_url=stub.base_url) as control:
+        await control.post('/faults', json=scenario.faults)
+        before = (await control.get('/stats')).json()['requests']
+
+        async def one(index: int) -> Tuple[Dict, float]:
+            started = time.perf_counter()
+            result = await service.enhance_resume(
+                RESUME + str(index), JD, scenario.provider, 'stub', 'stub', bypass_cache=True)
+            return result, time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            if scenario.concurrent:
+                timed = await asyncio.gather(*[one(i) for i in range(scenario.requests)])
+            else:
+                timed = [await one(i) for i in range(scenario.requests)]
+        finally:
+            await pool.aclose()
+        elapsed = time.perf_counter() - started
+
+        after = (await control.get('/stats')).json()['requests']
+        await control.post('/faults', json={})
+
+    outcomes: List[str] = []
+    for result, _ in timed:
+        if result['success']:
+            outcomes.append(f"ok via {result['fallback']['provider']}" if 'fallback' in result else 'ok')
+        else:
+            outcomes.append('refused' if 'circuit' in result['error'] else f"error (retryable={result['retryable']})")
+
+    guard = service.provider_stats()[scenario.provider]
+    return summarize(
+        [seconds for _, seconds in timed], elapsed,
+        seconds=round(elapsed, 3),
+        outcomes=dict(_counts(outcomes)),
+        stub_requests=after - before,
+        retried=guard['retried'],
+        circuit=guard['circuit']['state']
+    )
+
+
+def cases(port: int) -> Dict[str, Dict]:
+    """Every scenario against one stub, each with its own environment"""
+    results = {}
+    with StubServer(port=port, token_delay=0) as stub:
+        for scenario in SCENARIOS:
+            with patched_env({**stub.provider_env(), **BASE_ENV, **scenario.env}):
+                results[f"resilience/{scenario.name.replace(' ', '-')}"] = asyncio.run(_run(scenario, stub))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8911)
+    args = parser.parse_args()
+
+    results = cases(args.port)
+    for scenario, report in zip(SCENARIOS, results.values()):
+        summary = ', '.join(f'{count}x {outcome}' for outcome, count in report['outcomes'].items())
+        print(f"{scenario.name:<26} {report['seconds']:6.2f}s  stub requests={report['stub_requests']:<3} "
+              f"retried={report['retried']:<2} circuit={report['circuit']:<9} {summary}")
+        print(f"{'':<26} expected: {scenario.expect}")
+
+
+def _counts(items: List[str]):
+    counts: Dict[str, int] = {}
+    for item in items:
+        counts[item] = counts.get(item, 0) + 1
+    return counts.items()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Resume Index Benchmark - top-k retrieval latency on a large corpus
+Builds a ResumeIndex of generated resumes whose words follow a Zipf
+distribution over a large vocabulary (a few terms in most resumes, most
+terms in few), then times top-k queries against brute-force scoring with
+ATSScorer over a sample.
+
+Usage (from backend/):
+    python -m benchmarks.resume_index --resumes 100000 --queries 50
+"""
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+from typing import Dict, Optional
+
+from api.services.ats_scorer import ATSScorer
+from api.services.resume_index import ResumeIndex
+from benchmarks.fixtures import SKILLS
+from benchmarks.suite import measure, summarize
+
+SECTION_WORDS = {'summary': (15, 40), 'experience': (150, 500), 'skills': (10, 30), 'education': (5, 15)}
+
+
+class Corpus:
+    """Seeded resumes and JDs over one Zipf-distributed vocabulary"""
+
+    def __init__(self, vocabulary: int, seed: int = 0):
+        self.rng = random.Random(seed)
+        skills = [skill.lower() for skill in SKILLS]
+        self.words = skills + [f'term{index}' for index in range(vocabulary - len(skills))]
+        self.rng.shuffle(self.words)
+        self.cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(self.words) + 1)))
+
+    def text(self, low: int, high: int) -> str:
+        return ' '.join(self.rng.choices(self.words, cum_weights=self.cum_weights, k=self.rng.randint(low, high)))
+
+    def sections(self):
+        return {name: {'content': self.text(low, high)} for name, (low, high) in SECTION_WORDS.items()}
+
+    def job_description(self) -> str:
+        # Mostly common words, plus a handful drawn uniformly: the rarer, specific asks
+        return self.text(120, 200) + ' ' + ' '.join(self.rng.choices(self.words, k=8))
+
+
+def cases(resumes: int, vocabulary: int = 50000, batch: int = 2000, queries: int = 50, k: int = 10,
+          brute_force_sample: int = 2000, path: Optional[str] = None) -> Dict[str, Dict]:
+    """Index build, reopen, top-k search and brute-force scoring over `resumes` generated resumes"""
+    corpus = Corpus(vocabulary)
+    index_path = path or tempfile.mktemp(prefix='resume-index-', suffix='.sqlite3')
+    index = ResumeIndex(index_path)
+    try:
+        started = time.perf_counter()
+        sample = []
+        for start in range(0, resumes, batch):
+            chunk = [(f'resume-{number}', corpus.sections(), None)
+                     for number in range(start, min(start + batch, resumes))]
+            if len(sample) < brute_force_sample:
+                sample.extend(chunk[:brute_force_sample - len(sample)])
+            index.add_many(chunk)
+        build = time.perf_counter() - started
+        stats = index.stats()
+        size = {'resumes': stats['resumes'], 'terms': stats['terms'], 'postings': stats['postings'],
+                'bytes_per_posting': stats['bytes_per_posting'], 'file_bytes': os.path.getsize(index_path)}
+        results = {f'resume_index/build-{resumes}': summarize(
+            [build], build, throughput_per_s=round(stats['resumes'] / build, 3), **size)}
+
+        # Reopen, so the first query pays for loading section lengths
+        index.close()
+        started = time.perf_counter()
+        index = ResumeIndex(index_path)
+        index.stats()
+        reopen = time.perf_counter() - started
+        results[f'resume_index/reopen-{resumes}'] = summarize([reopen], reopen)
+
+        jds = [corpus.job_description() for _ in range(queries)]
+        jd_iter = iter(jds)
+        results[f'resume_index/search-top{k}-{resumes}'] = measure(
+            lambda: index.search(next(jd_iter), k=k), queries, 0, k=k)
+
+        scorer = ATSScorer()
+        texts = ['\n'.join(section['content'] for section in sections.values()) for _, sections, _ in sample]
+        started = time.perf_counter()
+        scorer.score_matrix(texts, jds[:1])
+        per_resume = (time.perf_counter() - started) / len(texts)
+        # Reported per resume; the extra field extrapolates to one JD over the whole index
+        results[f'resume_index/brute-force-{resumes}'] = summarize(
+            [per_resume], per_resume, sample=len(texts),
+            full_scan_ms=round(per_resume * stats['resumes'] * 1000, 4))
+        return results
+    finally:
+        index.close()
+        if not path:
+            os.unlink(index_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=100000)
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--batch', type=int, default=2000, help='resumes per add_many call')
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--brute-force-sample', type=int, default=2000,
+                        help='resumes scored one by one with ATSScorer, for comparison')
+    parser.add_argument('--path', help='index file (default: a temp file, removed afterwards)')
+    args = parser.parse_args()
+
+    results = cases(args.resumes, args.vocabulary, args.batch, args.queries, args.k,
+                    args.brute_force_sample, args.path)
+    build = results[f'resume_index/build-{args.resumes}']
+    print(f"indexed {build['resumes']} resumes in {build['p50_ms'] / 1000:.1f}s ({build['throughput_per_s']:.0f}/s), "
+          f"{build['terms']} terms, {build['postings']} postings, "
+          f"{build['bytes_per_posting']} bytes/posting, file {build['file_bytes'] / 2 ** 20:.0f} MB")
+    print(f"reopen and load: {results[f'resume_index/reopen-{args.resumes}']['p50_ms']:.0f}ms")
+
+    search = results[f'resume_index/search-top{args.k}-{args.resumes}']
+    print(f"search top-{args.k} over {build['resumes']}: p50 {search['p50_ms']:.1f}ms "
+          f"p90 {search['p90_ms']:.1f}ms p99 {search['p99_ms']:.1f}ms mean {search['mean_ms']:.1f}ms")
+
+    brute = results[f'resume_index/brute-force-{args.resumes}']
+    print(f"brute force (ATSScorer.score_matrix): {brute['p50_ms'] * 1000:.0f}us per resume, "
+          f"~{brute['full_scan_ms']:.0f}ms per JD over {build['resumes']}")
+
+
+if __name__ == '__main__':
+    main()
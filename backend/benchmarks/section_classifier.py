@@ -0,0 +1,72 @@
+"""
+Section Classifier Benchmark - header detection on large synthetic documents
+Times the classifier without its memo, with a cold memo and with a warm one,
+then the full merge + section parse, over a document of --lines lines.
+
+Usage (from backend/):
+    python -m benchmarks.section_classifier --lines 10000
+"""
+import argparse
+from typing import Dict, List
+
+from api.services.document_extractor import DocumentExtractor, SECTION_CLASSIFIER
+from benchmarks.fixtures import resume_lines
+from benchmarks.suite import measure
+
+
+def synthetic_lines(count: int) -> List[str]:
+    """Fixture resumes back to back until there are `count` lines"""
+    lines: List[str] = []
+    seed = 0
+    while len(lines) < count:
+        lines.extend(resume_lines(pages=3, seed=seed, table_density=0.1))
+        seed += 1
+    return [line.replace('\t', ' ') for line in lines[:count]]
+
+
+def cases(count: int, repeat: int) -> Dict[str, Dict]:
+    """Classifier and merge + parse timings over a document of `count` lines"""
+    lines = synthetic_lines(count)
+    stripped = [line.strip() for line in lines]
+    extractor = DocumentExtractor()
+    classifier = SECTION_CLASSIFIER
+
+    def unmemoized():
+        for line in stripped:
+            classifier._classify(line)
+
+    def memoized():
+        for line in stripped:
+            classifier.classify(line)
+
+    def parse():
+        extractor.parse_sections(extractor._merge_continuation_lines(lines))
+
+    extra = {'lines': len(lines), 'distinct': len(set(stripped))}
+    cold = classifier.classify.cache_clear
+    # Warm cases get one untimed call to fill the memo
+    return {
+        f'section_classifier/classify-no-memo-{count}': measure(unmemoized, repeat, 0, **extra),
+        f'section_classifier/classify-cold-memo-{count}': measure(memoized, repeat, 0, setup=cold, **extra),
+        f'section_classifier/classify-warm-memo-{count}': measure(memoized, repeat, 1, **extra),
+        f'section_classifier/parse-cold-memo-{count}': measure(parse, repeat, 0, setup=cold, **extra),
+        f'section_classifier/parse-warm-memo-{count}': measure(parse, repeat, 1, **extra)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = cases(args.lines, args.repeat)
+    first = next(iter(results.values()))
+    print(f"{first['lines']} lines, {first['distinct']} distinct")
+    for name, stats in results.items():
+        label = name.split('/', 1)[1].rsplit('-', 1)[0]
+        print(f"{label:<26} {stats['min_ms']:>8.2f}ms {stats['min_ms'] * 1000 / stats['lines']:>8.2f}us/line")
+
+
+if __name__ == '__main__':
+    main()
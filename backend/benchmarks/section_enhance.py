@@ -0,0 +1,107 @@
+"""
+Section Enhancement Benchmark - whole-resume rewrite vs weak sections only
+Enhances generated resumes against the stub provider in 'full' mode (the
+whole resume and JD in, the whole resume back, streamed) and 'sections'
+mode, and reports prompt size, reply size, wall time and whether every
+protected line came back unchanged. The stub paces both replies at the same
+seconds per word, and full-mode replies are as long as the resume.
+
+Usage (from backend/):
+    python -m benchmarks.section_enhance --resumes 5 --pages 1 2
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from api.services.document_extractor import DocumentExtractor
+from benchmarks.fixtures import job_description, resume_lines
+from benchmarks.stub_provider import StubServer, section_reply
+from benchmarks.suite import patched_env, summarize
+
+
+def protected_intact(lines, parts, enhanced: str) -> bool:
+    """Every line outside the sent parts appears in the enhanced resume, in order"""
+    sent = set()
+    for part in parts:
+        sent.update(range(part['start'], part['end']))
+    remaining = iter(enhanced.split('\n'))
+    return all(any(line == candidate for candidate in remaining)
+               for index, line in enumerate(lines) if index not in sent)
+
+
+async def _run(stub: StubServer, resumes, jd: str):
+    from api.services.ats_scorer import ATSScorer
+    from api.services.llm_providers import ClientPool, ProviderSettings
+    from api.services.llm_service import LLMService
+    from api.services.response_cache import ResponseCache
+    from api.services.section_enhancer import SectionEnhancer
+    from api.services.workers import WorkerPool
+
+    pool = ClientPool(ProviderSettings())
+    service = LLMService(pool=pool, cache=ResponseCache(None))
+    scoring = WorkerPool('bench-scoring', kind='thread', max_workers=2, max_concurrency=2)
+    enhancer = SectionEnhancer(service, DocumentExtractor(), ATSScorer(), scoring)
+    rows = {'full': [], 'sections': []}
+    try:
+        for resume in resumes:
+            # A real full-mode reply is about as long as the resume
+            stub.app.state.reply = resume
+            prompt = service._provider_request('openrouter', resume, jd)['prompt']
+            started = time.perf_counter()
+            reply = ''.join([text async for text in service.stream_enhance_resume(
+                resume, jd, 'openrouter', 'stub', 'stub', bypass_cache=True)])
+            rows['full'].append((len(prompt), len(reply.split()), time.perf_counter() - started, True))
+
+            plan = enhancer.plan(resume, jd)
+            prompt = enhancer._request(plan)['prompt'] if plan['parts'] else ''
+            started = time.perf_counter()
+            result = await enhancer.enhance_resume(resume, jd, 'openrouter', 'stub', 'stub', bypass_cache=True)
+            elapsed = time.perf_counter() - started
+            intact = result['success'] and protected_intact(plan['lines'], plan['parts'], result['enhanced_resume'])
+            reply_words = len((section_reply(prompt) or '').split())
+            rows['sections'].append((len(prompt), reply_words, elapsed, intact))
+    finally:
+        await pool.aclose()
+        scoring.shutdown()
+    return rows
+
+
+def cases(resume_count: int, page_counts: List[int], port: int, delay: float,
+          token_delay: float) -> Dict[str, Dict]:
+    """Full and section-targeted enhancement of `resume_count` resumes per page count"""
+    jd = job_description(250)
+    results = {}
+    with StubServer(port=port, delay=delay, token_delay=token_delay) as stub, \
+            patched_env({**stub.provider_env(), 'LLM_RATE_LIMIT': '0'}):
+        for pages in page_counts:
+            resumes = ['\n'.join(resume_lines(pages, seed=seed)) for seed in range(resume_count)]
+            rows = asyncio.run(_run(stub, resumes, jd))
+            for mode, measured in rows.items():
+                prompt, reply, seconds, intact = zip(*measured)
+                results[f'section_enhance/{mode}-{pages}p'] = summarize(
+                    list(seconds), sum(seconds), pages=pages, prompt_chars=round(statistics.fmean(prompt)),
+                    reply_words=round(statistics.fmean(reply)), protected_intact=sum(intact))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=5, help='resumes per page count')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--delay', type=float, default=0.3, help='stub time to first byte, seconds')
+    parser.add_argument('--token-delay', type=float, default=0.005, help='stub seconds per word of reply')
+    parser.add_argument('--port', type=int, default=8913)
+    args = parser.parse_args()
+
+    results = cases(args.resumes, args.pages, args.port, args.delay, args.token_delay)
+    print(f"{'pages':>5} {'mode':<9} {'prompt chars':>13} {'reply words':>12} {'seconds':>8} {'protected intact':>17}")
+    for name, row in results.items():
+        mode = name.split('/', 1)[1].rsplit('-', 1)[0]
+        print(f"{row['pages']:>5} {mode:<9} {row['prompt_chars']:>13} {row['reply_words']:>12} "
+              f"{row['mean_ms'] / 1000:>8.2f} {row['protected_intact']:>13}/{row['n']}")
+
+
+if __name__ == '__main__':
+    main()
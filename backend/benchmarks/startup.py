@@ -0,0 +1,125 @@
+"""
+Startup Benchmark - import time and memory of a fresh API worker
+Each run starts a new interpreter, imports the app and reports the time
+taken, peak RSS and which heavy modules got loaded. Modes:
+    lazy     - the app as configured (SDKs and parsers load on first use)
+    eager    - imports SDKs and parsers up front, as the app used to
+    warm-up  - lazy import, then the WARM_UP startup hook (extraction
+               worker RSS reported separately)
+
+Usage (from backend/):
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.suite import summarize
+
+HEAVY_MODULES = ['openai', 'anthropic', 'pdfplumber', 'PyPDF2', 'docx']
+
+PROBE = r'''
+import asyncio, json, os, resource, sys, time
+
+HEAVY_MODULES = {heavy!r}
+mode = {mode!r}
+
+
+def rss_mb(pid='self'):
+    """Current RSS from /proc, or peak RSS where /proc is missing"""
+    try:
+        with open(f'/proc/{{pid}}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+started = time.perf_counter()
+if mode == 'eager':
+    for name in HEAVY_MODULES:
+        __import__(name)
+import main
+report = {{
+    'import_seconds': time.perf_counter() - started,
+    'rss_mb': rss_mb(),
+    'heavy_loaded': [name for name in HEAVY_MODULES if name in sys.modules]
+}}
+
+if mode == 'warm-up':
+    from api.services.workers import extraction_pool
+
+    async def startup():
+        async with main.lifespan(main.app):
+            report['warm_up_seconds'] = time.perf_counter() - warm_started
+            report['rss_after_warm_up_mb'] = rss_mb()
+            processes = getattr(extraction_pool._executor, '_processes', None) or {{}}
+            report['worker_rss_mb'] = [rss_mb(pid) for pid in processes]
+
+    os.environ['WARM_UP'] = '1'
+    warm_started = time.perf_counter()
+    asyncio.run(startup())
+
+print(json.dumps(report))
+'''
+
+
+def probe(mode: str) -> dict:
+    code = PROBE.format(heavy=HEAVY_MODULES, mode=mode)
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def cases(runs: int, modes: List[str]) -> Dict[str, Dict]:
+    """Import time per mode over `runs` fresh interpreters, with median memory figures"""
+    results = {}
+    for mode in modes:
+        reports = [probe(mode) for _ in range(runs)]
+        seconds = [r['import_seconds'] for r in reports]
+        extra = {
+            'rss_mb': round(statistics.median(r['rss_mb'] for r in reports), 1),
+            'heavy_loaded': reports[0]['heavy_loaded']
+        }
+        if mode == 'warm-up':
+            extra.update(
+                warm_up_seconds=round(statistics.median(r['warm_up_seconds'] for r in reports), 3),
+                rss_after_warm_up_mb=round(statistics.median(r['rss_after_warm_up_mb'] for r in reports), 1),
+                worker_rss_mb=reports[0]['worker_rss_mb']
+            )
+        results[f'startup/{mode}'] = summarize(seconds, sum(seconds), **extra)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', nargs='+', default=['lazy', 'eager', 'warm-up'])
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'import':>9} {'rss':>9}  extra")
+    for name, stats in cases(args.runs, args.modes).items():
+        mode = name.split('/', 1)[1]
+        extra = f"heavy modules: {', '.join(stats['heavy_loaded']) or 'none'}"
+        if mode == 'warm-up':
+            workers = stats['worker_rss_mb']
+            extra = (f"warm-up {stats['warm_up_seconds']:.2f}s, rss after {stats['rss_after_warm_up_mb']:.0f}MB, "
+                     f"{len(workers)} extraction worker(s) at {', '.join(f'{w:.0f}MB' for w in workers)}")
+
+        print(f"{mode:<8} {stats['p50_ms'] / 1000:>8.2f}s {stats['rss_mb']:>7.0f}MB  {extra}")
+
+
+if __name__ == '__main__':
+    main()
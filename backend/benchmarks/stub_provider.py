@@ -0,0 +1,298 @@
+"""
+Stub LLM Provider - local OpenAI/OpenRouter and Anthropic compatible server
+Point the backend at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:<port>
+    OPENROUTER_BASE_URL=http://127.0.0.1:<port>/v1
+
+Faults can be injected to exercise retries and circuit breaking:
+    POST /faults {"status": 503, "count": 3, "rate": 0.2, "retry_after": 1, "routes": ["chat"]}
+fails the next `count` matching requests, then a `rate` fraction of them.
+Routes are "chat" (OpenAI / OpenRouter) and "messages" (Anthropic).
+
+Bullet variant and section enhancement prompts (api.services.bullet_variants,
+api.services.section_enhancer) are answered with JSON rewrites keyed by id,
+paced by token_delay per word like a streamed reply.
+
+Usage (from backend/):
+    python -m benchmarks.stub_provider --port 8900 --delay 2
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STUB_REPLY = (
+    "Jane Doe\njane@example.com | 555-123-4567\n\nEXPERIENCE\n"
+    "Senior Software Engineer 2019 - Present\n"
+    "• Led Agile migration of 40 services to Kubernetes on AWS, cutting deploy time by 60%\n"
+    "• Developed scalable Python data pipelines on PostgreSQL processing $2M daily\n"
+    "\nSKILLS\nPython, Go, AWS, Docker, Kubernetes, PostgreSQL\n\nEDUCATION\nBS Computer Science"
+)
+
+
+# "[bullet id] text" lines of a bullet variant prompt
+VARIANT_BULLET = re.compile(r'^\[([^\]]+)\] (.+)$', re.MULTILINE)
+VARIANT_COUNT = re.compile(r'in (\d+) different ways')
+
+
+def variant_reply(prompt: str):
+    """JSON variants for each bullet of a bullet variant prompt, or None for any other prompt"""
+    count = VARIANT_COUNT.search(prompt)
+    bullets = VARIANT_BULLET.findall(prompt)
+    if not count or not bullets:
+        return None
+    verbs = ['Led', 'Delivered', 'Drove', 'Spearheaded', 'Optimized']
+    return json.dumps({
+        bullet_id: [f'{verbs[n % len(verbs)]} {text[0].lower()}{text[1:]}' for n in range(int(count.group(1)))]
+        for bullet_id, text in bullets
+    })
+
+
+# "[part id] (job) text" bullets and "[part id]" + body lines of a section enhancement prompt
+SECTION_PART = re.compile(r'^\[([^\]]+)\](?: \([^)]*\))? ?(.*)$', re.MULTILINE)
+
+
+def section_reply(prompt: str):
+    """JSON rewrites for each part of a section enhancement prompt, or None for any other prompt"""
+    if not prompt.startswith('Rewrite these parts of a resume'):
+        return None
+    body = prompt.split('\nParts:\n', 1)[-1].split('\n\nReturn ONLY', 1)[0]
+    matches = list(SECTION_PART.finditer(body))
+    rewrites = {}
+    for match, following in zip(matches, matches[1:] + [None]):
+        text = (match.group(2) + body[match.end():following.start() if following else len(body)]).strip()
+        rewrites[match.group(1)] = f'Delivered {text[0].lower()}{text[1:]}' if text else text
+    return json.dumps(rewrites)
+
+
+def _sse(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def create_app(delay: float = 0.0, reply: str = STUB_REPLY, token_delay: float = 0.01) -> FastAPI:
+    """delay is the time to first byte; token_delay paces streamed tokens"""
+    app = FastAPI(title="Stub LLM Provider")
+    app.state.delay = delay
+    app.state.token_delay = token_delay
+    app.state.reply = reply
+    app.state.requests = 0
+    app.state.connections = set()
+    app.state.faults = {}
+    app.state.failures = 0
+    app.state.random = random.Random(0)
+
+    def _fault(route: str):
+        """An error response if an injected fault applies to this request"""
+        faults = app.state.faults
+        if not faults or route not in faults.get('routes', ('chat', 'messages')):
+            return None
+        if faults.get('count', 0) > 0:
+            faults['count'] -= 1
+        elif app.state.random.random() >= faults.get('rate', 0.0):
+            return None
+
+        app.state.failures += 1
+        status = faults.get('status', 503)
+        headers = {'retry-after': str(faults['retry_after'])} if faults.get('retry_after') is not None else None
+        return JSONResponse(
+            {"error": {"type": "stub_fault", "message": f"Injected fault ({status})"}},
+            status_code=status,
+            headers=headers
+        )
+
+    async def _record(request: Request) -> dict:
+        app.state.requests += 1
+        app.state.connections.add((request.client.host, request.client.port))
+        body = await request.json()
+        if app.state.delay:
+            await asyncio.sleep(app.state.delay)
+        return body
+
+    async def _reply(body: dict) -> str:
+        prompt = '\n'.join(str(message.get('content', '')) for message in body.get('messages', []))
+        rewrites = variant_reply(prompt) or section_reply(prompt)
+        if rewrites is None:
+            return app.state.reply
+        if app.state.token_delay:
+            await asyncio.sleep(app.state.token_delay * len(rewrites.split()))
+        return rewrites
+
+    async def _tokens():
+        for token in re.findall(r'\S+\s*|\s+', app.state.reply):
+            if app.state.token_delay:
+                await asyncio.sleep(app.state.token_delay)
+            yield token
+
+    async def _openai_stream(model: str, include_usage: bool = False):
+        count = 0
+        async for token in _tokens():
+            count += 1
+            yield _sse({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            })
+        yield _sse({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+        })
+        if include_usage:
+            yield _sse({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": {"prompt_tokens": 0, "completion_tokens": count, "total_tokens": count}
+            })
+        yield "data: [DONE]\n\n"
+
+    async def _anthropic_stream(model: str):
+        yield _sse({"type": "message_start", "message": {
+            "id": "msg_stub", "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": 0, "output_tokens": 0}
+        }}, event="message_start")
+        yield _sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                   event="content_block_start")
+        count = 0
+        async for token in _tokens():
+            count += 1
+            yield _sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}},
+                       event="content_block_delta")
+        yield _sse({"type": "content_block_stop", "index": 0}, event="content_block_stop")
+        yield _sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": count}}, event="message_delta")
+        yield _sse({"type": "message_stop"}, event="message_stop")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await _record(request)
+        fault = _fault('chat')
+        if fault is not None:
+            return fault
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(_openai_stream(body.get("model", "stub"), include_usage),
+                                     media_type="text/event-stream")
+        text = await _reply(body)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(text.split()), "total_tokens": len(text.split())}
+        }
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await _record(request)
+        fault = _fault('messages')
+        if fault is not None:
+            return fault
+        if body.get("stream"):
+            return StreamingResponse(_anthropic_stream(body.get("model", "stub")), media_type="text/event-stream")
+        text = await _reply(body)
+        return {
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 0, "output_tokens": len(text.split())}
+        }
+
+    @app.get("/stats")
+    async def stats():
+        """Requests served and distinct client connections seen"""
+        return {"requests": app.state.requests, "connections": len(app.state.connections),
+                "failures": app.state.failures}
+
+    @app.post("/faults")
+    async def set_faults(request: Request):
+        """Replace the injected faults; an empty body clears them"""
+        app.state.faults = await request.json() or {}
+        return app.state.faults
+
+    return app
+
+
+def free_port() -> int:
+    """A local port nothing is listening on right now"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class StubServer:
+    """Run the stub provider in a background thread"""
+
+    def __init__(self, port: int = 8900, delay: float = 0.0, **app_kwargs):
+        self.port = port
+        self.app = create_app(delay=delay, **app_kwargs)
+        self.server = uvicorn.Server(uvicorn.Config(self.app, port=port, log_level='warning'))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def provider_env(self) -> dict:
+        """Environment variables that route every provider to this stub"""
+        return {
+            'OPENAI_BASE_URL': self.base_url + '/v1',
+            'ANTHROPIC_BASE_URL': self.base_url,
+            'OPENROUTER_BASE_URL': self.base_url + '/v1'
+        }
+
+    def route(self, settings):
+        """Point an existing ProviderSettings (and every provider sharing it) at this stub"""
+        settings.openai_base_url = self.base_url + '/v1'
+        settings.anthropic_base_url = self.base_url
+        settings.openrouter_base_url = self.base_url + '/v1'
+        return settings
+
+    def __enter__(self) -> 'StubServer':
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--delay', type=float, default=0.0)
+    parser.add_argument('--token-delay', type=float, default=0.01)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(delay=args.delay, token_delay=args.token_delay), port=args.port)
+
+
+if __name__ == '__main__':
+    main()
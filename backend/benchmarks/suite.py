@@ -0,0 +1,347 @@
+"""
+Benchmark Suite - extraction, scoring and enhancement latency as JSON
+Runs DocumentExtractor over a generated corpus of PDF and Word resumes
+(page counts, layouts, table density), ATSScorer.calculate_score over
+resumes x job descriptions of several lengths, and LLMService against the
+local stub provider. Each case reports throughput and p50/p90/p99 latency.
+Results are written as JSON with the commit they were measured on; pass an
+earlier result with --compare to see what moved.
+
+The focused benchmarks (pdf_pages, resilience, ...) are groups too, run at
+a suite-sized scale; each module's own command line takes larger runs and
+prints a table from the same cases. They share the helpers below.
+
+Usage (from backend/):
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --only extraction scoring --compare bench.json
+    python -m benchmarks.suite --only all --output full.json
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.fixtures import job_description, resume_docx, resume_lines, resume_pdf
+from benchmarks.stub_provider import StubServer, free_port
+
+PDF_PAGES = (1, 2, 4, 8)
+PDF_LAYOUTS = {
+    'plain': {},
+    'columns': {'columns': 2},
+    'tables': {'table_density': 0.3}
+}
+DOCX_PAGES = (1, 3, 8)
+DOCX_TABLE_ROWS = (0, 20)
+JD_WORDS = (50, 200, 800)
+RESUME_PAGES = (1, 3)
+LLM_PROVIDERS = ('openai', 'claude', 'openrouter')
+
+# A case moving more than this between runs is flagged by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of values"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = pct / 100 * (len(ordered) - 1)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies: List[float], wall_seconds: float, **extra) -> Dict:
+    """Latency percentiles in milliseconds plus operations per second"""
+    ms = [value * 1000 for value in latencies]
+    return {
+        'n': len(ms),
+        'throughput_per_s': round(len(ms) / wall_seconds, 3) if wall_seconds else None,
+        'mean_ms': round(statistics.fmean(ms), 4),
+        'p50_ms': round(percentile(ms, 50), 4),
+        'p90_ms': round(percentile(ms, 90), 4),
+        'p99_ms': round(percentile(ms, 99), 4),
+        'min_ms': round(min(ms), 4),
+        'max_ms': round(max(ms), 4),
+        **extra
+    }
+
+
+def time_calls(func: Callable, iterations: int, setup: Optional[Callable] = None) -> List[float]:
+    """Seconds taken by each of `iterations` sequential calls; setup() runs untimed before each"""
+    latencies = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def measure(func: Callable, iterations: int, warmup: int, setup: Optional[Callable] = None, **extra) -> Dict:
+    """Call func sequentially; warm-up calls are not counted"""
+    for _ in range(warmup):
+        func()
+    started = time.perf_counter()
+    latencies = time_calls(func, iterations, setup)
+    return summarize(latencies, time.perf_counter() - started, **extra)
+
+
+async def ameasure(func: Callable[[], Awaitable], iterations: int, warmup: int, **extra) -> Dict:
+    """measure() for a coroutine function, awaited one call at a time"""
+    for _ in range(warmup):
+        await func()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        await func()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started, **extra)
+
+
+@contextmanager
+def patched_env(values: Dict[str, str]):
+    """Set environment variables for the duration of the block"""
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def extraction_cases(iterations: int, warmup: int) -> Dict[str, Dict]:
+    from api.services.document_extractor import DocumentExtractor
+
+    extractor = DocumentExtractor()
+    results = {}
+
+    for layout, options in PDF_LAYOUTS.items():
+        for pages in PDF_PAGES:
+            document = resume_pdf(pages, seed=pages, **options)
+            result = extractor.extract_from_pdf(document)
+            stats = measure(lambda: extractor.extract_from_pdf(document), iterations, warmup)
+            results[f'extract_pdf/{layout}-{pages}p'] = dict(
+                stats, bytes=len(document), engine=result.get('engine'), words=result.get('word_count'))
+
+    for table_rows in DOCX_TABLE_ROWS:
+        for pages in DOCX_PAGES:
+            document = resume_docx(pages, seed=pages, table_rows=table_rows)
+            result = extractor.extract_from_word(document)
+            stats = measure(lambda: extractor.extract_from_word(document), iterations, warmup)
+            results[f'extract_docx/tables{table_rows}-{pages}p'] = dict(
+                stats, bytes=len(document), words=result.get('word_count'))
+
+    return results
+
+
+def scoring_cases(iterations: int, warmup: int) -> Dict[str, Dict]:
+    from api.services.ats_scorer import ATSScorer
+
+    results = {}
+    for resume_pages in RESUME_PAGES:
+        resume = '\n'.join(resume_lines(resume_pages, seed=resume_pages, table_density=0.1))
+        for words in JD_WORDS:
+            jd = job_description(words, seed=words)
+
+            # Warm: the JD profile is cached, as for repeated scoring of one posting
+            scorer = ATSScorer()
+            warm = measure(lambda: scorer.calculate_score(resume, jd), iterations, warmup)
+            results[f'score/resume{resume_pages}p-jd{words}w'] = warm
+
+            # Cold: a new scorer each call, so the JD profile is built every time
+            cold = measure(lambda: ATSScorer().calculate_score(resume, jd), iterations, warmup)
+            results[f'score_cold_profile/resume{resume_pages}p-jd{words}w'] = cold
+
+    return results
+
+
+async def _llm_case(service, provider: str, stream: bool, resume: str, jd: str,
+                    iterations: int, warmup: int, concurrency: int) -> Dict:
+    async def one() -> Tuple[float, Optional[float]]:
+        started = time.perf_counter()
+        first_token = None
+        if stream:
+            async for _ in service.stream_enhance_resume(resume, jd, provider, 'stub', 'stub', bypass_cache=True):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+        else:
+            result = await service.enhance_resume(resume, jd, provider, 'stub', 'stub', bypass_cache=True)
+            if not result['success']:
+                raise RuntimeError(result['error'])
+        return time.perf_counter() - started, first_token
+
+    for _ in range(warmup):
+        await one()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            return await one()
+
+    started = time.perf_counter()
+    timings = await asyncio.gather(*[bounded() for _ in range(iterations)])
+    wall = time.perf_counter() - started
+
+    extra = {'concurrency': concurrency}
+    first_tokens = [first for _, first in timings if first is not None]
+    if first_tokens:
+        extra['ttft_p50_ms'] = round(percentile([value * 1000 for value in first_tokens], 50), 4)
+        extra['ttft_p99_ms'] = round(percentile([value * 1000 for value in first_tokens], 99), 4)
+    return summarize([total for total, _ in timings], wall, **extra)
+
+
+def llm_cases(iterations: int, warmup: int, concurrency: int, port: int,
+              stub_delay: float, token_delay: float) -> Dict[str, Dict]:
+    with StubServer(port=port, delay=stub_delay, token_delay=token_delay) as stub, \
+            patched_env(stub.provider_env()):
+        from api.services.llm_providers import ClientPool, ProviderSettings
+        from api.services.llm_service import LLMService
+        from api.services.response_cache import ResponseCache
+
+        resume = '\n'.join(resume_lines(1, seed=1))
+        jd = job_description(200, seed=200)
+
+        async def run() -> Dict[str, Dict]:
+            # A pool built after the stub's URLs are set, and no response cache
+            pool = ClientPool(ProviderSettings())
+            service = LLMService(pool=pool, cache=ResponseCache(None))
+            results = {}
+            try:
+                for provider in LLM_PROVIDERS:
+                    for stream in (False, True):
+                        name = f"llm/{provider}-{'stream' if stream else 'complete'}"
+                        results[name] = await _llm_case(
+                            service, provider, stream, resume, jd, iterations, warmup, concurrency)
+            finally:
+                await pool.aclose()
+            return results
+
+        return asyncio.run(run())
+
+
+def _module(name: str):
+    # Imported when their group runs: they import this module's helpers
+    return importlib.import_module(f'benchmarks.{name}')
+
+
+GROUPS: Dict[str, Callable[[argparse.Namespace], Dict[str, Dict]]] = {
+    'extraction': lambda args: extraction_cases(args.iterations, args.warmup),
+    'scoring': lambda args: scoring_cases(args.iterations, args.warmup),
+    'llm': lambda args: llm_cases(args.llm_iterations, args.warmup, args.concurrency, args.port,
+                                  args.stub_delay, args.token_delay),
+    'pdf_pages': lambda args: _module('pdf_pages').cases([1, 5], args.repeat),
+    'pdf_engines': lambda args: _module('pdf_engines').cases(_module('pdf_engines').corpus(), args.repeat),
+    'section_classifier': lambda args: _module('section_classifier').cases(10000, args.repeat),
+    'merge_scaling': lambda args: _module('merge_scaling').cases([1000, 10000], args.repeat),
+    'compact_result': lambda args: _module('compact_result').cases([1, 2, 5], 3, args.repeat),
+    'resume_index': lambda args: _module('resume_index').cases(10000, queries=50, brute_force_sample=500),
+    'bulk_ingest': lambda args: _module('bulk_ingest').cases(100, [1, 2], 3),
+    'bullet_variants': lambda args: _module('bullet_variants').cases(30, 3, free_port(), 0.2, 0.005),
+    'section_enhance': lambda args: _module('section_enhance').cases(3, [1, 2], free_port(), 0.2, 0.005),
+    'resilience': lambda args: _module('resilience').cases(free_port()),
+    'load_test': lambda args: _module('load_test').cases(free_port(), 8, 2.0, 2.0),
+    'startup': lambda args: _module('startup').cases(3, ['lazy', 'eager', 'warm-up'])
+}
+# Run when --only is not given
+CORE_GROUPS = ('extraction', 'scoring', 'llm')
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict:
+    from api.services.document_extractor import EXTRACTOR_VERSION
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'extractor_version': EXTRACTOR_VERSION,
+        'pdf_engine': os.getenv('PDF_ENGINE', 'auto')
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """One line per case present in both runs, flagging p50/p99 moves past threshold"""
+    lines = [f"{'case':<44} {'p50 before':>11} {'after':>9} {'p99 before':>11} {'after':>9}  change"]
+    for name, after in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        # Missing from the baseline, or an error entry with no timings
+        if before is None or 'p50_ms' not in before or 'p50_ms' not in after:
+            continue
+        change = after['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0.0
+        flag = 'REGRESSION' if change > threshold else ('faster' if change < -threshold else '')
+        lines.append(
+            f"{name:<44} {before['p50_ms']:>9.2f}ms {after['p50_ms']:>7.2f}ms "
+            f"{before['p99_ms']:>9.2f}ms {after['p99_ms']:>7.2f}ms  {change:+7.1%} {flag}"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=[*GROUPS, 'all'], default=list(CORE_GROUPS),
+                        help='groups to run (default: %(default)s)')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case in the focused groups')
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--llm-iterations', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent LLM requests')
+    parser.add_argument('--stub-delay', type=float, default=0.05, help='stub time to first byte, seconds')
+    parser.add_argument('--token-delay', type=float, default=0.0, help='stub delay between streamed tokens')
+    parser.add_argument('--port', type=int, default=8907)
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    parser.add_argument('--compare', help='earlier JSON result to compare against')
+    args = parser.parse_args()
+
+    results: Dict[str, Dict] = {}
+    for name, run in GROUPS.items():
+        if name in args.only or 'all' in args.only:
+            results.update(run(args))
+
+    report = {
+        'environment': environment(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': results
+    }
+    encoded = json.dumps(report, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(encoded + '\n')
+    else:
+        print(encoded)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print('\n'.join(compare(baseline, report)), file=sys.stderr if not args.output else sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,34 @@
 """
 FastAPI Backend for Resume ATS Enhancer
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import documents, enhance, scoring
+from fastapi.responses import PlainTextResponse
+from api.routes import documents, enhance, resumes, scoring
+from api.services.llm_providers import client_pool
+from api.services.metrics import REGISTRY, MetricsMiddleware
+from api.services.warmup import preload_providers, warm_up_enabled
+from api.services.workers import shutdown_pools, start_pools
 
-app = FastAPI(title="Resume ATS Enhancer API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # SDKs and parsers load on first use unless WARM_UP is set
+    if warm_up_enabled():
+        await asyncio.to_thread(preload_providers)
+        await start_pools()
+    # Picks up jobs left unfinished by the previous run
+    await enhance.job_queue.start()
+    yield
+    await enhance.job_queue.stop()
+    # Stop extraction processes and worker threads with the server
+    shutdown_pools()
+    await client_pool.aclose()
+
+
+app = FastAPI(title="Resume ATS Enhancer API", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for Next.js frontend
 app.add_middleware(
@@ -16,10 +39,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so timings cover CORS handling and the whole streamed body
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
 app.include_router(enhance.router, prefix="/api/enhance", tags=["enhance"])
 app.include_router(scoring.router, prefix="/api/scoring", tags=["scoring"])
+app.include_router(resumes.router, prefix="/api/resumes", tags=["resumes"])
 
 @app.get("/")
 async def root():
@@ -27,4 +54,9 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request, stage and provider latency histograms in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.stub_provider import StubServer, free_port
+
+
+@pytest.fixture(scope='session')
+def stub_server():
+    with StubServer(port=free_port(), token_delay=0.0) as server:
+        yield server
+
+
+@pytest.fixture
+def stub(stub_server):
+    """The stub provider with its counters and injected faults reset"""
+    state = stub_server.app.state
+    state.requests = 0
+    state.failures = 0
+    state.connections = set()
+    state.faults = {}
+    yield stub_server
+    state.faults = {}
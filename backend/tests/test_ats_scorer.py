@@ -0,0 +1,123 @@
+"""
+ATSScorer equivalence - the single-scan scorer against the reference scorer
+Seeded random resumes and job descriptions plus edge cases: every path
+(calculate_score, score_matrix, ScoringSession) must give exactly the
+reference score and breakdown.
+"""
+import random
+
+import pytest
+
+from api.services.ats_scorer import ATSScorer
+from tests.reference_scoring import ReferenceScorer
+
+SKILLS = ['Python', 'Kubernetes', 'PostgreSQL', 'React', 'Terraform', 'GraphQL', 'Kafka', 'Airflow',
+          'TypeScript', 'Docker', 'CI/CD', 'Node.js', 'C++', 'machine-learning', 'data']
+STOP_WORDS = ['the', 'and', 'with', 'using', 'work', 'help', 'such', 'this', 'those', 'have', 'from', 'need']
+VERBS = ['achieved', 'improved', 'developed', 'managed', 'led', 'created', 'implemented', 'designed',
+         'Built', 'INCREASED', 'optimized', 'spearheaded', 'architected', 'drove', 'generated']
+# Contain an action verb or keyword without being one
+LOOKALIKES = ['enabled', 'ledger', 'pythonic', 'redeveloped', 'builtin', 'dataset', 'reacted', 'overmanaged']
+SECTION_WORDS = ['EXPERIENCE', 'Work History', 'education', 'University', 'college', 'SKILLS',
+                 'competencies', 'email', 'Phone', 'linkedin', 'contact', 'employment', 'degree']
+METRICS = ['45%', '$10k', '$3M', '$250', '5+', '3 years', '12 months', '2x', '10x', '100%', '7 years']
+UNICODE = ['café', 'naïve', 'Zürich', 'résumé', '数据', 'İstanbul', 'ﬁnance', 'Straße', 'ΣΊΣΥΦΟΣ', '—', '•']
+PUNCTUATION = ['', '', '', '.', ',', ':', ';', '!', '?', ')', '(']
+FILLER = ['team', 'platform', 'services', 'customers', 'scalable', 'product', 'reliability', 'systems',
+          'experience', 'engineering', 'projects', 'across', 'years']
+
+
+def _word(rng: random.Random) -> str:
+    pool = rng.choice([SKILLS, STOP_WORDS, VERBS, LOOKALIKES, SECTION_WORDS, METRICS, UNICODE, FILLER, FILLER])
+    word = rng.choice(pool)
+    if rng.random() < 0.2:
+        word = rng.choice(['(', '[', '{', '']) + word
+    return word + rng.choice(PUNCTUATION)
+
+
+def random_resume(rng: random.Random) -> str:
+    lines = []
+    for _ in range(rng.randint(0, 60)):
+        marker = rng.choice(['', '', '• ', '- ', '* ', '1. '])
+        lines.append(marker + ' '.join(_word(rng) for _ in range(rng.randint(0, 18))))
+    return '\n'.join(lines)
+
+
+def random_jd(rng: random.Random) -> str:
+    return ' '.join(_word(rng) for _ in range(rng.randint(0, 300)))
+
+
+EDGE_CASES = [
+    ('empty resume', '', 'python kubernetes'),
+    ('empty JD', 'Developed Python services', ''),
+    ('JD of stopwords only', 'Developed Python services with 40% faster builds',
+     'the and with using work help such this that have from need'),
+    ('JD of short words only', 'Led Go and C work', 'go c r ml ai ux ui'),
+    ('no bullets', 'Jane Doe\njane@example.com\nEXPERIENCE\nEngineer at Acme since 2019\nSKILLS\nPython Go',
+     'python engineer acme'),
+    ('bullets only', '• Led migration\n• Cut costs 30%\n• Built $2M pipeline', 'migration costs pipeline'),
+    ('unicode', 'Café naïve Zürich résumé 数据 İstanbul ﬁnance Straße — developed 5+ services',
+     'café zürich résumé 数据 finance straße developed'),
+    ('repeated keywords', 'python ' * 500, ('python kubernetes ' * 100) + 'terraform'),
+    ('punctuation around keywords', '(Python), [Kubernetes]; {Terraform}!', 'python: kubernetes, terraform.'),
+    ('whitespace only', '   \n\t\n  ', '   '),
+    ('single character lines', 'a\nb\nc\n1\n%', 'a b c d e f g'),
+]
+
+
+@pytest.fixture(scope='module')
+def scorer():
+    return ATSScorer()
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return ReferenceScorer()
+
+
+@pytest.mark.parametrize('name,resume,jd', EDGE_CASES, ids=[case[0] for case in EDGE_CASES])
+def test_edge_cases_match_reference(scorer, reference, name, resume, jd):
+    assert scorer.calculate_score(resume, jd) == reference.calculate_score(resume, jd)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_random_inputs_match_reference(scorer, reference, seed):
+    rng = random.Random(seed)
+    for _ in range(10):
+        resume, jd = random_resume(rng), random_jd(rng)
+        assert scorer.calculate_score(resume, jd) == reference.calculate_score(resume, jd), (resume, jd)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_score_matrix_matches_reference(scorer, reference, seed):
+    rng = random.Random(1000 + seed)
+    resumes = [random_resume(rng) for _ in range(6)] + ['', EDGE_CASES[4][1]]
+    jds = [random_jd(rng) for _ in range(4)] + ['', EDGE_CASES[2][2]]
+
+    matrix = scorer.score_matrix(resumes, jds, include_breakdown=True)
+    for i, resume in enumerate(resumes):
+        for j, jd in enumerate(jds):
+            expected = reference.calculate_score(resume, jd)
+            assert matrix['scores'][i][j] == expected['score']
+            assert matrix['breakdowns'][i][j] == expected['breakdown']
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_session_matches_reference_after_edits(scorer, reference, seed):
+    rng = random.Random(2000 + seed)
+    jd = random_jd(rng)
+    blocks = [(f'b{n}', random_resume(rng)) for n in range(rng.randint(1, 6))]
+    session = scorer.create_session(jd, blocks)
+
+    def expected():
+        return reference.calculate_score('\n'.join(text for _, text in blocks), jd)
+
+    assert session.score() == expected()
+    for _ in range(8):
+        index = rng.randrange(len(blocks))
+        if rng.random() < 0.2 and len(blocks) > 1:
+            block_id, _ = blocks.pop(index)
+            assert session.remove_block(block_id) == expected()
+        else:
+            blocks[index] = (blocks[index][0], random_resume(rng))
+            assert session.update_block(*blocks[index]) == expected()
@@ -0,0 +1,84 @@
+"""
+Compact extraction result - round trips through JSON and the cache
+A Word resume with characters outside the BMP (emoji, mathematical bold
+letters) checks that offsets count code points and survive JSON.
+"""
+import io
+import json
+
+import docx
+import pytest
+
+from api.services.compact_result import CompactResult, cache_payload, compact_or_full, load_cached
+from api.services.document_extractor import DocumentExtractor
+
+LINES = [
+    'Zoë Nguyễn 🚀',
+    'zoe@example.com | 555-010-2030',
+    'SUMMARY',
+    '𝐁old backend engineer who ships 🔥 fast services.',
+    'EXPERIENCE',
+    'Senior Software Engineer | Globex 2019 - 2024',
+    '• Cut p99 latency by 40% 📉 across 𝐁illing APIs',
+    '• Led 5 engineers on the 支付 ledger migration',
+    'SKILLS',
+    'Python 🐍, Go, PostgreSQL',
+    'EDUCATION',
+    'BS Computer Science 🎓',
+    'State University 2016',
+]
+
+
+def _word_bytes(lines) -> bytes:
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope='module')
+def result():
+    extractor = DocumentExtractor()
+    result = extractor.extract_from_word(_word_bytes(LINES))
+    assert result['success']
+    result['contact'] = extractor.extract_contact_info(result['text'])
+    return result
+
+
+def test_round_trip_through_json(result):
+    payload = json.loads(json.dumps(compact_or_full(result)))
+    assert payload['format'] == 'compact'
+    assert payload['offset_unit'] == 'codepoint'
+    assert CompactResult.from_dict(payload).expand() == result
+
+
+def test_offsets_count_code_points(result):
+    payload = compact_or_full(result)
+    text = payload['text']
+    lines = payload['lines']
+    spans = list(zip(lines[::2], lines[1::2]))
+    assert [text[start:end] for start, end in spans] == result['lines']
+
+    job = payload['sections']['experience']['jobs'][0]
+    bullets = job['bullets']
+    assert text[bullets[0]:bullets[1]] == '• Cut p99 latency by 40% 📉 across 𝐁illing APIs'
+    # The same offsets into UTF-16 code units (how JavaScript indexes strings) land elsewhere
+    utf16 = text.encode('utf-16-le')
+    sliced = utf16[bullets[0] * 2:bullets[1] * 2].decode('utf-16-le', errors='replace')
+    assert sliced != text[bullets[0]:bullets[1]]
+
+
+def test_cache_payload_serves_both_formats(result):
+    payload = cache_payload(result)
+    assert json.loads(payload)['format'] == 'compact'
+    assert load_cached(payload) == result
+    assert load_cached(payload, compact=True) == compact_or_full(result)
+
+
+def test_cached_payload_from_before_offset_unit_still_loads(result):
+    payload = compact_or_full(result)
+    del payload['offset_unit']
+    assert load_cached(json.dumps(payload)) == result
+    assert load_cached(json.dumps(payload), compact=True)['offset_unit'] == 'codepoint'
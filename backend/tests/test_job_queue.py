@@ -0,0 +1,195 @@
+"""
+Job queue - priority order, idempotency, cancellation, restart recovery
+Jobs run through a scripted enhancer; the SQLite store is reopened to
+stand in for a restart.
+"""
+import asyncio
+
+import pytest
+
+from api.services.job_queue import (
+    CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, IdempotencyKeyReused, Job, JobQueue, MemoryJobStore,
+    SQLiteJobStore
+)
+
+REQUEST = {'resume': 'resume', 'job_description': 'jd', 'model': 'stub-model'}
+
+
+class Enhancer:
+    """Upper-cases the resume; raises for resumes in raise_on, waits on gate when set"""
+
+    def __init__(self, raise_on=(), gate=None):
+        self.raise_on = set(raise_on)
+        self.gate = gate
+        self.calls = []
+
+    async def enhance_resume(self, resume, job_description, provider, model, api_key, bypass_cache=False):
+        self.calls.append(resume)
+        if resume in self.raise_on:
+            raise RuntimeError('provider exploded')
+        if self.gate is not None:
+            await self.gate.wait()
+        return {'success': True, 'enhanced_resume': resume.upper()}
+
+
+def _queue(enhancer, store=None, workers=1) -> JobQueue:
+    return JobQueue(enhancer, store or MemoryJobStore(), workers=workers, provider_concurrency=workers,
+                    retention=0, http=lambda: None)
+
+
+def _request(resume: str) -> dict:
+    return dict(REQUEST, resume=resume)
+
+
+async def _wait(queue: JobQueue, job_id: str, statuses=(SUCCEEDED, FAILED, CANCELLED)) -> Job:
+    for _ in range(500):
+        job = await queue.get(job_id)
+        if job.status in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f'job {job_id} is still {job.status}')
+
+
+def test_job_runs_and_drops_its_key():
+    async def scenario():
+        queue = _queue(Enhancer())
+        await queue.start()
+        try:
+            job = await queue.submit('openai', _request('hello'), 'key-1')
+            return await _wait(queue, job.id)
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(scenario())
+    assert job.status == SUCCEEDED
+    assert job.result['enhanced_resume'] == 'HELLO'
+    assert job.attempts == 1
+    assert job.api_key is None
+
+
+def test_raising_enhancer_fails_the_job_and_the_worker_goes_on():
+    async def scenario():
+        queue = _queue(Enhancer(raise_on={'boom'}))
+        await queue.start()
+        try:
+            failing = await queue.submit('openai', _request('boom'), 'key-1')
+            updates = queue.subscribe(failing.id)
+            following = await queue.submit('openai', _request('next'), 'key-1')
+            failed = await _wait(queue, failing.id)
+            statuses = []
+            while not updates.empty():
+                statuses.append(updates.get_nowait()['status'])
+            return failed, statuses, await _wait(queue, following.id)
+        finally:
+            await queue.stop()
+
+    failed, statuses, following = asyncio.run(scenario())
+    assert failed.status == FAILED
+    assert failed.error == 'provider exploded'
+    assert failed.api_key is None
+    # Subscribers see the job end rather than waiting on it forever
+    assert statuses[-1] == FAILED
+    assert following.status == SUCCEEDED
+
+
+def test_higher_priority_runs_first():
+    async def scenario():
+        gate = asyncio.Event()
+        enhancer = Enhancer(gate=gate)
+        queue = _queue(enhancer)
+        await queue.start()
+        try:
+            first = await queue.submit('openai', _request('first'), 'key-1')
+            await _wait(queue, first.id, (RUNNING,))
+            low = await queue.submit('openai', _request('low'), 'key-1', priority=0)
+            high = await queue.submit('openai', _request('high'), 'key-1', priority=5)
+            gate.set()
+            for job in (first, low, high):
+                await _wait(queue, job.id)
+            return enhancer.calls
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(scenario()) == ['first', 'high', 'low']
+
+
+def test_idempotency_key_returns_the_first_job():
+    async def scenario():
+        queue = _queue(Enhancer())
+        await queue.start()
+        try:
+            first = await queue.submit('openai', _request('hello'), 'key-1', idempotency_key='abc')
+            again = await queue.submit('openai', _request('hello'), 'key-1', idempotency_key='abc')
+            # Keys are scoped to the API key that sent them
+            other_caller = await queue.submit('openai', _request('hello'), 'key-2', idempotency_key='abc')
+            with pytest.raises(IdempotencyKeyReused):
+                await queue.submit('openai', _request('changed'), 'key-1', idempotency_key='abc')
+            return first, again, other_caller
+        finally:
+            await queue.stop()
+
+    first, again, other_caller = asyncio.run(scenario())
+    assert again.id == first.id
+    assert other_caller.id != first.id
+
+
+def test_cancel_only_stops_queued_jobs():
+    async def scenario():
+        gate = asyncio.Event()
+        enhancer = Enhancer(gate=gate)
+        queue = _queue(enhancer)
+        await queue.start()
+        try:
+            running = await queue.submit('openai', _request('running'), 'key-1')
+            await _wait(queue, running.id, (RUNNING,))
+            waiting = await queue.submit('openai', _request('waiting'), 'key-1')
+            cancelled = await queue.cancel(waiting.id)
+            still_running = (await queue.cancel(running.id)).status
+            gate.set()
+            return cancelled, still_running, await _wait(queue, running.id), enhancer.calls
+        finally:
+            await queue.stop()
+
+    cancelled, still_running, finished, calls = asyncio.run(scenario())
+    assert cancelled.status == CANCELLED
+    assert cancelled.api_key is None
+    assert still_running == RUNNING
+    assert finished.status == SUCCEEDED
+    assert calls == ['running']
+
+
+def test_unfinished_jobs_resume_after_restart(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+
+    async def first_run():
+        queue = _queue(Enhancer(gate=asyncio.Event()), SQLiteJobStore(path))
+        await queue.start()
+        running = await queue.submit('openai', _request('running'), 'key-1')
+        await _wait(queue, running.id, (RUNNING,))
+        waiting = await queue.submit('openai', _request('waiting'), 'key-1')
+        # Stopping mid-job leaves both unfinished in the store
+        await queue.stop()
+        keyless = Job('openai', _request('keyless'), None)
+        queue.store.save(keyless)
+        return running.id, waiting.id, keyless.id
+
+    async def second_run(job_ids):
+        enhancer = Enhancer()
+        queue = _queue(enhancer, SQLiteJobStore(path))
+        await queue.start()
+        try:
+            return [await _wait(queue, job_id) for job_id in job_ids], enhancer.calls
+        finally:
+            await queue.stop()
+
+    job_ids = asyncio.run(first_run())
+    store = SQLiteJobStore(path)
+    assert [store.get(job_id).status for job_id in job_ids] == [RUNNING, QUEUED, QUEUED]
+
+    (running, waiting, keyless), calls = asyncio.run(second_run(job_ids))
+    assert running.status == SUCCEEDED
+    assert running.attempts == 2
+    assert waiting.status == SUCCEEDED
+    assert keyless.status == FAILED
+    assert 'no API key' in keyless.error
+    assert sorted(calls) == ['running', 'waiting']
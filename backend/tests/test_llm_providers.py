@@ -0,0 +1,198 @@
+"""
+LLM providers against the local stub provider (benchmarks.stub_provider)
+Connection reuse through the shared ClientPool, streaming for every
+provider, and how provider errors map onto the status codes the resilience
+layer retries on.
+"""
+import asyncio
+
+import pytest
+
+from api.services.llm_providers import ClientPool, ProviderError, ProviderSettings, build_providers
+from api.services.resilience import is_retryable, retry_after, status_code
+from benchmarks.stub_provider import STUB_REPLY
+
+PROVIDERS = ['openai', 'claude', 'openrouter']
+
+
+def _run(stub, scenario):
+    """Run scenario(providers, pool) on a fresh pool, closing it afterwards"""
+    async def main():
+        pool = ClientPool(stub.route(ProviderSettings()))
+        try:
+            return await scenario(build_providers(pool), pool)
+        finally:
+            await pool.aclose()
+
+    return asyncio.run(main())
+
+
+async def _collect(provider, prompt='hello', api_key='key-1'):
+    return [text async for text in provider.stream(prompt, 'stub-model', api_key)]
+
+
+@pytest.mark.parametrize('name', PROVIDERS)
+def test_complete(stub, name):
+    async def scenario(providers, pool):
+        return await providers[name].complete('hello', 'stub-model', 'key-1')
+
+    assert _run(stub, scenario) == STUB_REPLY.strip()
+    assert stub.app.state.requests == 1
+
+
+@pytest.mark.parametrize('name', PROVIDERS)
+def test_stream_yields_reply_in_chunks(stub, name):
+    async def scenario(providers, pool):
+        return await _collect(providers[name])
+
+    chunks = _run(stub, scenario)
+    assert len(chunks) > 1
+    assert ''.join(chunks) == STUB_REPLY
+
+
+@pytest.mark.parametrize('name', PROVIDERS)
+def test_completions_reuse_one_connection(stub, name):
+    async def scenario(providers, pool):
+        for _ in range(5):
+            await providers[name].complete('hello', 'stub-model', 'key-1')
+
+    _run(stub, scenario)
+    assert stub.app.state.requests == 5
+    assert len(stub.app.state.connections) == 1
+
+
+def test_openrouter_streams_reuse_one_connection(stub):
+    async def scenario(providers, pool):
+        for _ in range(3):
+            await _collect(providers['openrouter'])
+            await providers['openrouter'].complete('hello', 'stub-model', 'key-1')
+
+    _run(stub, scenario)
+    assert stub.app.state.requests == 6
+    assert len(stub.app.state.connections) == 1
+
+
+def test_openai_and_openrouter_share_the_connection_pool(stub):
+    async def scenario(providers, pool):
+        for _ in range(3):
+            await providers['openai'].complete('hello', 'stub-model', 'key-1')
+            await providers['openrouter'].complete('hello', 'stub-model', 'key-2')
+
+    _run(stub, scenario)
+    assert stub.app.state.requests == 6
+    assert len(stub.app.state.connections) == 1
+
+
+def test_sdk_clients_are_cached_per_key():
+    async def scenario():
+        pool = ClientPool(ProviderSettings())
+        created = []
+
+        def factory(http):
+            created.append(http)
+            return object()
+
+        try:
+            first = pool.get('openai', 'key-1', factory)
+            assert pool.get('openai', 'key-1', factory) is first
+            assert pool.get('openai', 'key-2', factory) is not first
+            assert pool.get('claude', 'key-1', factory) is not first
+            assert len(created) == 3
+            assert all(http is pool.http for http in created)
+        finally:
+            await pool.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_sdk_client_cache_is_bounded():
+    async def scenario():
+        settings = ProviderSettings()
+        settings.max_cached_clients = 2
+        pool = ClientPool(settings)
+        try:
+            first = pool.get('openai', 'key-1', lambda http: object())
+            pool.get('openai', 'key-2', lambda http: object())
+            # key-1 is now the most recently used, so key-2 is evicted
+            assert pool.get('openai', 'key-1', lambda http: object()) is first
+            pool.get('openai', 'key-3', lambda http: object())
+            assert pool.get('openai', 'key-1', lambda http: object()) is first
+            assert len(pool._clients) == 2
+            assert ('openai', 'key-2') not in pool._clients
+        finally:
+            await pool.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_closed_pool_opens_a_new_connection_pool(stub):
+    async def scenario(providers, pool):
+        await providers['openrouter'].complete('hello', 'stub-model', 'key-1')
+        first = pool.http
+        await pool.aclose()
+        assert first.is_closed
+        assert pool.http is not first
+        return await providers['openrouter'].complete('hello', 'stub-model', 'key-1')
+
+    assert _run(stub, scenario) == STUB_REPLY.strip()
+    assert len(stub.app.state.connections) == 2
+
+
+@pytest.mark.parametrize('name', PROVIDERS)
+@pytest.mark.parametrize('status,retryable', [(503, True), (429, True), (529, True), (400, False), (401, False)])
+def test_error_status_maps_to_resilience(stub, name, status, retryable):
+    stub.app.state.faults = {'status': status, 'count': 1, 'retry_after': 2}
+
+    async def scenario(providers, pool):
+        with pytest.raises(Exception) as raised:
+            await providers[name].complete('hello', 'stub-model', 'key-1')
+        return raised.value
+
+    error = _run(stub, scenario)
+    assert status_code(error) == status
+    assert is_retryable(error) is retryable
+    assert retry_after(error) == 2.0
+    assert stub.app.state.failures == 1
+
+
+@pytest.mark.parametrize('name', PROVIDERS)
+def test_stream_error_maps_to_resilience(stub, name):
+    stub.app.state.faults = {'status': 503, 'count': 1}
+
+    async def scenario(providers, pool):
+        with pytest.raises(Exception) as raised:
+            await _collect(providers[name])
+        # The next stream succeeds on the same pool
+        return raised.value, await _collect(providers[name])
+
+    error, chunks = _run(stub, scenario)
+    assert status_code(error) == 503
+    assert is_retryable(error)
+    assert retry_after(error) is None
+    assert ''.join(chunks) == STUB_REPLY
+
+
+def test_openrouter_error_is_a_provider_error(stub):
+    stub.app.state.faults = {'status': 429, 'count': 1, 'retry_after': 7}
+
+    async def scenario(providers, pool):
+        with pytest.raises(ProviderError) as raised:
+            await providers['openrouter'].complete('hello', 'stub-model', 'key-1')
+        return raised.value
+
+    error = _run(stub, scenario)
+    assert error.status_code == 429
+    assert error.retry_after == '7'
+    assert 'Injected fault (429)' in str(error)
+
+
+def test_faults_only_hit_their_route(stub):
+    stub.app.state.faults = {'status': 503, 'count': 3, 'routes': ['messages']}
+
+    async def scenario(providers, pool):
+        with pytest.raises(Exception):
+            await providers['claude'].complete('hello', 'stub-model', 'key-1')
+        return await providers['openai'].complete('hello', 'stub-model', 'key-1')
+
+    assert _run(stub, scenario) == STUB_REPLY.strip()
+    assert stub.app.state.failures == 1
@@ -0,0 +1,422 @@
+"""
+Resilience - token bucket, circuit breaker and ProviderGuard state changes
+Guards are driven with scripted provider calls; the LLMService checks run
+against the stub provider with injected faults (benchmarks.stub_provider).
+"""
+import asyncio
+import time
+
+import pytest
+
+from api.services.llm_providers import ClientPool, ProviderError, ProviderSettings
+from api.services.llm_service import LLMService
+from api.services.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ProviderGuard, ProviderUnavailable, TokenBucket, retry_after
+)
+from api.services.response_cache import ResponseCache
+
+RESUME = "Jane Doe\njane@example.com\n\nEXPERIENCE\nBuilt Python services"
+JD = "Python engineer with AWS and Kubernetes experience"
+
+
+@pytest.fixture
+def fast_env(monkeypatch):
+    """Short backoff, a small breaker and no rate limit unless a test sets one"""
+    for name, value in {
+        'LLM_RETRIES': '2',
+        'LLM_RETRY_BASE': '0.001',
+        'LLM_RETRY_MAX_DELAY': '0.01',
+        'LLM_BREAKER_FAILURES': '3',
+        'LLM_BREAKER_RESET': '30',
+        'LLM_RATE_LIMIT': '0',
+        'LLM_RATE_MAX_WAIT': '30',
+        'LLM_MAX_CONCURRENT_PER_KEY': '8',
+    }.items():
+        monkeypatch.setenv(name, value)
+    return monkeypatch
+
+
+class Script:
+    """A provider call that fails with each status in turn, then returns 'ok'"""
+
+    def __init__(self, *statuses, retry_after=None):
+        self.statuses = list(statuses)
+        self.retry_after = retry_after
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.statuses:
+            raise ProviderError('scripted failure', self.statuses.pop(0), self.retry_after)
+        return 'ok'
+
+
+def _expire(breaker: CircuitBreaker):
+    """Move the breaker past its cool-down"""
+    breaker.opened_at -= breaker.reset_after + 1
+
+
+# Token bucket
+
+def test_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_bucket_refills_up_to_burst():
+    bucket = TokenBucket(rate=10, burst=3)
+    for _ in range(3):
+        bucket.reserve()
+    bucket.updated -= 60
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() > 0
+
+
+def test_bucket_cancel_returns_the_token():
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.reserve()
+    wait = bucket.reserve()
+    bucket.cancel()
+    assert bucket.reserve() == pytest.approx(wait, abs=0.01)
+
+
+# Circuit breaker
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failures=3, reset_after=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record(success=False)
+    assert breaker.state == CLOSED
+
+    breaker.before_call()
+    breaker.record(success=False)
+    assert breaker.state == OPEN
+    with pytest.raises(ProviderUnavailable) as raised:
+        breaker.before_call()
+    assert 0 < raised.value.retry_after <= 30
+    assert breaker.snapshot()['state'] == OPEN
+    assert breaker.snapshot()['consecutive_failures'] == 3
+
+
+def test_breaker_success_resets_the_count():
+    breaker = CircuitBreaker(failures=3, reset_after=30)
+    for success in [False, False, True, False, False]:
+        breaker.before_call()
+        breaker.record(success=success)
+    assert breaker.state == CLOSED
+    assert breaker.failures == 2
+
+
+def test_breaker_half_open_trial_closes_it():
+    breaker = CircuitBreaker(failures=1, reset_after=30)
+    breaker.record(success=False)
+    _expire(breaker)
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # Only one trial call at a time
+    with pytest.raises(ProviderUnavailable):
+        breaker.before_call()
+
+    breaker.record(success=True)
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    breaker.before_call()
+
+
+def test_breaker_failed_trial_reopens_it():
+    breaker = CircuitBreaker(failures=3, reset_after=30)
+    for _ in range(3):
+        breaker.record(success=False)
+    _expire(breaker)
+
+    breaker.before_call()
+    breaker.record(success=False)
+    assert breaker.state == OPEN
+    with pytest.raises(ProviderUnavailable):
+        breaker.before_call()
+
+
+def test_breaker_release_frees_the_trial():
+    breaker = CircuitBreaker(failures=1, reset_after=30)
+    breaker.record(success=False)
+    _expire(breaker)
+
+    breaker.before_call()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+
+
+def test_breaker_disabled_with_zero_failures():
+    breaker = CircuitBreaker(failures=0, reset_after=30)
+    for _ in range(10):
+        breaker.record(success=False)
+    breaker.before_call()
+
+
+# Retry-After
+
+@pytest.mark.parametrize('value,expected', [('2', 2.0), ('0.5', 0.5), ('-3', 0.0), (None, None),
+                                            ('Wed, 21 Oct 2026 07:28:00 GMT', None)])
+def test_retry_after_parsing(value, expected):
+    assert retry_after(ProviderError('error', 503, value)) == expected
+
+
+def test_backoff_honours_retry_after(fast_env):
+    guard = ProviderGuard('openrouter')
+    error = ProviderError('error', 429, '5')
+    assert all(guard.backoff(attempt, error) == 5.0 for attempt in range(4))
+    assert all(guard.backoff(attempt, ProviderError('error', 503)) <= 0.01 for attempt in range(4))
+
+
+# ProviderGuard
+
+def test_guard_retries_transient_errors(fast_env):
+    guard = ProviderGuard('openrouter')
+    script = Script(503, 502)
+    assert asyncio.run(guard.call('key', script)) == 'ok'
+    assert script.calls == 3
+    assert guard.retried == 2
+    assert guard.breaker.state == CLOSED
+    assert guard.breaker.failures == 0
+
+
+def test_guard_waits_for_retry_after(fast_env):
+    guard = ProviderGuard('openrouter')
+    script = Script(429, retry_after='0.2')
+    started = time.perf_counter()
+    assert asyncio.run(guard.call('key', script)) == 'ok'
+    assert time.perf_counter() - started >= 0.2
+    assert script.calls == 2
+
+
+def test_guard_gives_up_after_retries(fast_env):
+    guard = ProviderGuard('openrouter')
+    script = Script(503, 503, 503, 503)
+    with pytest.raises(ProviderError):
+        asyncio.run(guard.call('key', script))
+    assert script.calls == 3
+    assert guard.retried == 2
+    assert guard.breaker.state == OPEN
+
+
+def test_guard_does_not_retry_client_errors(fast_env):
+    guard = ProviderGuard('openrouter')
+    script = Script(401, 401, 401, 401)
+    for _ in range(4):
+        with pytest.raises(ProviderError):
+            asyncio.run(guard.call('key', script))
+    # A bad key says nothing about the provider's health
+    assert script.calls == 4
+    assert guard.retried == 0
+    assert guard.breaker.state == CLOSED
+
+
+def test_guard_client_errors_leave_the_breaker_as_it_was(fast_env):
+    fast_env.setenv('LLM_RETRIES', '0')
+    guard = ProviderGuard('openrouter')
+    script = Script(503, 503, 400, 503, 400)
+    for _ in range(3):
+        with pytest.raises(ProviderError):
+            asyncio.run(guard.call('key', script))
+    # The 400 did not clear the two failures before it
+    assert guard.breaker.failures == 2
+    with pytest.raises(ProviderError):
+        asyncio.run(guard.call('key', script))
+    assert guard.breaker.state == OPEN
+
+    # A 400 on the half-open trial neither closes the circuit nor resets the count
+    _expire(guard.breaker)
+    with pytest.raises(ProviderError):
+        asyncio.run(guard.call('key', script))
+    assert guard.breaker.state == HALF_OPEN
+    assert guard.breaker.failures == 3
+    # but it frees the trial for the next call
+    assert asyncio.run(guard.call('key', script)) == 'ok'
+    assert guard.breaker.state == CLOSED
+
+
+def test_guard_fails_fast_while_open(fast_env):
+    fast_env.setenv('LLM_RETRIES', '0')
+    guard = ProviderGuard('openrouter')
+    script = Script(*[503] * 10)
+    for _ in range(3):
+        with pytest.raises(ProviderError):
+            asyncio.run(guard.call('key', script))
+    assert guard.breaker.state == OPEN
+
+    with pytest.raises(ProviderUnavailable):
+        asyncio.run(guard.call('key', script))
+    assert script.calls == 3
+    assert guard.stats()['circuit']['state'] == OPEN
+
+    # After the cool-down one trial call goes through and closes the circuit
+    _expire(guard.breaker)
+    script.statuses.clear()
+    assert asyncio.run(guard.call('key', script)) == 'ok'
+    assert guard.breaker.state == CLOSED
+
+
+def test_guard_paces_by_rate_limit(fast_env):
+    fast_env.setenv('LLM_RATE_LIMIT', '20')
+    fast_env.setenv('LLM_RATE_BURST', '2')
+    guard = ProviderGuard('openrouter')
+
+    async def scenario():
+        started = time.perf_counter()
+        await asyncio.gather(*[guard.call('key', Script()) for _ in range(6)])
+        return time.perf_counter() - started
+
+    # Two from the burst, then four more at 20/s
+    assert asyncio.run(scenario()) >= 0.19
+
+
+def test_guard_limits_are_per_key(fast_env):
+    fast_env.setenv('LLM_RATE_LIMIT', '1')
+    fast_env.setenv('LLM_RATE_BURST', '1')
+    fast_env.setenv('LLM_RATE_MAX_WAIT', '0.5')
+    guard = ProviderGuard('openrouter')
+
+    async def scenario():
+        await guard.call('key-1', Script())
+        await guard.call('key-2', Script())
+        with pytest.raises(ProviderUnavailable):
+            await guard.call('key-1', Script())
+
+    asyncio.run(scenario())
+    assert guard.refused == 1
+
+
+def test_guard_caps_concurrency_per_key(fast_env):
+    fast_env.setenv('LLM_MAX_CONCURRENT_PER_KEY', '1')
+    fast_env.setenv('LLM_RATE_MAX_WAIT', '0.05')
+    guard = ProviderGuard('openrouter')
+
+    async def slow():
+        await asyncio.sleep(0.2)
+        return 'ok'
+
+    async def scenario():
+        return await asyncio.gather(guard.call('key', slow), guard.call('key', slow), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert results[0] == 'ok'
+    assert isinstance(results[1], ProviderUnavailable)
+    assert guard.refused == 1
+
+
+def test_guard_settings_per_provider(fast_env):
+    fast_env.setenv('LLM_RETRIES_OPENAI', '5')
+    assert ProviderGuard('openai').retries == 5
+    assert ProviderGuard('claude').retries == 2
+
+
+def test_guard_stream_retries_before_first_chunk(fast_env):
+    guard = ProviderGuard('openrouter')
+    attempts = []
+
+    async def make_stream():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ProviderError('scripted failure', 503)
+        for text in ['a', 'b', 'c']:
+            yield text
+
+    async def scenario():
+        return [text async for text in guard.stream('key', make_stream)]
+
+    assert asyncio.run(scenario()) == ['a', 'b', 'c']
+    assert len(attempts) == 3
+    assert guard.breaker.state == CLOSED
+
+
+def test_guard_stream_does_not_retry_after_first_chunk(fast_env):
+    guard = ProviderGuard('openrouter')
+    attempts = []
+
+    async def make_stream():
+        attempts.append(1)
+        yield 'partial'
+        raise ProviderError('scripted failure', 503)
+
+    async def scenario():
+        received = []
+        with pytest.raises(ProviderError):
+            async for text in guard.stream('key', make_stream):
+                received.append(text)
+        return received
+
+    assert asyncio.run(scenario()) == ['partial']
+    assert len(attempts) == 1
+    assert guard.breaker.failures == 1
+
+
+# LLMService against the stub provider
+
+def _service(stub) -> LLMService:
+    return LLMService(pool=ClientPool(stub.route(ProviderSettings())), cache=ResponseCache(None))
+
+
+def _enhance(service, count, provider='openrouter'):
+    async def scenario():
+        try:
+            return [await service.enhance_resume(RESUME + str(index), JD, provider, 'stub', 'stub',
+                                                 bypass_cache=True)
+                    for index in range(count)]
+        finally:
+            await service.pool.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_service_retries_transient_faults(stub, fast_env):
+    stub.app.state.faults = {'status': 503, 'count': 2}
+    service = _service(stub)
+    [result] = _enhance(service, 1)
+    assert result['success']
+    assert stub.app.state.requests == 3
+    assert service.provider_stats()['openrouter']['retried'] == 2
+
+
+def test_service_outage_opens_the_circuit(stub, fast_env):
+    stub.app.state.faults = {'status': 503, 'rate': 1.0}
+    service = _service(stub)
+    results = _enhance(service, 4)
+
+    # The first call spends its three attempts and opens the circuit
+    assert stub.app.state.requests == 3
+    assert all(not result['success'] and result['retryable'] for result in results)
+    assert all('circuit' in result['error'] for result in results[1:])
+    assert all(result['retry_after'] > 0 for result in results[1:])
+    assert service.provider_stats()['openrouter']['circuit']['state'] == OPEN
+
+
+def test_service_falls_back_during_outage(stub, fast_env):
+    stub.app.state.faults = {'status': 503, 'rate': 1.0, 'routes': ['chat']}
+    fast_env.setenv('LLM_FALLBACKS', 'openrouter=claude:stub-fallback')
+    fast_env.setenv('ANTHROPIC_API_KEY', 'stub')
+    service = _service(stub)
+    results = _enhance(service, 2)
+
+    assert all(result['success'] for result in results)
+    assert all(result['fallback'] == {'provider': 'claude', 'model': 'stub-fallback'} for result in results)
+    # The second request skips the open circuit straight to the fallback
+    assert stub.app.state.failures == 3
+    assert service.provider_stats()['openrouter']['circuit']['state'] == OPEN
+    assert service.provider_stats()['claude']['circuit']['state'] == CLOSED
+
+
+def test_service_does_not_fall_back_on_client_errors(stub, fast_env):
+    stub.app.state.faults = {'status': 401, 'count': 1}
+    fast_env.setenv('LLM_FALLBACKS', 'openrouter=claude:stub-fallback')
+    fast_env.setenv('ANTHROPIC_API_KEY', 'stub')
+    service = _service(stub)
+    [result] = _enhance(service, 1)
+
+    assert not result['success']
+    assert not result['retryable']
+    assert stub.app.state.requests == 1
@@ -0,0 +1,303 @@
+"""
+Response cache - backends, tiers and extraction cache keys
+The memory and SQLite backends run against a fake clock so TTL and
+recency are exact; the documents route runs on its own app with word
+extraction inline instead of on the extraction pool.
+"""
+import asyncio
+import types
+
+import docx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import documents
+from api.services import response_cache
+from api.services.extraction import extractor
+from api.services.response_cache import (
+    ACCESS_RESOLUTION, MemoryCacheBackend, ResponseCache, SQLiteCacheBackend, TieredCache
+)
+from api.services.uploads import remove_spooled
+
+
+class Clock:
+    """Stands in for time.time in response_cache"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache, 'time', types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    backends = []
+
+    def make(**kwargs):
+        backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite3'), **kwargs)
+        backends.append(backend)
+        return backend
+
+    yield make
+    for backend in backends:
+        backend._conn.close()
+
+
+def _keys(backend, keys):
+    return [key for key in keys if backend.get(key) is not None]
+
+
+# Memory backend
+
+def test_memory_evicts_least_recently_used(clock):
+    backend = MemoryCacheBackend(max_entries=3)
+    for key in 'abc':
+        backend.set(key, key * 2)
+    assert backend.get('a') == 'aa'
+    backend.set('d', 'dd')
+    # 'b' was the least recently used once 'a' was read
+    assert _keys(backend, 'abcd') == ['a', 'c', 'd']
+    assert len(backend) == 3
+
+
+def test_memory_set_replaces_without_growing(clock):
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set('a', 'x' * 10)
+    backend.set('a', 'y' * 4)
+    assert backend.get('a') == 'yyyy'
+    assert (len(backend), backend.size_bytes) == (1, 4)
+
+
+def test_memory_ttl(clock):
+    backend = MemoryCacheBackend(ttl=60)
+    backend.set('a', 'value')
+    clock.advance(60)
+    assert backend.get('a') == 'value'
+    clock.advance(1)
+    assert backend.get('a') is None
+    assert (len(backend), backend.size_bytes) == (0, 0)
+
+
+def test_memory_byte_cap(clock):
+    backend = MemoryCacheBackend(max_entries=100, max_bytes=10)
+    backend.set('a', 'aaaa')
+    backend.set('b', 'bbbb')
+    backend.get('a')
+    backend.set('c', 'cccc')
+    # Over 10 bytes: the least recently used entry goes first
+    assert _keys(backend, 'abc') == ['a', 'c']
+    assert backend.size_bytes == 8
+    # A value larger than the whole cap is never stored, and evicts nothing
+    backend.set('huge', 'x' * 11)
+    assert _keys(backend, ['a', 'c', 'huge']) == ['a', 'c']
+
+
+# SQLite backend
+
+def test_sqlite_evicts_least_recently_used(clock, sqlite_backend):
+    backend = sqlite_backend(max_entries=3)
+    for key in 'abc':
+        backend.set(key, key)
+        clock.advance(1)
+    clock.advance(ACCESS_RESOLUTION + 1)
+    assert backend.get('a') == 'a'
+    clock.advance(1)
+    backend.set('d', 'd')
+    assert _keys(backend, 'abcd') == ['a', 'c', 'd']
+    assert len(backend) == 3
+
+
+def test_sqlite_reads_within_access_resolution_do_not_reorder(clock, sqlite_backend):
+    backend = sqlite_backend(max_entries=2)
+    backend.set('a', 'a')
+    clock.advance(1)
+    backend.set('b', 'b')
+    clock.advance(1)
+    # Too soon after it was written to refresh its access time
+    backend.get('a')
+    backend.set('c', 'c')
+    assert _keys(backend, 'abc') == ['b', 'c']
+
+
+def test_sqlite_ttl(clock, sqlite_backend):
+    backend = sqlite_backend(ttl=60)
+    backend.set('a', 'a')
+    clock.advance(30)
+    backend.set('b', 'b')
+    clock.advance(31)
+    assert backend.get('a') is None
+    assert backend.get('b') == 'b'
+    # Writes also sweep expired rows
+    clock.advance(60)
+    backend.set('c', 'c')
+    assert len(backend) == 1
+
+
+def test_sqlite_byte_cap_keeps_most_recent_rows_that_fit(clock, sqlite_backend):
+    backend = sqlite_backend(max_bytes=10)
+    for key, size in [('a', 4), ('b', 3), ('c', 2)]:
+        backend.set(key, key * size)
+        clock.advance(ACCESS_RESOLUTION + 1)
+    backend.get('a')
+    clock.advance(1)
+    # Running sizes newest first: d 4, a 8, c 10, b 13 - only b is over
+    backend.set('d', 'dddd')
+    assert _keys(backend, 'abcd') == ['a', 'c', 'd']
+    assert backend.size_bytes == 10
+    backend.set('e', 'e' * 11)
+    assert len(backend) == 3
+
+
+def test_sqlite_byte_cap_breaks_ties_by_key(clock, sqlite_backend):
+    backend = sqlite_backend(max_bytes=6)
+    # Written in the same instant, so only the key orders them
+    for key in 'cba':
+        backend.set(key, key * 3)
+    assert _keys(backend, 'abc') == ['a', 'b']
+
+
+def test_sqlite_survives_reopen(clock, tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    backend = SQLiteCacheBackend(path, table='extractions')
+    backend.set('a', 'value')
+    backend._conn.close()
+
+    backend = SQLiteCacheBackend(path, table='extractions')
+    try:
+        assert backend.get('a') == 'value'
+        assert backend.size_bytes == 5
+    finally:
+        backend._conn.close()
+
+
+# Caches over backends
+
+def test_response_cache_counts_hits_and_misses():
+    cache = ResponseCache(MemoryCacheBackend())
+    key = ResponseCache.make_key(prompt='p', model='m')
+    assert key == ResponseCache.make_key(model='m', prompt='p')
+    assert cache.get(key) is None
+    cache.set(key, 'reply')
+    assert cache.get(key) == 'reply'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate'], stats['entries']) == (1, 1, 0.5, 1)
+    assert not cache.on_disk
+
+    disabled = ResponseCache(None)
+    disabled.set(key, 'reply')
+    assert disabled.get(key) is None and not disabled.enabled
+
+
+def test_tiered_cache_promotes_disk_hits(clock, sqlite_backend):
+    memory = MemoryCacheBackend(max_entries=1)
+    disk = sqlite_backend()
+    cache = TieredCache([memory, disk])
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+    # Memory only holds 'b' now; 'a' is still on disk
+    assert memory.get('a') is None
+
+    assert cache.get('a') == 'A'
+    assert memory.get('a') == 'A'
+    assert cache.get('a') == 'A'
+    assert cache.get('missing') is None
+
+    stats = cache.stats()
+    assert cache.tier_hits == [1, 1]
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert [tier['backend'] for tier in stats['tiers']] == ['MemoryCacheBackend', 'SQLiteCacheBackend']
+    assert cache.on_disk
+
+
+def test_tiered_cache_async_reads_disk_on_the_io_pool(clock, sqlite_backend):
+    cache = TieredCache([MemoryCacheBackend(), sqlite_backend()])
+
+    async def scenario():
+        await cache.aset('a', 'A')
+        return await cache.aget('a'), await cache.astats()
+
+    value, stats = asyncio.run(scenario())
+    assert value == 'A'
+    assert stats['entries'] == 1
+
+
+# Extraction cache keys
+
+@pytest.fixture
+def documents_client(monkeypatch):
+    """The documents routes on a bare app, a fresh memory cache and inline word extraction"""
+    extractions = []
+
+    async def extract_spooled(file_extension, path):
+        extractions.append(file_extension)
+        try:
+            return extractor.extract_from_word(path)
+        finally:
+            remove_spooled(path)
+
+    monkeypatch.setattr(documents, 'extract_spooled', extract_spooled)
+    monkeypatch.setattr(documents, 'extraction_cache', TieredCache([MemoryCacheBackend()]))
+    app = FastAPI()
+    app.include_router(documents.router, prefix='/api/documents')
+    with TestClient(app) as client:
+        yield client, extractions
+
+
+def _word_file(tmp_path) -> bytes:
+    document = docx.Document()
+    for line in ['Jordan Lee', 'jordan.lee@example.com', '', 'EXPERIENCE',
+                 'Backend Developer | Initech 2016 - 2019', '• Wrote reporting jobs in Python']:
+        document.add_paragraph(line)
+    path = tmp_path / 'resume.docx'
+    document.save(str(path))
+    return path.read_bytes()
+
+
+def _upload(client, content: bytes):
+    response = client.post('/api/documents/extract', files={'file': ('resume.docx', content)})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_same_upload_is_extracted_once(documents_client, tmp_path):
+    client, extractions = documents_client
+    content = _word_file(tmp_path)
+    first = _upload(client, content)
+    assert _upload(client, content) == first
+    assert extractions == ['docx']
+    assert first['contact']['email'] == 'jordan.lee@example.com'
+
+
+def test_extractor_version_bump_invalidates_cached_results(documents_client, tmp_path, monkeypatch):
+    client, extractions = documents_client
+    content = _word_file(tmp_path)
+    _upload(client, content)
+    monkeypatch.setattr(documents, 'EXTRACTOR_VERSION', documents.EXTRACTOR_VERSION + '-next')
+    _upload(client, content)
+    _upload(client, content)
+    assert extractions == ['docx', 'docx']
+
+
+def test_pdf_cache_key_follows_engine_and_page_limit(monkeypatch):
+    key = documents._cache_key('pdf', 'digest')
+    assert key.startswith(documents.EXTRACTOR_VERSION + ':')
+    word_key = documents._cache_key('docx', 'digest')
+
+    monkeypatch.setattr(documents.pdf_extractor, 'max_pages', (documents.pdf_extractor.max_pages or 0) + 1)
+    fewer_pages_key = documents._cache_key('pdf', 'digest')
+    monkeypatch.setattr(documents.extractor, 'pdf_engine', 'pdfplumber')
+    assert len({key, fewer_pages_key, documents._cache_key('pdf', 'digest')}) == 3
+    # Word results depend on neither
+    assert documents._cache_key('docx', 'digest') == word_key
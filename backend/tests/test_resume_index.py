@@ -0,0 +1,205 @@
+"""
+Resume index - pruned top-k against exhaustive BM25F
+A seeded corpus (benchmarks.resume_index.Corpus) is indexed and every search
+is checked against BM25F computed directly from the resumes' sections, with
+pruning forced on and off; plus block encoding, replace and delete.
+"""
+import math
+import random
+
+import pytest
+
+from api.services.ats_scorer import JobDescriptionProfile
+from api.services.resume_index import (
+    B, BLOCK_SIZE, K1, SECTION_WEIGHTS, ResumeIndex, _Query, decode_block, encode_block, section_terms
+)
+from api.services.extraction_pipeline import SECTION_NAMES
+from benchmarks.resume_index import Corpus
+
+RESUMES = 600
+K = 10
+
+
+def exhaustive(counts, job_description, k, sections=None):
+    """
+    BM25F of every resume from its section_terms; (resume_id, score) best
+    first, ties in insertion order
+    """
+    searched = {SECTION_NAMES.index(name) for name in sections} if sections else set(range(len(SECTION_NAMES)))
+    totals = [0] * len(SECTION_NAMES)
+    for terms in counts.values():
+        for section, section_counts in terms.items():
+            totals[section] += sum(section_counts.values())
+
+    doc_count = len(counts)
+    df = {
+        term: sum(any(term in section_counts for section_counts in terms.values()) for terms in counts.values())
+        for term in JobDescriptionProfile(job_description).top_keywords
+    }
+    query = [term for term, count in df.items() if count]
+    idf = {term: math.log(1 + (doc_count - df[term] + 0.5) / (df[term] + 0.5)) for term in query}
+
+    scored = []
+    for order, (resume_id, terms) in enumerate(counts.items()):
+        # (section weight / length normalisation, term counts) per searched section
+        fields = [
+            (SECTION_WEIGHTS.get(SECTION_NAMES[section], 1.0)
+             / (1 - B + B * sum(section_counts.values()) / (totals[section] / doc_count)), section_counts)
+            for section, section_counts in terms.items() if section in searched
+        ]
+        score = 0.0
+        for term in query:
+            weight = sum(scale * section_counts[term] for scale, section_counts in fields if term in section_counts)
+            score += idf[term] * weight / (K1 + weight)
+        if score > 0:
+            scored.append((-score, order, resume_id))
+    return [(resume_id, -score) for score, _, resume_id in sorted(scored)[:k]]
+
+
+def assert_matches(found, expected):
+    """Same scores in the same order; ids must agree except within ties"""
+    assert [result['score'] for result in found['results']] == pytest.approx(
+        [round(score, 4) for _, score in expected], abs=1e-4)
+    reference = dict(expected)
+    for result in found['results']:
+        if result['resume_id'] in reference:
+            assert result['score'] == pytest.approx(reference[result['resume_id']], abs=1e-4)
+        else:
+            # Only a resume tied with the last place may differ
+            assert result['score'] == pytest.approx(expected[-1][1], abs=1e-4)
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    """Resumes' sections, their section_terms and job descriptions"""
+    generator = Corpus(vocabulary=2000, seed=7)
+    resumes = {f'resume-{number}': generator.sections() for number in range(RESUMES)}
+    counts = {resume_id: section_terms(sections) for resume_id, sections in resumes.items()}
+    return resumes, counts, [generator.job_description() for _ in range(12)]
+
+
+def _first(corpus, count):
+    resumes, counts, _ = corpus
+    ids = list(resumes)[:count]
+    return {resume_id: resumes[resume_id] for resume_id in ids}, {resume_id: counts[resume_id] for resume_id in ids}
+
+
+@pytest.fixture(scope='module')
+def index(corpus):
+    resumes, _, _ = corpus
+    index = ResumeIndex(':memory:')
+    index.add_many((resume_id, sections, None) for resume_id, sections in resumes.items())
+    yield index
+    index.close()
+
+
+@pytest.mark.parametrize('forward_limit', [0, _Query.FORWARD_LIMIT, RESUMES])
+def test_search_matches_exhaustive_bm25f(corpus, index, monkeypatch, forward_limit):
+    # 0 keeps pruning term at a time to the end; RESUMES rescores every remaining candidate at once
+    monkeypatch.setattr(_Query, 'FORWARD_LIMIT', forward_limit)
+    _, counts, job_descriptions = corpus
+    for job_description in job_descriptions:
+        assert_matches(index.search(job_description, k=K), exhaustive(counts, job_description, K))
+
+
+def test_search_prunes(corpus, index, monkeypatch):
+    pruned = []
+    term_weights = _Query.term_weights
+
+    def spy(self, term_id, candidates=None):
+        pruned.append(candidates is not None)
+        return term_weights(self, term_id, candidates)
+
+    monkeypatch.setattr(_Query, 'FORWARD_LIMIT', 0)
+    monkeypatch.setattr(_Query, 'term_weights', spy)
+    _, _, job_descriptions = corpus
+    for job_description in job_descriptions:
+        index.search(job_description, k=K)
+    # Common terms are only read for resumes that can still make the top k
+    assert any(pruned) and not all(pruned)
+
+
+@pytest.mark.parametrize('k', [1, 3, 50, RESUMES * 2])
+def test_search_any_k(corpus, index, k):
+    _, counts, job_descriptions = corpus
+    found = index.search(job_descriptions[0], k=k)
+    assert_matches(found, exhaustive(counts, job_descriptions[0], k))
+    assert found['total_resumes'] == RESUMES
+
+
+def test_search_by_section(corpus, index):
+    _, counts, job_descriptions = corpus
+    for job_description in job_descriptions[:4]:
+        found = index.search(job_description, k=K, sections=['skills'])
+        assert_matches(found, exhaustive(counts, job_description, K, sections=['skills']))
+    with pytest.raises(ValueError):
+        index.search(job_descriptions[0], sections=['hobbies'])
+
+
+def test_reindex_replaces_the_old_version(corpus):
+    resumes, counts = _first(corpus, 100)
+    index = ResumeIndex(':memory:')
+    index.add_many((resume_id, sections, None) for resume_id, sections in resumes.items())
+
+    # resume-0 now holds resume-1's text, under its own id
+    index.add('resume-0', resumes['resume-1'], {'version': 2})
+    counts['resume-0'] = counts['resume-1']
+    assert index.stats()['resumes'] == 100
+    assert index.stats()['postings'] == sum(len(terms) for sections in counts.values() for terms in sections.values())
+    for job_description in corpus[2][:4]:
+        found = index.search(job_description, k=K)
+        assert_matches(found, exhaustive(counts, job_description, K))
+    # Both copies match the same terms
+    found = index.search(' '.join(counts['resume-1'][3]), k=2)
+    assert {result['resume_id'] for result in found['results']} == {'resume-0', 'resume-1'}
+    assert {result['resume_id']: result['metadata'] for result in found['results']}['resume-0'] == {'version': 2}
+
+
+def test_delete_removes_postings(corpus):
+    resumes, counts = _first(corpus, 300)
+    index = ResumeIndex(':memory:')
+    index.add_many((resume_id, sections, None) for resume_id, sections in resumes.items())
+    postings = index.stats()['postings']
+
+    removed = random.Random(3).sample(sorted(resumes), 120)
+    for resume_id in removed:
+        assert index.delete(resume_id)
+        del counts[resume_id]
+    assert not index.delete(removed[0])
+
+    stats = index.stats()
+    assert stats['resumes'] == 180
+    assert stats['postings'] < postings
+    assert stats['postings'] == sum(len(terms) for sections in counts.values() for terms in sections.values())
+    for job_description in corpus[2]:
+        found = index.search(job_description, k=K)
+        assert not {result['resume_id'] for result in found['results']} & set(removed)
+        assert_matches(found, exhaustive(counts, job_description, K))
+
+
+def test_index_survives_reopen(corpus, tmp_path):
+    resumes, counts = _first(corpus, 150)
+    path = str(tmp_path / 'index.sqlite3')
+    index = ResumeIndex(path)
+    index.add_many((resume_id, sections, {'n': 1}) for resume_id, sections in resumes.items())
+    index.delete('resume-5')
+    del counts['resume-5']
+    index.close()
+
+    index = ResumeIndex(path)
+    try:
+        found = index.search(corpus[2][0], k=K)
+        assert_matches(found, exhaustive(counts, corpus[2][0], K))
+        assert found['results'][0]['metadata'] == {'n': 1}
+    finally:
+        index.close()
+
+
+@pytest.mark.parametrize('gap', [1, 255, 256, 70000, 2 ** 31])
+def test_block_round_trip(gap):
+    docs = [5 + gap * position for position in range(BLOCK_SIZE)]
+    tfs = [position % 300 + 1 for position in range(BLOCK_SIZE)]
+    decoded_docs, decoded_tfs = decode_block(docs[0], len(docs), encode_block(docs, tfs))
+    assert decoded_docs == docs
+    # Term frequencies saturate at 255
+    assert list(decoded_tfs) == [min(tf, 255) for tf in tfs]
@@ -0,0 +1,196 @@
+"""
+Section enhancer - layout, splicing and unusable replies
+Rewrites are spliced into a hand-written resume; every line outside the
+rewritten parts (contact details, headings, job titles, dates, education,
+certifications) must come back byte for byte.
+"""
+import asyncio
+import json
+
+import pytest
+
+from api.services.ats_scorer import ATSScorer
+from api.services.document_extractor import DocumentExtractor
+from api.services.extraction_pipeline import SectionParser
+from api.services.section_enhancer import SectionEnhancer, layout_parts
+
+RESUME = """Jordan Lee
+jordan.lee@example.com | 555-964-7311 | linkedin.com/in/jordanlee
+
+PROFESSIONAL SUMMARY
+Backend engineer with eight years of experience
+building payment systems.
+
+EXPERIENCE
+Senior Software Engineer | Globex 2019 - 2024
+  • Built the settlement service in Go, cutting batch time by 40%
+  • Ran the on-call rotation for payments
+Backend Developer
+Initech, Austin | Jun 2016 - Dec 2018
+- Led the migration of the ledger from MySQL to PostgreSQL
+  with no downtime, across 2 million accounts.
+- Wrote reporting jobs in Python
+
+PROJECTS
+1. Open-source rate limiter used by 300 projects
+
+SKILLS
+Go, Python, PostgreSQL, MySQL
+
+EDUCATION
+BS Computer Science
+State University 2016
+
+CERTIFICATIONS
+AWS Certified Developer"""
+
+# Asks for what the resume lacks, so every editable part is sent
+JOB_DESCRIPTION = """Senior backend engineer. Kubernetes, Terraform, Kafka and gRPC required.
+Experience with Kubernetes operators, Terraform modules and Kafka streams.
+You will mentor engineers and own observability with Prometheus and Grafana."""
+
+LINES = RESUME.split('\n')
+PART_IDS = ['summary', 'experience-1', 'experience-2', 'experience-3', 'experience-4', 'projects-1', 'skills']
+PROTECTED = [
+    'Jordan Lee',
+    'jordan.lee@example.com | 555-964-7311 | linkedin.com/in/jordanlee',
+    'PROFESSIONAL SUMMARY',
+    'EXPERIENCE',
+    'Senior Software Engineer | Globex 2019 - 2024',
+    'Backend Developer',
+    'Initech, Austin | Jun 2016 - Dec 2018',
+    'PROJECTS',
+    'SKILLS',
+    'EDUCATION',
+    'BS Computer Science',
+    'State University 2016',
+    'CERTIFICATIONS',
+    'AWS Certified Developer',
+]
+
+
+class LLM:
+    """Answers every completion with a fixed reply"""
+
+    clients = {'openai': None}
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.prompts = []
+
+    async def complete(self, build, provider, model, api_key, bypass_cache=False):
+        self.prompts.append(build(provider)['prompt'])
+        return {'success': True, 'text': self.reply, 'cached': False}
+
+
+class Pool:
+    async def run(self, func, *args):
+        return func(*args)
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return DocumentExtractor()
+
+
+def _enhancer(extractor, reply: str) -> SectionEnhancer:
+    return SectionEnhancer(LLM(reply), extractor, ATSScorer(), Pool())
+
+
+def _enhance(enhancer: SectionEnhancer) -> dict:
+    return asyncio.run(enhancer.enhance_resume(RESUME, JOB_DESCRIPTION, 'openai', 'stub-model', 'key-1'))
+
+
+def _outside_parts(lines, parts):
+    covered = {index for part in parts for index in range(part['start'], part['end'])}
+    return [line for index, line in enumerate(lines) if index not in covered]
+
+
+def test_parse_lines_roles(extractor):
+    parsed = list(SectionParser(extractor).parse_lines(LINES))
+    assert [entry.line for entry in parsed] == LINES
+    roles = {entry.line.strip(): (entry.section, entry.role) for entry in parsed}
+    assert roles['EXPERIENCE'] == ('experience', 'heading')
+    assert roles['Senior Software Engineer | Globex 2019 - 2024'] == ('experience', 'title')
+    assert roles['• Ran the on-call rotation for payments'] == ('experience', 'bullet')
+    assert roles['with no downtime, across 2 million accounts.'] == ('experience', 'text')
+    assert roles['1. Open-source rate limiter used by 300 projects'] == ('projects', 'bullet')
+    assert roles['State University 2016'] == ('education', 'text')
+    assert parsed[9].job == 'Senior Software Engineer | Globex 2019 - 2024'
+    assert parsed[20].job is None
+
+
+def test_layout_parts(extractor):
+    parts = layout_parts(extractor, LINES)
+    assert [part['id'] for part in parts] == PART_IDS
+    by_id = {part['id']: part for part in parts}
+    assert by_id['summary']['text'] == 'Backend engineer with eight years of experience\nbuilding payment systems.'
+    # The wrapped bullet is one part over both lines, without its marker
+    assert (by_id['experience-3']['start'], by_id['experience-3']['end']) == (13, 15)
+    assert by_id['experience-3']['text'] == (
+        'Led the migration of the ledger from MySQL to PostgreSQL with no downtime, across 2 million accounts.')
+    assert by_id['experience-3']['job'] == 'Initech, Austin | Jun 2016 - Dec 2018'
+    assert by_id['projects-1']['job'] is None
+    assert _outside_parts(LINES, parts) == [line for line in LINES if not line.strip() or line in PROTECTED]
+
+
+def test_splice_keeps_every_other_line(extractor):
+    parts = layout_parts(extractor, LINES)
+    rewrites = {part_id: f'Rewritten part {number} with Kubernetes' for number, part_id in enumerate(PART_IDS)}
+    spliced = _enhancer(extractor, '').splice(LINES, parts, rewrites)
+    output = spliced['text'].split('\n')
+
+    assert spliced['unchanged'] == []
+    assert [line for line in output if 'Rewritten' not in line] == _outside_parts(LINES, parts)
+    for line in PROTECTED:
+        assert line in output
+    # Bullets keep their marker and indent; the wrapped one becomes a single line
+    assert '  • Rewritten part 1 with Kubernetes' in output
+    assert '- Rewritten part 3 with Kubernetes' in output
+    assert '1. Rewritten part 5 with Kubernetes' in output
+    assert len(output) == len(LINES) - 2
+
+
+def test_splice_leaves_missing_and_unusable_rewrites(extractor):
+    parts = layout_parts(extractor, LINES)
+    rewrites = {
+        'summary': 'EXPERIENCE',  # only a heading: nothing left to splice in
+        'experience-1': '   ',
+        'experience-2': ['not', 'text'],
+        'skills': 'Go, Kubernetes\nSKILLS\nTerraform',
+    }
+    spliced = _enhancer(extractor, '').splice(LINES, parts, rewrites)
+    output = spliced['text'].split('\n')
+
+    assert spliced['unchanged'] == ['summary', 'experience-1', 'experience-2', 'experience-3', 'experience-4',
+                                    'projects-1']
+    # A heading in a body rewrite is dropped rather than starting a new section
+    assert output[output.index('SKILLS') + 1:output.index('SKILLS') + 3] == ['Go, Kubernetes', 'Terraform']
+    assert output.count('SKILLS') == 1
+    assert '\n'.join(output).replace('Go, Kubernetes\nTerraform', 'Go, Python, PostgreSQL, MySQL') == RESUME
+
+
+def test_enhance_resume_splices_the_reply(extractor):
+    reply = json.dumps({
+        part_id: f'Rewritten part {number} with Kubernetes' for number, part_id in enumerate(PART_IDS)
+    })
+    enhancer = _enhancer(extractor, f'Here you go:\n```json\n{reply}\n```')
+    result = _enhance(enhancer)
+
+    assert result['success']
+    assert result['sections'] == ['experience', 'projects', 'skills', 'summary']
+    assert result['unchanged'] == []
+    output = result['enhanced_resume'].split('\n')
+    for line in PROTECTED:
+        assert line in output
+    prompt = enhancer.llm_service.prompts[0]
+    assert 'kubernetes' in prompt.lower()
+    assert '[experience-3] (Initech, Austin | Jun 2016 - Dec 2018)' in prompt
+
+
+@pytest.mark.parametrize('reply', ['', 'Sorry, I cannot help with that.', '{"summary": ', '{"unknown-id": "text"}',
+                                   '["summary"]'])
+def test_unusable_reply_fails(extractor, reply):
+    result = _enhance(_enhancer(extractor, reply))
+    assert result == {'success': False, 'error': 'The provider reply had no usable rewrites', 'retryable': False}
+
@@ -0,0 +1,23 @@
+"""
+Warm-up - parser preloading stays best effort
+"""
+import pytest
+
+from api.services import warmup
+
+
+def test_preload_times_each_module():
+    timings = warmup.preload(['json', 'csv'])
+    assert set(timings) == {'json', 'csv'}
+
+
+def test_preload_raises_for_a_missing_module():
+    with pytest.raises(ImportError):
+        warmup.preload(['json', 'no_such_parser'])
+
+
+def test_preload_parsers_skips_a_missing_parser(monkeypatch):
+    monkeypatch.setattr(warmup, 'PARSER_MODULES', ('json', 'no_such_parser', 'csv'))
+    # Must not raise: it runs as the extraction pool's worker initializer
+    warmup.preload_parsers()
+    assert warmup.preload(warmup.PARSER_MODULES, skip_missing=True).keys() == {'json', 'csv'}
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Resume } from '@/types';
 import { api } from '@/lib/api';
 import FileUpload from '../QuickEnhance/FileUpload';
@@ -26,6 +26,12 @@ interface Block {
   type: 'summary' | 'skill' | 'bullet' | 'text';
 }
 
+// A backend scoring session and the block texts it was last sent
+interface ScoringSession {
+  id: string;
+  texts: Record<string, string>;
+}
+
 export default function InteractiveStudio({
   sharedData,
   provider,
@@ -48,6 +54,11 @@ export default function InteractiveStudio({
   const [currentScore, setCurrentScore] = useState<number>(0);
   const [isCalculatingScore, setIsCalculatingScore] = useState(false);
 
+  // Scoring sessions for the original and current resume, opened once per resume and JD;
+  // edits only send the blocks that changed. Syncs run one after another.
+  const scoringSessions = useRef<{ key: string; original: ScoringSession; current: ScoringSession } | null>(null);
+  const scoringQueue = useRef<Promise<void>>(Promise.resolve());
+
   // Sync with shared data when switching modes
   useEffect(() => {
     if (sharedData?.resume) {
@@ -69,55 +80,96 @@ export default function InteractiveStudio({
     }
   }, [blocks, jobDescription]);
 
-  // Calculate initial score when resume is uploaded
-  useEffect(() => {
-    if (originalResume && jobDescription.trim() && blocks.length > 0) {
-      calculateCurrentScore();
+  // Close the scoring sessions when leaving the studio
+  useEffect(() => () => closeScoringSessions(), []);
+
+  const closeScoringSessions = () => {
+    const sessions = scoringSessions.current;
+    scoringSessions.current = null;
+    if (sessions) {
+      api.closeScoringSession(sessions.original.id).catch(() => {});
+      api.closeScoringSession(sessions.current.id).catch(() => {});
     }
-  }, [originalResume, blocks.length]);
+  };
 
-  const calculateCurrentScore = async () => {
-    if (!jobDescription || blocks.length === 0) return;
+  const openScoringSession = async (jd: string, texts: Record<string, string>) => {
+    const result = await api.createScoringSession(
+      jd,
+      Object.entries(texts).map(([id, text]) => ({ id, text }))
+    );
+    return { session: { id: result.session_id, texts: { ...texts } }, score: result.score };
+  };
 
-    setIsCalculatingScore(true);
-    try {
-      // Build ORIGINAL resume (all original text)
-      const originalResumeText = blocks.map(b => b.text).join('\n');
-
-      // Build CURRENT/ENHANCED resume (accepted/enhanced text)
-      const currentResumeText = blocks.map(b => {
-        // For accepted blocks with enhancements
-        if (b.status === 'accepted' && b.enhancedText) {
-          return b.enhancedText;
-        }
-        // For enhanced blocks (not yet accepted/rejected)
-        else if (b.enhancedText) {
-          return b.enhancedText;
-        }
-        // Original text (including header)
-        else {
-          return b.text;
-        }
-      }).join('\n');
+  // Send a session the blocks whose text changed; null when nothing did.
+  // Rewriting several blocks at once (Enhance All) opens a fresh session instead.
+  const syncScoringSession = async (session: ScoringSession, jd: string, texts: Record<string, string>) => {
+    const changed = Object.keys(texts).filter(id => session.texts[id] !== texts[id]);
+    if (changed.length === 0) return { session, score: null };
+    if (changed.length > 1) {
+      api.closeScoringSession(session.id).catch(() => {});
+      return openScoringSession(jd, texts);
+    }
 
-      console.log('Calculating BOTH scores...');
+    const result = await api.updateScoringBlock(session.id, changed[0], texts[changed[0]]);
+    session.texts[changed[0]] = texts[changed[0]];
+    return { session, score: result.score };
+  };
 
-      // Calculate both scores in parallel
-      const [originalScoreResult, currentScoreResult] = await Promise.all([
-        api.calculateScore(originalResumeText, jobDescription),
-        api.calculateScore(currentResumeText, jobDescription)
+  const scoreBlocks = async (currentBlocks: Block[], jd: string) => {
+    // ORIGINAL resume (all original text) and CURRENT resume (enhanced text where there is some)
+    const originalTexts: Record<string, string> = {};
+    const currentTexts: Record<string, string> = {};
+    currentBlocks.forEach(b => {
+      originalTexts[b.id] = b.text;
+      currentTexts[b.id] = b.enhancedText || b.text;
+    });
+
+    // A new resume (different block ids) or JD needs new sessions
+    const key = `${jd}\u0000${currentBlocks.map(b => b.id).join(',')}`;
+    const sessions = scoringSessions.current;
+
+    if (!sessions || sessions.key !== key) {
+      closeScoringSessions();
+      const [original, current] = await Promise.all([
+        openScoringSession(jd, originalTexts),
+        openScoringSession(jd, currentTexts)
       ]);
+      scoringSessions.current = { key, original: original.session, current: current.session };
+      setOriginalScore(original.score);
+      setCurrentScore(current.score);
+      return;
+    }
 
-      console.log('Original Score:', originalScoreResult);
-      console.log('Current/Enhanced Score:', currentScoreResult);
+    const [original, current] = await Promise.all([
+      syncScoringSession(sessions.original, jd, originalTexts),
+      syncScoringSession(sessions.current, jd, currentTexts)
+    ]);
+    scoringSessions.current = { key, original: original.session, current: current.session };
+    if (original.score !== null) setOriginalScore(original.score);
+    if (current.score !== null) setCurrentScore(current.score);
+  };
 
-      setOriginalScore(originalScoreResult.score);
-      setCurrentScore(currentScoreResult.score);
-    } catch (error) {
-      console.error('Error calculating score:', error);
-    } finally {
-      setIsCalculatingScore(false);
-    }
+  const calculateCurrentScore = () => {
+    if (!jobDescription || blocks.length === 0) return;
+
+    const currentBlocks = blocks;
+    const jd = jobDescription;
+    scoringQueue.current = scoringQueue.current.then(async () => {
+      setIsCalculatingScore(true);
+      try {
+        await scoreBlocks(currentBlocks, jd);
+      } catch (error: any) {
+        // The server drops idle sessions; open new ones next time
+        if (error?.response?.status === 404) {
+          scoringSessions.current = null;
+          await scoreBlocks(currentBlocks, jd).catch(err => console.error('Error calculating score:', err));
+        } else {
+          console.error('Error calculating score:', error);
+        }
+      } finally {
+        setIsCalculatingScore(false);
+      }
+    });
   };
 
   const handleFileUpload = async (file: File) => {
@@ -383,18 +435,80 @@ export default function InteractiveStudio({
       return acc;
     }, {} as Record<string, number>));
 
-    // Trigger score calculation immediately after blocks are set
-    if (jobDescription.trim() && newBlocks.length > 0) {
-      console.log('Triggering ATS score calculation...');
-      setTimeout(() => {
-        calculateCurrentScore();
-      }, 100); // Reduced to 100ms
-    } else {
-      console.log('Skipping score calculation:', { hasJD: !!jobDescription.trim(), blockCount: newBlocks.length });
+    // The blocks effect scores the new resume
+  };
+
+  // Prompt-stuffed rewrite of non-bullet blocks (summary, skills, projects...) in one call
+  const enhanceTextBlocks = async (targets: Block[], instructions: string, format: string) => {
+    if (targets.length === 0) return {};
+
+    const blocksText = targets.map((block, idx) =>
+      `[BLOCK ${idx + 1}]\n${block.text}`
+    ).join('\n\n');
+
+    const fullPrompt = `Job Description:
+${jobDescription}
+
+---
+
+${instructions}
+
+${blocksText}
+
+---
+
+${format}`;
+
+    const result = await api.enhanceResume(fullPrompt, '', provider, model, apiKey);
+    const enhanced: Record<string, string> = {};
+    if (result.success) {
+      const enhancedBlocks = parseEnhancedBlocks(result.enhanced_resume, targets.length);
+      targets.forEach((block, idx) => {
+        if (enhancedBlocks[idx]) enhanced[block.id] = enhancedBlocks[idx];
+      });
     }
+    return enhanced;
   };
 
-  // SINGLE API CALL - Enhance all blocks at once!
+  // Experience bullets in one /enhance/variants call for the whole section, keyed by block id
+  const enhanceBullets = async (bullets: Block[]) => {
+    const targets = bullets.filter(b => b.text.trim());
+    if (targets.length === 0) return {};
+
+    const jobs: { title: string; bullets: { id: string; text: string }[] }[] = [];
+    const jobByIndex: Record<number, number> = {};
+    targets.forEach(block => {
+      const jobIndex = block.jobIndex ?? -1;
+      if (jobByIndex[jobIndex] === undefined) {
+        jobByIndex[jobIndex] = jobs.length;
+        jobs.push({ title: block.jobTitle || '', bullets: [] });
+      }
+      jobs[jobByIndex[jobIndex]].bullets.push({ id: block.id, text: block.text });
+    });
+
+    const result = await api.enhanceBulletVariants({ jobs }, jobDescription, provider, model, apiKey, 1);
+    const enhanced: Record<string, string> = {};
+    targets.forEach(block => {
+      const variants = result.variants?.[block.id];
+      if (variants && variants.length > 0) enhanced[block.id] = variants[0];
+    });
+    return enhanced;
+  };
+
+  // Bullets and the other blocks go out in parallel; blocks that got no rewrite are left as they were
+  const enhanceBlocks = async (targets: Block[], instructions: string, format: string) => {
+    const [bullets, texts] = await Promise.all([
+      enhanceBullets(targets.filter(b => b.type === 'bullet')),
+      enhanceTextBlocks(targets.filter(b => b.type !== 'bullet'), instructions, format)
+    ]);
+    const enhanced: Record<string, string> = { ...texts, ...bullets };
+
+    setBlocks(blocks.map(block =>
+      enhanced[block.id] ? { ...block, enhancedText: enhanced[block.id], status: 'enhanced' as const } : block
+    ));
+  };
+
+  // Enhance all blocks at once: one call for the bullets, one for everything else
   const handleEnhanceAll = async () => {
     if (!jobDescription || !apiKey) {
       alert('Please provide job description and API key');
@@ -409,17 +523,11 @@ export default function InteractiveStudio({
         b.sectionKey !== 'education' &&
         b.sectionKey !== 'certifications'
       );
+      const textBlockCount = enhanceableBlocks.filter(b => b.type !== 'bullet').length;
 
-      const blocksText = enhanceableBlocks.map((block, idx) =>
-        `[BLOCK ${idx + 1}]\n${block.text}`
-      ).join('\n\n');
-
-      const fullPrompt = `Job Description:
-${jobDescription}
-
----
-
-Below are ${enhanceableBlocks.length} resume blocks. Enhance each one to be more impactful and ATS-friendly based on the job description above.
+      await enhanceBlocks(
+        enhanceableBlocks,
+        `Below are ${textBlockCount} resume blocks. Enhance each one to be more impactful and ATS-friendly based on the job description above.
 
 Rules:
 - Keep similar length (±10 words)
@@ -428,13 +536,8 @@ Rules:
 - Match job keywords naturally
 - Stay professional
 
-Resume blocks to enhance:
-
-${blocksText}
-
----
-
-Respond with enhanced blocks in this exact format:
+Resume blocks to enhance:`,
+        `Respond with enhanced blocks in this exact format:
 
 [BLOCK 1]
 <enhanced text>
@@ -442,37 +545,8 @@ Respond with enhanced blocks in this exact format:
 [BLOCK 2]
 <enhanced text>
 
-Continue for all ${enhanceableBlocks.length} blocks.`;
-
-      const result = await api.enhanceResume(
-        fullPrompt,
-        '',
-        provider,
-        model,
-        apiKey
+Continue for all ${textBlockCount} blocks.`
       );
-
-      if (result.success) {
-        const enhancedBlocks = parseEnhancedBlocks(result.enhanced_resume, enhanceableBlocks.length);
-
-        let enhancedIdx = 0;
-        const updatedBlocks = blocks.map(block => {
-          if (block.sectionKey === 'header' || block.sectionKey === 'education' || block.sectionKey === 'certifications') {
-            return block;
-          }
-
-          const enhanced = enhancedBlocks[enhancedIdx];
-          enhancedIdx++;
-
-          return {
-            ...block,
-            enhancedText: enhanced || block.text,
-            status: 'enhanced' as const
-          };
-        });
-
-        setBlocks(updatedBlocks);
-      }
     } catch (error) {
       console.error('Error enhancing blocks:', error);
       alert('Error enhancing resume. Please try again.');
@@ -502,51 +576,18 @@ Continue for all ${enhanceableBlocks.length} blocks.`;
         setIsLoading(false);
         return;
       }
+      const textBlockCount = blocksToEnhance.filter(b => b.type !== 'bullet').length;
 
-      const blocksText = blocksToEnhance.map((block, idx) =>
-        `[BLOCK ${idx + 1}]\n${block.text}`
-      ).join('\n\n');
-
-      const fullPrompt = `Job Description:
-${jobDescription}
-
----
-
-Enhance these ${blocksToEnhance.length} resume blocks to match the job description. Keep similar length, use action verbs, add metrics.
-
-${blocksText}
-
----
-
-Format:
+      await enhanceBlocks(
+        blocksToEnhance,
+        `Enhance these ${textBlockCount} resume blocks to match the job description. Keep similar length, use action verbs, add metrics.`,
+        `Format:
 [BLOCK 1]
 <enhanced>
 
 [BLOCK 2]
-<enhanced>`;
-
-      const result = await api.enhanceResume(fullPrompt, '', provider, model, apiKey);
-
-      if (result.success) {
-        const enhancedBlocks = parseEnhancedBlocks(result.enhanced_resume, blocksToEnhance.length);
-
-        let enhancedIdx = 0;
-        const updatedBlocks = blocks.map(block => {
-          const shouldUpdate = blocksToEnhance.find(b => b.id === block.id);
-          if (shouldUpdate) {
-            const enhanced = enhancedBlocks[enhancedIdx];
-            enhancedIdx++;
-            return {
-              ...block,
-              enhancedText: enhanced || block.text,
-              status: 'enhanced' as const
-            };
-          }
-          return block;
-        });
-
-        setBlocks(updatedBlocks);
-      }
+<enhanced>`
+      );
     } catch (error) {
       console.error('Error re-enhancing blocks:', error);
       alert('Error re-enhancing. Please try again.');
@@ -111,19 +111,27 @@ export default function QuickEnhance({
     setIsLoading(true);
     setError('');
 
+    // Tokens replace the shown resume as they arrive; a failed stream puts it back
+    const previousResume = enhancedResume;
+
     try {
-      const result = await api.enhanceResume(
+      let streamed = '';
+      const result = await api.enhanceResumeStream(
         originalResume.text,
         jobDescription,
         provider,
         model,
-        apiKey
+        apiKey,
+        (text) => {
+          streamed += text;
+          setEnhancedResume(streamed);
+        }
       );
 
       if (result.success) {
         setEnhancedResume(result.enhanced_resume);
 
-        const score = await api.calculateScore(result.enhanced_resume, jobDescription);
+        const score = result.ats_score;
         setEnhancedScore(score);
 
         const newVersion = currentVersion + 1;
@@ -140,9 +148,11 @@ export default function QuickEnhance({
           jobDescription: jobDescription
         });
       } else {
+        setEnhancedResume(previousResume);
         setError(result.error || 'Enhancement failed');
       }
     } catch (err: any) {
+      setEnhancedResume(previousResume);
       setError(err.response?.data?.detail || err.message || 'Error enhancing resume');
     } finally {
       setIsLoading(false);
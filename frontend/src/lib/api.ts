@@ -32,6 +32,33 @@ export const api = {
     return response.data;
   },
 
+  // Open an incremental scoring session over resume blocks
+  createScoringSession: async (
+    jobDescription: string,
+    blocks: { id: string; text: string }[]
+  ) => {
+    const response = await apiClient.post('/scoring/sessions', {
+      job_description: jobDescription,
+      blocks,
+    });
+    return response.data;
+  },
+
+  // Rescore after a single block edit
+  updateScoringBlock: async (sessionId: string, blockId: string, text: string) => {
+    const response = await apiClient.put(
+      `/scoring/sessions/${encodeURIComponent(sessionId)}/blocks/${encodeURIComponent(blockId)}`,
+      { text }
+    );
+    return response.data;
+  },
+
+  // Close a scoring session once its resume is replaced
+  closeScoringSession: async (sessionId: string) => {
+    const response = await apiClient.delete(`/scoring/sessions/${encodeURIComponent(sessionId)}`);
+    return response.data;
+  },
+
   // Enhance resume
   enhanceResume: async (
     resume: string,
@@ -49,6 +76,83 @@ export const api = {
     });
     return response.data;
   },
+
+  // Rewrite experience bullets; variants come back keyed by bullet id
+  enhanceBulletVariants: async (
+    experience: { jobs: { title: string; bullets: { id: string; text: string }[] }[] },
+    jobDescription: string,
+    provider: string,
+    model: string,
+    apiKey: string,
+    variants: number = 3
+  ) => {
+    const response = await apiClient.post('/enhance/variants', {
+      experience,
+      job_description: jobDescription,
+      variants,
+      provider,
+      model,
+      api_key: apiKey,
+    });
+    return response.data;
+  },
+
+  // Enhance resume, streaming text as it is generated (Server-Sent Events)
+  enhanceResumeStream: async (
+    resume: string,
+    jobDescription: string,
+    provider: string,
+    model: string,
+    apiKey: string,
+    onToken: (text: string) => void
+  ) => {
+    const response = await fetch(`${API_BASE_URL}/enhance/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        resume,
+        job_description: jobDescription,
+        provider,
+        model,
+        api_key: apiKey,
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      const detail = await response.json().catch(() => null);
+      throw new Error(detail?.detail || `Enhancement failed (${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = 'message';
+        let data = '';
+        for (const line of rawEvent.split('\n')) {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        }
+        if (!data) continue;
+
+        const payload = JSON.parse(data);
+        if (event === 'token') onToken(payload.text);
+        else if (event === 'done' || event === 'error') return payload;
+      }
+    }
+
+    throw new Error('Enhancement stream ended unexpectedly');
+  },
 };
 
 export default api;
\ No newline at end of file